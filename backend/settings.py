@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 from dotenv import load_dotenv
 import os
+import tempfile
 import dj_database_url
 
 
@@ -34,6 +35,9 @@ DEBUG = os.environ.get('DEBUG', 'False') == 'True'
 
 ALLOWED_HOSTS = os.environ.get('ALLOWED_HOSTS', '*').split(',')
 
+# True khi chạy ASGI (uvicorn worker): mount bản async của các endpoint gọi upstream
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', 'False') == 'True'
+
 
 
 # Application definition
@@ -55,6 +59,8 @@ MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    # nén gzip / brotli theo Accept-Encoding (đặt trước các middleware đọc/ghi body)
+    "core.middleware.CompressionMiddleware",
     'django.contrib.sessions.middleware.SessionMiddleware',
 
     'django.middleware.common.CommonMiddleware',
@@ -68,6 +74,10 @@ CORS_ALLOW_ALL_ORIGINS = True
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": ("rest_framework_simplejwt.authentication.JWTAuthentication",),
+    "DEFAULT_RENDERER_CLASSES": (
+        "core.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 20,
 }
@@ -100,10 +110,22 @@ WSGI_APPLICATION = 'backend.wsgi.application'
 DATABASES = {
     "default": dj_database_url.config(
         default=f"postgres://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}",
-        conn_max_age=600
+        # ASGI: connection persistent theo thread không được tái sử dụng -> đóng sau mỗi request
+        conn_max_age=0 if ASYNC_VIEWS else 600
     )
 }
 
+# Cache dùng chung giữa các gunicorn worker (bảng DB, tạo bằng `createcachetable`)
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "django_cache",
+        "OPTIONS": {
+            "MAX_ENTRIES": int(os.getenv("CACHE_MAX_ENTRIES", 50000)),
+        },
+    }
+}
+
 
 
 # Password validation
@@ -151,6 +173,21 @@ MEDIA_URL = "/media/"
 
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
+# Offline dictionary bundle (SQLite + chunk). Production: trỏ tới persistent disk
+OFFLINE_BUNDLE_DIR = os.environ.get("OFFLINE_BUNDLE_DIR", os.path.join(MEDIA_ROOT, "offline"))
+
+# Hot-entry cache (payload word) dùng chung giữa các worker qua file mmap; 0 slot = tắt
+HOT_CACHE_PATH = os.environ.get("HOT_CACHE_PATH", os.path.join(tempfile.gettempdir(), "nihon-hotcache.bin"))
+HOT_CACHE_SLOTS = int(os.environ.get("HOT_CACHE_SLOTS", "4096"))
+HOT_CACHE_SLOT_SIZE = int(os.environ.get("HOT_CACHE_SLOT_SIZE", str(16 * 1024)))
+
+# Token bucket dùng chung cả cluster cho từng upstream: (request / giây, burst)
+UPSTREAM_RATE_LIMITS = {
+    "jisho": (float(os.environ.get("JISHO_RATE_PER_SEC", "2")), 5),
+    "tatoeba": (float(os.environ.get("TATOEBA_RATE_PER_SEC", "2")), 5),
+    "kanjiapi": (float(os.environ.get("KANJIAPI_RATE_PER_SEC", "5")), 10),
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -196,6 +233,8 @@ EMAIL_USE_TLS = True
 EMAIL_HOST_USER = os.getenv('SMTP_USER', '')
 EMAIL_HOST_PASSWORD = os.getenv('SMTP_PASS', '')
 DEFAULT_FROM_EMAIL = os.getenv('SMTP_USER', 'noreply@nihon-dictionary.com')
+# giây; phải nhỏ hơn nhiều so với lease của mailer (5 phút) -> SMTP treo không làm gửi trùng
+EMAIL_TIMEOUT = int(os.getenv('SMTP_TIMEOUT', 30))
 
 # Frontend URL for password reset link
 FRONTEND_URL = os.getenv('FRONTEND_URL', 'http://localhost:5173')
@@ -0,0 +1,267 @@
+"""
+Bản async (ASGI) của các endpoint phải chờ upstream: Jisho, Tatoeba, KanjiAPI,
+Google Translate, Gemini. Chỉ được mount khi ASYNC_VIEWS=True (chạy dưới uvicorn),
+cùng URL và cùng format response với bản DRF sync.
+
+Phần chờ mạng chạy trên event loop; ORM luôn đi qua sync_to_async.
+"""
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.db.models import Q
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from core.models import Word
+from core.serializers.word import attach_request_fields
+from core.services import documents
+from core.services.breaker import CircuitOpenError
+from core.services.deinflect import lookup_deinflected
+from core.services.fuzzy import fuzzy_meanings, fuzzy_readings
+from core.services.ingest import (
+    fill_examples_for_word_async,
+    ingest_jisho_payload,
+    known_query_ids,
+    needs_examples,
+    remember_query,
+)
+from core.services.jisho import jisho_search_async
+from core.services.kanji import content_stamp, fetch_kanji_detail_async, kanji_stamp_async
+from core.services.query_stats import record_query
+from core.services.quiz_bank import QuizBankEmpty, sample_questions
+from core.services.refresh import is_stale, schedule_refresh
+from core.services.translate import translate_async, translate_many_async
+from core.services.vocab_quiz import generate_vocab_quiz
+from .conditional import add_validators, is_not_modified, make_etag
+from .kanji import kanji_etag, kanji_payload, kanji_validators
+from .quiz import quiz_params
+from .search import SearchView, ReverseLookupView, jisho_first
+from .translate import validate_batch, validate_languages
+
+_search_view = SearchView.as_view()
+_reverse_view = ReverseLookupView.as_view()
+
+EMPTY_PAGE = {"count": 0, "next": None, "previous": None, "results": []}
+
+
+def _json(data, status=200):
+    # giống DRF JSONRenderer: giữ nguyên tiếng Nhật, không escape \uXXXX
+    return JsonResponse(data, status=status, safe=False, json_dumps_params={"ensure_ascii": False})
+
+
+def _body(request) -> dict:
+    try:
+        data = json.loads(request.body or b"{}")
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+async def _authenticate(request):
+    """JWT như DRF; trả JsonResponse 401 nếu token sai, None nếu OK."""
+    try:
+        result = await sync_to_async(JWTAuthentication().authenticate)(request)
+    except AuthenticationFailed as e:
+        return _json({"detail": str(e.detail)}, status=401)
+    request.user = result[0] if result else AnonymousUser()
+    return None
+
+
+# ---------------------------------------------------------
+#  SEARCH / REVERSE (miss path -> Jisho async)
+# ---------------------------------------------------------
+
+async def _prefetch_from_jisho(q: str) -> list[Word]:
+    try:
+        payload = await jisho_search_async(q)
+    except CircuitOpenError:
+        # Jisho đang lỗi -> trả dữ liệu local (ở đây là rỗng), không chờ timeout
+        return []
+    words = await sync_to_async(ingest_jisho_payload)(payload)
+    await sync_to_async(remember_query)(q, words)
+    return words
+
+
+@require_GET
+async def search(request):
+    q = (request.GET.get("q") or "").strip()
+
+    if q:
+        local = Word.objects.filter(Q(kanji__icontains=q) | Q(kana__icontains=q))
+        if not await local.aexists() and not await sync_to_async(lookup_deinflected)(q):
+            known = await sync_to_async(known_query_ids)(q)
+            first = jisho_first(q, known)
+            if first or (known is None and not fuzzy_readings(q)):
+                # Chờ Jisho trên event loop; view sync dùng lại kết quả, không gọi Jisho lần 2
+                words = await _prefetch_from_jisho(q)
+                if not words and not first:
+                    # không qua SearchView -> tự đếm query
+                    await sync_to_async(record_query)(q)
+                    return _json(EMPTY_PAGE)
+                # romaji / tiếng Anh Jisho không có -> SearchView còn thử fuzzy
+                request.prefetched_word_ids = [w.id for w in words]
+
+    return await sync_to_async(_search_view)(request)
+
+
+@require_GET
+async def reverse_lookup(request):
+    q = (request.GET.get("q") or "").strip()
+
+    if q:
+        local = Word.objects.filter(meanings__meaning__icontains=q)
+        if not await local.aexists():
+            known = await sync_to_async(known_query_ids)(q)
+            first = jisho_first(q, known)
+            if first or (known is None and not fuzzy_meanings(q)):
+                words = await _prefetch_from_jisho(q)
+                if not words and not first:
+                    return _json(EMPTY_PAGE)
+                request.prefetched_word_ids = [w.id for w in words]
+
+    return await sync_to_async(_reverse_view)(request)
+
+
+# ---------------------------------------------------------
+#  WORD DETAIL (enrich examples từ Tatoeba song song)
+# ---------------------------------------------------------
+
+@require_GET
+async def word_detail(request, pk: int):
+    denied = await _authenticate(request)
+    if denied:
+        return denied
+
+    stamp = await sync_to_async(documents.load_stamp)(pk)
+    if stamp is not None and stamp.complete:
+        etag = await sync_to_async(make_etag)(request, "w", stamp.pk, stamp.version)
+        if is_not_modified(request, etag, stamp.updated_at):
+            if is_stale(stamp.word):
+                await sync_to_async(schedule_refresh)([stamp.pk])
+            return add_validators(HttpResponse(status=304), request, etag, stamp.updated_at)
+
+    doc = await sync_to_async(documents.load)(pk)
+    if doc is None:
+        try:
+            word = await Word.objects.aget(pk=pk)
+        except Word.DoesNotExist:
+            return _json({"detail": "No Word matches the given query."}, status=404)
+    else:
+        word = doc.word
+
+    if doc is None or not documents.is_complete(doc.data):
+        if await sync_to_async(needs_examples)(word):
+            await fill_examples_for_word_async(word, per_meaning=3)
+        doc = await sync_to_async(documents.get_or_build)(word.id)
+    payload = doc.data
+
+    if is_stale(word):
+        await sync_to_async(schedule_refresh)([word.id])
+
+    etag = await sync_to_async(make_etag)(request, "w", word.id, doc.version)
+    if is_not_modified(request, etag, doc.updated_at):
+        response = HttpResponse(status=304)
+    else:
+        data = await sync_to_async(attach_request_fields)(payload, word.id, {"request": request})
+        response = _json(data)
+    return add_validators(response, request, etag, doc.updated_at)
+
+
+# ---------------------------------------------------------
+#  KANJI
+# ---------------------------------------------------------
+
+@require_GET
+async def kanji_detail(request, char: str):
+    stamp = await kanji_stamp_async(char)
+    if stamp and is_not_modified(request, kanji_etag(stamp)):
+        return kanji_validators(HttpResponse(status=304), stamp)
+
+    try:
+        data = await fetch_kanji_detail_async(char)
+    except CircuitOpenError as e:
+        return _json({"detail": str(e)}, status=503)
+    except Exception as e:
+        return _json({"detail": str(e)}, status=502)
+
+    stamp = stamp or content_stamp(data)
+    if is_not_modified(request, kanji_etag(stamp)):
+        return kanji_validators(HttpResponse(status=304), stamp)
+    return kanji_validators(_json(kanji_payload(data)), stamp)
+
+
+# ---------------------------------------------------------
+#  TRANSLATE
+# ---------------------------------------------------------
+
+@csrf_exempt
+@require_POST
+async def translate_text(request):
+    text = str(_body(request).get("text", "")).strip()
+    if not text:
+        return _json({"error": "Empty text"}, status=400)
+
+    try:
+        return _json({"translated": await translate_async(text)})
+    except Exception as e:
+        return _json({"error": str(e)}, status=500)
+
+
+@csrf_exempt
+@require_POST
+async def translate_batch(request):
+    data = _body(request)
+    texts, error = validate_batch(data)
+    if error:
+        return _json({"error": error}, status=400)
+
+    source, target, error = validate_languages(data)
+    if error:
+        return _json({"error": error}, status=400)
+
+    try:
+        translations, hits = await translate_many_async(texts, source=source, target=target)
+    except Exception as e:
+        return _json({"error": str(e)}, status=500)
+
+    return _json({"translations": translations, "cached": hits})
+
+
+# ---------------------------------------------------------
+#  QUIZ
+# ---------------------------------------------------------
+
+@csrf_exempt
+@require_POST
+async def jlpt_quiz(request):
+    data = _body(request)
+
+    try:
+        level, count, mode = quiz_params(data)
+
+        if mode == "vocab":
+            questions = await sync_to_async(generate_vocab_quiz)(level, count, data.get("types"))
+        elif mode == "grammar":
+            questions = await sync_to_async(sample_questions)(level, count)
+        else:
+            return _json({"detail": "mode must be 'grammar' or 'vocab'"}, status=400)
+
+        return _json({
+            "level": level,
+            "mode": mode,
+            "count": len(questions),
+            "questions": questions
+        })
+
+    except QuizBankEmpty as e:
+        response = _json({"detail": str(e)}, status=503)
+        response["Retry-After"] = str(e.retry_after)
+        return response
+    except ValueError as e:
+        return _json({"detail": str(e)}, status=400)
+    except Exception as e:
+        return _json({"detail": str(e)}, status=500)
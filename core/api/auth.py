@@ -4,7 +4,6 @@ from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model
-from django.core.mail import send_mail
 from django.conf import settings
 
 from core.serializers.user import (
@@ -16,6 +15,7 @@ from core.serializers.user import (
     PasswordResetConfirmSerializer,
 )
 from core.models import PasswordResetToken
+from core.services.mailer import enqueue_email
 
 User = get_user_model()
 
@@ -107,11 +107,11 @@ def forgot_password(request):
     # Create reset password link
     reset_link = f"{settings.FRONTEND_URL}/reset-password?token={reset_token.token}"
 
-    # Send email
-    try:
-        send_mail(
-            subject="[Nihon Dictionary] Password Reset",
-            message=f"""
+    # Xếp hàng email (SMTP chạy ngoài request, lỗi thì retry với backoff)
+    enqueue_email(
+        to=email,
+        subject="[Nihon Dictionary] Password Reset",
+        body=f"""
 Hello {user.username},
 
 You have requested to reset your password for your Nihon Dictionary account.
@@ -126,15 +126,7 @@ If you did not request a password reset, please ignore this email.
 Best regards,
 Nihon Dictionary Team
 """,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[email],
-            fail_silently=False,
-        )
-    except Exception as e:
-        return Response(
-            {"detail": f"Could not send email: {str(e)}"},
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR
-        )
+    )
 
     return Response({"detail": "Password reset email has been sent."})
 
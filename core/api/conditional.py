@@ -0,0 +1,50 @@
+"""
+Conditional GET cho endpoint đọc dữ liệu từ điển: ETag dựng từ version stamp (không cần
+load resource), trả 304 trước khi serialize.
+
+Response có phần theo user (is_favorited) -> ETag kèm version membership của user
+(change log delta sync) và Cache-Control private; anonymous -> public, CDN cache được.
+"""
+from datetime import datetime
+
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe
+
+from core.services.membership import get_membership_version
+
+PUBLIC_MAX_AGE = 300             # word detail / JLPT list: 5 phút
+KANJI_MAX_AGE = 60 * 60 * 24     # dữ liệu kanji gần như không đổi
+
+
+def make_etag(request, *parts) -> str:
+    """Response theo user đổi khi favorites của user đổi -> thêm version membership."""
+    parts = [str(p) for p in parts]
+    if request.user.is_authenticated:
+        parts += [f"u{request.user.id}", get_membership_version(request.user.id)]
+    return '"' + "-".join(parts) + '"'
+
+
+def is_not_modified(request, etag: str, last_modified: datetime | None = None) -> bool:
+    # middleware nén đổi ETag thành dạng weak (W/"...") -> so sánh bỏ tiền tố
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match:
+        tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+        return etag in tags or "*" in tags
+
+    if not last_modified or request.user.is_authenticated:
+        return False  # phần theo user không có Last-Modified -> chỉ tin ETag
+    since = parse_http_date_safe(request.headers.get("If-Modified-Since") or "")
+    return bool(since and int(last_modified.timestamp()) <= since)
+
+
+def add_validators(response, request, etag: str, last_modified: datetime | None = None,
+                   max_age: int = PUBLIC_MAX_AGE):
+    response["ETag"] = etag
+    if request.user.is_authenticated:
+        response["Cache-Control"] = "private, no-cache"
+    else:
+        response["Cache-Control"] = f"public, max-age={max_age}"
+        if last_modified:
+            response["Last-Modified"] = http_date(last_modified.timestamp())
+    patch_vary_headers(response, ["Authorization"])
+    return response
@@ -2,8 +2,11 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework import generics
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
 
-from core.models import Favorite, Word
+from core.models import Favorite, Word, WordMeaning
+from core.renderers import stream_json_list
 from core.serializers.word import WordSerializer
 
 
@@ -38,7 +41,23 @@ class FavoritesView(generics.ListAPIView):
     def get_queryset(self):
         return Word.objects.filter(
             favorite__user=self.request.user
-        ).distinct()
+        ).distinct().prefetch_related(
+            Prefetch(
+                "meanings",
+                queryset=WordMeaning.objects.all().prefetch_related("examples")
+            )
+        )
+
+    def list(self, request, *args, **kwargs):
+        # List có thể tới hàng nghìn từ -> stream JSON theo chunk thay vì build 1 response lớn
+        context = self.get_serializer_context()
+        context["favorited_ids"] = set(
+            Favorite.objects.filter(user=request.user).values_list("word_id", flat=True)
+        )
+        return StreamingHttpResponse(
+            stream_json_list(self.get_queryset(), self.get_serializer_class(), context),
+            content_type="application/json",
+        )
 
 
 # -----------------------------
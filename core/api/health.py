@@ -0,0 +1,20 @@
+import os
+
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+
+from core.services.breaker import BREAKERS
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def upstream_status(request):
+    """
+    Trạng thái circuit breaker của từng upstream.
+    state/failures dùng chung cả cluster; timeout + latency percentiles là của worker trả lời.
+    """
+    return Response({
+        "worker_pid": os.getpid(),
+        "upstreams": [b.snapshot() for b in BREAKERS],
+    })
@@ -2,25 +2,35 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from core.models import Word
+from core.services.history import flush_search_history
+
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def get_search_history(request):
     """Trả về lịch sử tìm kiếm của user"""
-    history = (
+    # Flush buffer của worker này để user thấy ngay từ vừa search
+    flush_search_history()
+
+    # (word_id, searched_at) đọc thẳng từ index (user, searched_at DESC) INCLUDE word;
+    # kanji / kana lấy riêng bằng 1 lookup theo primary key thay vì JOIN trong query index
+    history = list(
         request.user.searches
-        .select_related("word")
-        .order_by("-searched_at")[:30]
+        .order_by("-searched_at")
+        .values_list("word_id", "searched_at")[:30]
     )
+    words = Word.objects.only("id", "kanji", "kana").in_bulk([word_id for word_id, _ in history])
 
     data = [
         {
-            "id": h.word.id,
-            "kanji": h.word.kanji,
-            "kana": h.word.kana,
-            "searched_at": h.searched_at
+            "id": word_id,
+            "kanji": words[word_id].kanji,
+            "kana": words[word_id].kana,
+            "searched_at": searched_at
         }
-        for h in history
+        for word_id, searched_at in history
+        if word_id in words
     ]
 
     return Response(data)
@@ -1,15 +1,34 @@
 from rest_framework import generics, permissions
+from rest_framework.response import Response
 from core.models import Word
 from core.serializers.word import WordSerializer
+from core.services import versions
+from .conditional import add_validators, is_not_modified, make_etag
+
+
+def normalize_level(level: str) -> str:
+    level = (level or "").upper()
+    if level.startswith("JLPT-"): level = level.split("-",1)[1].upper()
+    if level and not level.startswith("N"):
+        level = "N" + level
+    return level
+
 
 class JLPTWordListView(generics.ListAPIView):
     serializer_class = WordSerializer
     permission_classes = [permissions.AllowAny]
 
     def get_queryset(self):
-        level = (self.kwargs.get("level") or "").upper()
-
-        if level.startswith("JLPT-"): level = level.split("-",1)[1].upper()
-        if level and not level.startswith("N"):
-            level = "N" + level
+        level = normalize_level(self.kwargs.get("level"))
         return Word.objects.filter(jlpt_level=level).order_by("kana","kanji")
+
+    def list(self, request, *args, **kwargs):
+        # version của list tăng mỗi khi word thuộc level được thêm / đổi -> 304 trước khi query list
+        level = normalize_level(self.kwargs.get("level"))
+        version, updated_at = versions.get(versions.jlpt_key(level))
+        etag = make_etag(request, "jlpt", level, version, request.GET.urlencode() or "0")
+        if is_not_modified(request, etag, updated_at):
+            response = Response(status=304)
+        else:
+            response = super().list(request, *args, **kwargs)
+        return add_validators(response, request, etag, updated_at)
@@ -1,17 +1,44 @@
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework import permissions
 from rest_framework.response import Response
-from core.services.kanji import fetch_kanji_detail
+from core.services.breaker import CircuitOpenError
+from core.services.kanji import content_stamp, fetch_kanji_detail, kanji_stamp
+from .conditional import KANJI_MAX_AGE, is_not_modified
 
 @api_view(["GET"])
 @permission_classes([permissions.AllowAny])
 def kanji_detail(request, char: str):
+    # stamp nằm cạnh cache entry -> 304 không cần đọc / serialize data
+    stamp = kanji_stamp(char)
+    if stamp and is_not_modified(request, kanji_etag(stamp)):
+        return kanji_validators(Response(status=304), stamp)
+
     try:
         data = fetch_kanji_detail(char)
+    except CircuitOpenError as e:
+        return Response({"detail": str(e)}, status=503)
     except Exception as e:
         return Response({"detail": str(e)}, status=502)
 
-    out = {
+    stamp = stamp or content_stamp(data)
+    if is_not_modified(request, kanji_etag(stamp)):
+        return kanji_validators(Response(status=304), stamp)
+    return kanji_validators(Response(kanji_payload(data)), stamp)
+
+
+def kanji_etag(stamp: str) -> str:
+    return f'"k-{stamp}"'
+
+
+def kanji_validators(response, stamp: str):
+    # không có field theo user -> public cho mọi request
+    response["ETag"] = kanji_etag(stamp)
+    response["Cache-Control"] = f"public, max-age={KANJI_MAX_AGE}"
+    return response
+
+
+def kanji_payload(data: dict) -> dict:
+    return {
         "kanji": data.get("kanji"),
         "meanings": data.get("meanings", []),
         "on_readings": data.get("on_readings", []),
@@ -19,4 +46,3 @@ def kanji_detail(request, char: str):
         "jlpt": data.get("jlpt"),
         "grade": data.get("grade"),
     }
-    return Response(out)
@@ -0,0 +1,57 @@
+import time
+import logging
+
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+
+from core.services.lookup import bulk_lookup, normalize_term, schedule_ingest
+
+logger = logging.getLogger(__name__)
+
+MAX_TERMS = 5000
+
+
+@api_view(["POST"])
+@permission_classes([AllowAny])
+def bulk_lookup_view(request):
+    """
+    POST /api/lookup/
+    {"terms": ["食べる", "行かなかった", ...], "ingest_missing": false}
+    Tra tối đa MAX_TERMS term trong vài query; term không có trong DB có thể
+    được xếp hàng ingest nền từ Jisho thay vì gọi Jisho ngay.
+    """
+    terms = request.data.get("terms")
+    if not isinstance(terms, list) or not terms:
+        return Response({"detail": "terms must be a non-empty list"}, status=400)
+    if len(terms) > MAX_TERMS:
+        return Response({"detail": f"At most {MAX_TERMS} terms per request"}, status=400)
+
+    # null / số / object không phải term (str(None) -> "None" sẽ bị tra và ingest như 1 từ)
+    # term gốc -> term đã chuẩn hoá (NFKC); tra theo bản chuẩn hoá, trả về theo term gốc
+    normalized = {t: normalize_term(t) for t in dict.fromkeys(t for t in terms if isinstance(t, str))}
+    normalized = {t: n for t, n in normalized.items() if n}
+    terms = list(dict.fromkeys(normalized.values()))
+
+    t0 = time.perf_counter()
+    data = bulk_lookup(terms)
+    queued = schedule_ingest(data["missing"]) if request.data.get("ingest_missing") else 0
+    logger.info(
+        f"[TIMING] bulk_lookup: {len(terms)} terms, {len(data['missing'])} missing, "
+        f"{(time.perf_counter() - t0) * 1000:.2f}ms"
+    )
+
+    return Response(_by_original(data, normalized) | {"queued": queued})
+
+
+def _by_original(data: dict, normalized: dict[str, str]) -> dict:
+    """Key results / deinflections / missing theo term client gửi ("ＮＨＫ"), không theo "NHK"."""
+    missing = set(data["missing"])
+    return {
+        "results": {t: data["results"][n] for t, n in normalized.items()},
+        "deinflections": {
+            t: data["deinflections"][n] for t, n in normalized.items() if n in data["deinflections"]
+        },
+        "words": data["words"],
+        "missing": [t for t, n in normalized.items() if n in missing],
+    }
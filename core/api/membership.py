@@ -0,0 +1,60 @@
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+
+from core.services.membership import (
+    batch_membership,
+    get_membership_version,
+    membership_etag,
+)
+
+MAX_WORD_IDS = 500
+
+
+def _parse_word_ids(request):
+    raw = []
+    for v in request.query_params.getlist("word_ids"):
+        raw.extend(x for x in v.split(",") if x.strip())
+
+    # giữ thứ tự, bỏ trùng
+    return list(dict.fromkeys(int(x) for x in raw))
+
+
+# -----------------------------
+# Batch check: favorited + flashcards chứa word
+# GET /api/membership/?word_ids=1,2,3
+# -----------------------------
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def batch_membership_view(request):
+    try:
+        word_ids = _parse_word_ids(request)
+    except ValueError:
+        return Response({"detail": "word_ids must be integers"}, status=400)
+
+    if not word_ids:
+        return Response({"detail": "word_ids required"}, status=400)
+    if len(word_ids) > MAX_WORD_IDS:
+        return Response(
+            {"detail": f"At most {MAX_WORD_IDS} word_ids per request"}, status=400
+        )
+
+    if not request.user.is_authenticated:
+        data = batch_membership(request.user, word_ids)
+        return Response({"version": None, "results": data})
+
+    # So version trước khi query -> 304 chỉ tốn 1 query trên index (user, id)
+    version = get_membership_version(request.user.id)
+    etag = membership_etag(version, word_ids)
+
+    # middleware nén đổi ETag thành dạng weak (W/"...") -> so sánh bỏ tiền tố
+    if_none_match = request.headers.get("If-None-Match", "")
+    if etag in (t.strip().removeprefix("W/") for t in if_none_match.split(",")):
+        response = Response(status=304)
+    else:
+        data = batch_membership(request.user, word_ids)
+        response = Response({"version": version, "results": data})
+
+    response["ETag"] = etag
+    response["Cache-Control"] = "private, no-cache"
+    return response
@@ -0,0 +1,82 @@
+import re
+
+from django.http import HttpResponse
+from django.views.decorators.http import require_safe
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+
+from core.services.bundle import BundleNotBuilt, chunk_path, delta
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+# -----------------------------
+# Manifest + danh sách chunk cần tải
+# GET /api/offline/manifest/?since=<version client đang có>
+# -----------------------------
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def offline_manifest(request):
+    try:
+        since = int(request.query_params.get("since") or 0) or None
+    except ValueError:
+        return Response({"detail": "since must be an integer"}, status=400)
+
+    try:
+        data = delta(since)
+    except BundleNotBuilt as e:
+        return Response({"detail": str(e)}, status=404)
+
+    etag = f'"{data["manifest"]["version"]}-{since or 0}"'
+    if request.headers.get("If-None-Match", "").removeprefix("W/") == etag:
+        response = Response(status=304)
+    else:
+        response = Response(data)
+    response["ETag"] = etag
+    response["Cache-Control"] = "public, no-cache"
+    return response
+
+
+# -----------------------------
+# Chunk content-addressed (immutable), hỗ trợ Range: bytes=a-b
+# GET /api/offline/chunks/<sha256>/
+# -----------------------------
+@require_safe
+def offline_chunk(request, digest):
+    try:
+        path = chunk_path(digest)
+    except BundleNotBuilt:
+        return HttpResponse(status=404)
+
+    with open(path, "rb") as f:
+        data = f.read()
+
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": f'"{digest}"',
+        "Cache-Control": "public, max-age=31536000, immutable",
+    }
+    if request.headers.get("If-None-Match") == headers["ETag"]:
+        return HttpResponse(status=304, headers=headers)
+
+    match = RANGE_RE.match(request.headers.get("Range", "").strip())
+    if not match or match.groups() == ("", ""):
+        # không có Range (hoặc Range nhiều đoạn) -> trả cả chunk
+        return HttpResponse(data, content_type="application/octet-stream", headers=headers)
+
+    first, last = match.groups()
+    size = len(data)
+    if first:
+        start, end = int(first), min(int(last) if last else size - 1, size - 1)
+    else:  # bytes=-N : N byte cuối
+        start, end = max(size - int(last), 0), size - 1
+
+    if start >= size or start > end:
+        headers["Content-Range"] = f"bytes */{size}"
+        return HttpResponse(status=416, headers=headers)
+
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return HttpResponse(
+        data[start:end + 1], status=206, content_type="application/octet-stream", headers=headers
+    )
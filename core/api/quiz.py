@@ -2,22 +2,55 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 
-from core.services.quiz import generate_jlpt_quiz
+from core.services.quiz import normalize_level
+from core.services.quiz_bank import QuizBankEmpty, sample_questions
+from core.services.vocab_quiz import generate_vocab_quiz
+
+MAX_COUNT = 50  # số câu tối đa cho 1 request
 
 
 @api_view(["POST"])
 @permission_classes([AllowAny])
 def jlpt_quiz(request):
-    level = request.data.get("level", "N5")
-    count = int(request.data.get("count", 10))
-
+    """
+    mode = "grammar" (mặc định): câu hỏi ngữ pháp Gemini lấy từ question bank
+    mode = "vocab": câu hỏi từ vựng sinh trực tiếp từ DB, không gọi mạng
+    """
     try:
-        questions = generate_jlpt_quiz(level, count)
+        level, count, mode = quiz_params(request.data)
+
+        if mode == "vocab":
+            questions = generate_vocab_quiz(level, count, request.data.get("types"))
+        elif mode == "grammar":
+            # Lấy từ question bank sinh sẵn; bank thấp -> refill nền, không chờ Gemini
+            questions = sample_questions(level, count)
+        else:
+            return Response({"detail": "mode must be 'grammar' or 'vocab'"}, status=400)
+
         return Response({
             "level": level,
+            "mode": mode,
             "count": len(questions),
             "questions": questions
         })
 
+    except QuizBankEmpty as e:
+        return Response({"detail": str(e)}, status=503, headers={"Retry-After": str(e.retry_after)})
+    except ValueError as e:
+        return Response({"detail": str(e)}, status=400)
     except Exception as e:
         return Response({"detail": str(e)}, status=500)
+
+
+def quiz_params(data) -> tuple[str, int, str]:
+    """ValueError (-> 400) nếu count không phải số nguyên dương; count lớn hơn MAX_COUNT bị cắt."""
+    level = normalize_level(data.get("level", "N5"))
+    try:
+        count = int(data.get("count", 10))
+    except (TypeError, ValueError):
+        raise ValueError("count must be an integer")
+    if count < 1:
+        raise ValueError("count must be at least 1")
+    count = min(count, MAX_COUNT)
+    mode = data.get("mode", "grammar")
+    return level, count, mode
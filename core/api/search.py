@@ -4,26 +4,99 @@ import logging
 from rest_framework import generics, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from django.db.models import Q, Prefetch
+from django.db.models import Q
 
-from core.models import Word, WordMeaning
-from core.serializers.word import WordSerializer
-from core.services.ingest import upsert_from_jisho
+from core.models import Word
+from core.serializers.word import WordSerializer, serialize_words
+from core.services.breaker import CircuitOpenError
+from core.services.deinflect import lookup_deinflected
+from core.services.fuzzy import fuzzy_meanings, fuzzy_readings
+from core.services.ingest import known_query_ids, upsert_from_jisho
 from core.services.history import save_search_history
+from core.services.ranking import by_score, rank_matches
+from core.services.lookup import schedule_ingest
+from core.services.prefetch import schedule_prefetch
+from core.services.query_stats import record_query
+from core.services.refresh import schedule_stale
 
 logger = logging.getLogger(__name__)
 
 
+def _upsert_or_empty(q: str) -> list[Word]:
+    """Jisho đang bị ngắt (circuit open) -> fail fast, chỉ trả dữ liệu đã có trong DB."""
+    try:
+        return upsert_from_jisho(q)
+    except CircuitOpenError as e:
+        logger.warning(f"[SEARCH] {e}; serving local results only for '{q}'")
+        return []
+
+
+def _jisho_ids(request, q: str, known: list[int] | None) -> list[int]:
+    """
+    Id word Jisho trả về cho q. View async đã gọi Jisho (không chặn) thì gắn sẵn
+    request.prefetched_word_ids -> không gọi lại lần 2; Jisho đã trả lời q trước đó
+    (known, kể cả rỗng) -> không gọi lại.
+    """
+    prefetched = getattr(request, "prefetched_word_ids", None)
+    if prefetched is not None:
+        return prefetched
+    if known is not None:
+        return known
+    return [w.id for w in _upsert_or_empty(q)]
+
+
+def jisho_first(q: str, known: list[int] | None) -> bool:
+    """
+    Query ASCII (tiếng Anh / romaji) chưa từng tra Jisho -> hỏi Jisho trước fuzzy:
+    "dog" phải ra 犬 ngay lần đầu, không phải reading gần đúng どう. Fuzzy chỉ còn là
+    phương án cuối khi Jisho không có gì (hoặc đang bị ngắt).
+    """
+    return known is None and q.isascii()
+
+
+def _fuzzy_hit(q: str, matches: dict[int, dict], known: list[int] | None) -> None:
+    """
+    Kết quả gần đúng thay cho Jisho (query kana gõ sai); query có typo thật thì vẫn ingest nền:
+    Jisho trả gì thì lần sau dùng mapping query -> word (known_query_ids) trước fuzzy.
+    Jisho đã trả lời rồi -> không xếp lại.
+    """
+    if known is None and min(m["distance"] for m in matches.values()) > 0:
+        schedule_ingest([q])
+
+
+class HotWordListMixin:
+    """
+    Trang kết quả: chỉ query id của trang, payload word lấy từ hot cache dùng chung
+    giữa các worker (miss -> load meanings/examples + serialize cho riêng word đó).
+    prefetch_examples = True -> kết quả đầu trang chưa có example được enrich nền.
+    Từ stale được nhận ra từ chính các row của trang (refreshed_at), không thêm query.
+    """
+    prefetch_examples = False
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.get_queryset().only("id", "refreshed_at")
+        page = self.paginate_queryset(queryset)
+        words = page if page is not None else queryset
+        # Trả dữ liệu DB ngay; từ quá hạn trong trang -> refresh nền từ Jisho
+        schedule_stale(words)
+        data = serialize_words([w.id for w in words], self.get_serializer_context())
+        if self.prefetch_examples:
+            # user thường mở 1 trong vài kết quả đầu -> detail đọc example có sẵn trong DB
+            schedule_prefetch(data)
+        return self.get_paginated_response(data) if page is not None else Response(data)
+
+
 # ---------------------------------------------------------
 #  SEARCH
 # ---------------------------------------------------------
-class SearchView(generics.ListAPIView):
+class SearchView(HotWordListMixin, generics.ListAPIView):
     """
     Tìm kiếm từ vựng theo Kanji hoặc Kana.
     Nếu user đăng nhập -> lưu lịch sử tìm kiếm vào SearchHistory.
     """
     serializer_class = WordSerializer
     permission_classes = [permissions.AllowAny]
+    prefetch_examples = True
 
     def get_queryset(self):
         total_start = time.perf_counter()
@@ -33,52 +106,91 @@ class SearchView(generics.ListAPIView):
         if not q:
             return Word.objects.none()
 
-        # Tránh N+1 queries: load meanings + examples
-        t0 = time.perf_counter()
-        base = Word.objects.all().prefetch_related(
-            Prefetch(
-                "meanings",
-                queryset=WordMeaning.objects.all().prefetch_related("examples")
-            )
-        )
-        logger.info(f"[TIMING] SearchView - build base queryset: {(time.perf_counter() - t0) * 1000:.2f}ms")
+        # rollup tần suất query (buffer, flush theo batch) -> warm_cache
+        record_query(q)
 
-        # 1) Tìm trong DB trước
+        # meanings + examples chỉ load cho trang hiện tại, qua hot cache (xem HotWordListMixin)
+        base = Word.objects.all()
+
+        # 1) Tìm trong DB trước: exact > prefix > substring, cùng hạng theo score
         t1 = time.perf_counter()
-        qs = base.filter(Q(kanji__icontains=q) | Q(kana__icontains=q))
+        qs = rank_matches(base.filter(Q(kanji__icontains=q) | Q(kana__icontains=q)), q)
         exists = qs.exists()
         logger.info(f"[TIMING] SearchView - DB filter + exists check: {(time.perf_counter() - t1) * 1000:.2f}ms, found={exists}")
 
         if exists:
             # ✔ LƯU LỊCH SỬ (nếu người dùng đăng nhập)
             t2 = time.perf_counter()
-            save_search_history(request.user, list(qs))
+            save_search_history(request.user, qs[:1])
             logger.info(f"[TIMING] SearchView - save_search_history: {(time.perf_counter() - t2) * 1000:.2f}ms")
+
             logger.info(f"[TIMING] SearchView TOTAL (cache hit): {(time.perf_counter() - total_start) * 1000:.2f}ms")
             return qs
 
-        # 2) Không có trong DB -> gọi Jisho API để lấy & lưu
+        # 2) Query là dạng chia (食べた, 行かなかった...) -> tra các thể gốc trong 1 query
+        t_d = time.perf_counter()
+        self.deinflections = lookup_deinflected(q)
+        logger.info(f"[TIMING] SearchView - deinflect lookup: {(time.perf_counter() - t_d) * 1000:.2f}ms, found={len(self.deinflections)}")
+
+        if self.deinflections:
+            qs = by_score(base.filter(id__in=list(self.deinflections)))
+            save_search_history(request.user, qs[:1])
+            logger.info(f"[TIMING] SearchView TOTAL (deinflected hit): {(time.perf_counter() - total_start) * 1000:.2f}ms")
+            return qs
+
+        # 3) Query đã tra Jisho trước đó (romaji, tiếng Anh: "dog" -> 犬) -> word Jisho đã trả
+        known = known_query_ids(q)
+        if known:
+            qs = by_score(base.filter(id__in=known))
+            save_search_history(request.user, qs[:1])
+            logger.info(f"[TIMING] SearchView TOTAL (known query hit): {(time.perf_counter() - total_start) * 1000:.2f}ms")
+            return qs
+
+        # 4) Tiếng Anh / romaji chưa từng tra -> Jisho trước fuzzy
+        if jisho_first(q, known):
+            t3 = time.perf_counter()
+            known = _jisho_ids(request, q, known)
+            logger.info(f"[TIMING] SearchView - upsert_from_jisho: {(time.perf_counter() - t3) * 1000:.2f}ms")
+            if known:
+                result = by_score(base.filter(id__in=known))
+                save_search_history(request.user, result[:1])
+                logger.info(f"[TIMING] SearchView TOTAL (cache miss): {(time.perf_counter() - total_start) * 1000:.2f}ms")
+                return result
+
+        # 5) Gõ sai (kana, hoặc romaji Jisho không có) -> fuzzy trên reading
+        self.fuzzy = fuzzy_readings(q)
+        if self.fuzzy:
+            _fuzzy_hit(q, self.fuzzy, known)
+            qs = by_score(base.filter(id__in=list(self.fuzzy)))
+            save_search_history(request.user, qs[:1])
+            logger.info(f"[TIMING] SearchView TOTAL (fuzzy hit): {(time.perf_counter() - total_start) * 1000:.2f}ms")
+            return qs
+
+        # 6) Không có trong DB -> gọi Jisho API để lấy & lưu (đã hỏi ở bước 4 -> dùng lại)
         t3 = time.perf_counter()
-        words = upsert_from_jisho(q)
+        ids = _jisho_ids(request, q, known)
         logger.info(f"[TIMING] SearchView - upsert_from_jisho: {(time.perf_counter() - t3) * 1000:.2f}ms")
 
         t4 = time.perf_counter()
-        result = base.filter(id__in=[w.id for w in words])
+        result = by_score(base.filter(id__in=ids))
         logger.info(f"[TIMING] SearchView - filter result: {(time.perf_counter() - t4) * 1000:.2f}ms")
 
         # ✔ LƯU LỊCH SỬ
         t5 = time.perf_counter()
-        save_search_history(request.user, list(result))
+        save_search_history(request.user, result[:1])
         logger.info(f"[TIMING] SearchView - save_search_history: {(time.perf_counter() - t5) * 1000:.2f}ms")
         logger.info(f"[TIMING] SearchView TOTAL (cache miss): {(time.perf_counter() - total_start) * 1000:.2f}ms")
         return result
 
     def get_serializer_context(self):
         """
-        Truyền request xuống serializer để xử lý is_favorited.
+        Truyền request xuống serializer để xử lý is_favorited,
+        và trace deinflect / fuzzy (nếu kết quả không khớp nguyên văn query).
         """
         context = super().get_serializer_context()
         context["request"] = self.request
+        context["deinflections"] = getattr(self, "deinflections", None) or {}
+        context["fuzzy"] = getattr(self, "fuzzy", None) or {}
         return context
 
 
@@ -94,7 +206,7 @@ def autocomplete(request):
         return Response([])
 
     qs = (
-        Word.objects.filter(Q(kanji__icontains=q) | Q(kana__icontains=q))
+        rank_matches(Word.objects.filter(Q(kanji__icontains=q) | Q(kana__icontains=q)), q)
         .values("id", "kanji", "kana")[:10]
     )
     return Response(list(qs))
@@ -103,7 +215,7 @@ def autocomplete(request):
 # ---------------------------------------------------------
 #  REVERSE LOOKUP (Tra nghĩa tiếng Việt -> tiếng Nhật)
 # ---------------------------------------------------------
-class ReverseLookupView(generics.ListAPIView):
+class ReverseLookupView(HotWordListMixin, generics.ListAPIView):
     """
     Tra ngược nghĩa tiếng Việt sang tiếng Nhật.
     Nếu user đăng nhập -> lưu lịch sử tìm kiếm.
@@ -125,20 +237,43 @@ class ReverseLookupView(generics.ListAPIView):
         )
 
         if ids:
-            qs = Word.objects.filter(id__in=ids)
+            qs = by_score(Word.objects.filter(id__in=ids))
             # ✔ LƯU LỊCH SỬ
-            save_search_history(request.user, list(qs))
+            save_search_history(request.user, qs[:1])
+            return qs
+
+        # 2) Query đã tra Jisho trước đó -> word Jisho đã trả
+        known = known_query_ids(q)
+        if known:
+            qs = by_score(Word.objects.filter(id__in=known))
+            save_search_history(request.user, qs[:1])
+            return qs
+
+        # 3) Nghĩa tiếng Anh chưa từng tra -> Jisho trước fuzzy
+        if jisho_first(q, known):
+            known = _jisho_ids(request, q, known)
+            if known:
+                result = by_score(Word.objects.filter(id__in=known))
+                save_search_history(request.user, result[:1])
+                return result
+
+        # 4) Gõ sai nghĩa (vd. "stuydy", Jisho không có) -> fuzzy trên token của nghĩa
+        self.fuzzy = fuzzy_meanings(q)
+        if self.fuzzy:
+            _fuzzy_hit(q, self.fuzzy, known)
+            qs = by_score(Word.objects.filter(id__in=list(self.fuzzy)))
+            save_search_history(request.user, qs[:1])
             return qs
 
-        # 2) Không có -> gọi Jisho API
-        words = upsert_from_jisho(q)
-        result = Word.objects.filter(id__in=[w.id for w in words])
+        # 5) Không có -> gọi Jisho API (đã hỏi ở bước 3 -> dùng lại)
+        result = by_score(Word.objects.filter(id__in=_jisho_ids(request, q, known)))
 
         # ✔ LƯU LỊCH SỬ
-        save_search_history(request.user, list(result))
+        save_search_history(request.user, result[:1])
         return result
 
     def get_serializer_context(self):
         context = super().get_serializer_context()
         context["request"] = self.request
+        context["fuzzy"] = getattr(self, "fuzzy", None) or {}
         return context
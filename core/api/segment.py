@@ -0,0 +1,38 @@
+import time
+import logging
+
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+
+from core.services.segment import segment, words_for_spans
+
+logger = logging.getLogger(__name__)
+
+MAX_TEXT_LENGTH = 10000
+
+
+@api_view(["POST"])
+@permission_classes([AllowAny])
+def segment_text(request):
+    """
+    POST /api/segment/
+    {"text": "日本語を勉強しています。"}
+    Tách câu thành từ theo từ điển local; thông tin word trả về trong "words" (1 query).
+    """
+    text = str(request.data.get("text", "")).strip()
+    if not text:
+        return Response({"detail": "Empty text"}, status=400)
+    if len(text) > MAX_TEXT_LENGTH:
+        return Response({"detail": f"Text longer than {MAX_TEXT_LENGTH} characters"}, status=400)
+
+    t0 = time.perf_counter()
+    tokens = segment(text)
+    t1 = time.perf_counter()
+    words = words_for_spans(tokens)
+    logger.info(
+        f"[TIMING] segment_text: {len(text)} chars, {len(tokens)} tokens, "
+        f"segment {(t1 - t0) * 1000:.2f}ms, words {(time.perf_counter() - t1) * 1000:.2f}ms"
+    )
+
+    return Response({"tokens": tokens, "words": words})
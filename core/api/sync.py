@@ -0,0 +1,31 @@
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from core.services.history import flush_search_history
+from core.services.sync import PAGE_SIZE, InvalidCursor, changes_since
+
+
+# -----------------------------
+# Delta sync: favorites, flashcards, flashcard items, history
+# GET /api/sync/?cursor=<cursor từ lần sync trước>
+# -----------------------------
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def delta_sync(request):
+    try:
+        limit = min(int(request.query_params.get("limit", PAGE_SIZE)), PAGE_SIZE)
+    except ValueError:
+        return Response({"detail": "limit must be an integer"}, status=400)
+    if limit < 1:
+        return Response({"detail": "limit must be positive"}, status=400)
+
+    # history của worker này có thể còn nằm trong buffer
+    flush_search_history()
+
+    try:
+        data = changes_since(request.user.id, request.query_params.get("cursor"), limit)
+    except InvalidCursor as e:
+        return Response({"detail": str(e)}, status=400)
+
+    return Response(data)
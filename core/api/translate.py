@@ -1,8 +1,13 @@
-from deep_translator import GoogleTranslator
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 
+from core.services.translate import supported_languages, translate, translate_many
+
+MAX_BATCH = 100
+MAX_TEXT_LENGTH = 5000
+
+
 @api_view(["POST"])
 @permission_classes([AllowAny])
 def translate_text(request):
@@ -11,7 +16,53 @@ def translate_text(request):
         return Response({"error": "Empty text"}, status=400)
 
     try:
-        translated = GoogleTranslator(source="ja", target="en").translate(text)
+        translated = translate(text)
         return Response({"translated": translated})
     except Exception as e:
         return Response({"error": str(e)}, status=500)
+
+
+@api_view(["POST"])
+@permission_classes([AllowAny])
+def translate_batch(request):
+    """
+    POST /api/translate/batch/
+    {"texts": ["...", "..."], "source": "ja", "target": "en"}
+    """
+    texts, error = validate_batch(request.data)
+    if error:
+        return Response({"error": error}, status=400)
+
+    source, target, error = validate_languages(request.data)
+    if error:
+        return Response({"error": error}, status=400)
+
+    try:
+        translations, hits = translate_many(texts, source=source, target=target)
+    except Exception as e:
+        return Response({"error": str(e)}, status=500)
+
+    return Response({"translations": translations, "cached": hits})
+
+
+def validate_batch(data) -> tuple[list, str | None]:
+    texts = data.get("texts")
+    if not isinstance(texts, list) or not texts:
+        return [], "texts must be a non-empty list"
+    if len(texts) > MAX_BATCH:
+        return [], f"At most {MAX_BATCH} texts per request"
+    if any(not isinstance(t, str) or len(t) > MAX_TEXT_LENGTH for t in texts):
+        return [], f"Each text must be a string of at most {MAX_TEXT_LENGTH} characters"
+    return texts, None
+
+
+def validate_languages(data) -> tuple[str, str, str | None]:
+    """source / target phải là mã Google Translate hỗ trợ (vào cache key và deep_translator)."""
+    source = data.get("source", "ja")
+    target = data.get("target", "en")
+    languages = supported_languages()
+    if source != "auto" and (not isinstance(source, str) or source not in languages):
+        return source, target, f"Unsupported source language: {source!r}"
+    if not isinstance(target, str) or target not in languages:
+        return source, target, f"Unsupported target language: {target!r}"
+    return source, target, None
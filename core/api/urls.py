@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path
 
 from core.api.word_detail import WordDetailView
@@ -5,11 +6,17 @@ from .search import SearchView, autocomplete, ReverseLookupView
 from .history import get_search_history
 from .favorites import toggle_favorite, FavoritesView, is_favorited
 from .flashcards import create_flashcard, add_to_flashcard, FlashcardDetail, list_flashcards , is_in_flashcard
+from .membership import batch_membership_view
+from .sync import delta_sync
+from .offline import offline_manifest, offline_chunk
 from .auth import RegisterView, me, update_user, change_password, forgot_password, reset_password, verify_reset_token
 from .kanji import kanji_detail
 from .jlpt import JLPTWordListView
-from .translate import translate_text
+from .translate import translate_text, translate_batch
+from .segment import segment_text
+from .lookup import bulk_lookup_view
 from .quiz import jlpt_quiz
+from .health import upstream_status
 
 urlpatterns = [
     path("search/", SearchView.as_view()),
@@ -26,6 +33,13 @@ urlpatterns = [
 
     #translate API
     path("translate/", translate_text),
+    path("translate/batch/", translate_batch),
+
+    # tách câu tiếng Nhật thành từ (từ điển local)
+    path("segment/", segment_text),
+
+    # tra nhiều term trong 1 request (annotate danh sách từ vựng)
+    path("lookup/", bulk_lookup_view),
 
     path("flashcards/", list_flashcards, name="list-flashcards"),   # GET
     path("flashcards/create/", create_flashcard, name="create-flashcard"),  # POST
@@ -33,6 +47,16 @@ urlpatterns = [
     path("flashcards/<int:pk>/", FlashcardDetail.as_view(), name="flashcard-detail"),  # GET
     path("flashcards/<int:flashcard_id>/is_in/", is_in_flashcard, name="is-in-flashcard"),
 
+    # batch favorites + flashcards membership
+    path("membership/", batch_membership_view, name="batch-membership"),
+
+    # delta sync cho mobile: chỉ trả thay đổi kể từ cursor
+    path("sync/", delta_sync, name="delta-sync"),
+
+    # offline dictionary bundle: manifest + chunk content-addressed
+    path("offline/manifest/", offline_manifest, name="offline-manifest"),
+    path("offline/chunks/<str:digest>/", offline_chunk, name="offline-chunk"),
+
 
     path("auth/register/", RegisterView.as_view()),
     path("auth/me/", me),
@@ -42,4 +66,21 @@ urlpatterns = [
     path("kanji/<str:char>/", kanji_detail),
     path("jlpt/<str:level>/words/", JLPTWordListView.as_view()),
     path("quiz/jlpt/", jlpt_quiz),
+
+    # metrics: circuit breaker / latency của Jisho, Tatoeba, KanjiAPI
+    path("health/upstreams/", upstream_status),
 ]
+
+# ASGI mode (uvicorn): các endpoint chờ upstream dùng bản async, cùng URL / cùng response
+if settings.ASYNC_VIEWS:
+    from . import async_views
+
+    urlpatterns = [
+        path("search/", async_views.search),
+        path("reverse/", async_views.reverse_lookup),
+        path("word/<int:pk>/", async_views.word_detail),
+        path("translate/", async_views.translate_text),
+        path("translate/batch/", async_views.translate_batch),
+        path("kanji/<str:char>/", async_views.kanji_detail),
+        path("quiz/jlpt/", async_views.jlpt_quiz),
+    ] + urlpatterns
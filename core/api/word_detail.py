@@ -3,8 +3,11 @@ import logging
 from rest_framework import generics, permissions
 from rest_framework.response import Response
 from core.models import Word
-from core.serializers.word import WordSerializer
-from core.services.ingest import _fill_examples_for_word
+from core.serializers.word import WordSerializer, attach_request_fields
+from .conditional import add_validators, is_not_modified, make_etag
+from core.services import documents
+from core.services.ingest import _fill_examples_for_word, needs_examples
+from core.services.refresh import is_stale, schedule_refresh
 
 logger = logging.getLogger(__name__)
 
@@ -15,20 +18,35 @@ class WordDetailView(generics.RetrieveAPIView):
     permission_classes = [permissions.AllowAny]
 
     def get(self, request, *args, **kwargs):
-        word = self.get_object()
-
-        # Kiểm tra meaning đã có example chưa
-        need_fetch = False
-        for m in word.meanings.all():
-            if m.examples.count() == 0:
-                need_fetch = True
-                break
-
-        if need_fetch:
-            start = time.perf_counter()
-            _fill_examples_for_word(word, per_meaning=3)
-            logger.info(f"[TIMING] DetailView fetch examples: {(time.perf_counter() - start) * 1000:.2f}ms")
-
-        # Serialize lại (sau khi example đã được thêm)
-        serializer = self.get_serializer(word)
-        return Response(serializer.data)
+        # Conditional GET: chỉ đọc version của document -> 304 trước khi load / serialize
+        stamp = documents.load_stamp(kwargs["pk"])
+        if stamp is not None and stamp.complete:
+            etag = make_etag(request, "w", stamp.pk, stamp.version)
+            if is_not_modified(request, etag, stamp.updated_at):
+                if is_stale(stamp.word):
+                    schedule_refresh([stamp.pk])
+                return add_validators(Response(status=304), request, etag, stamp.updated_at)
+
+        # Document dựng sẵn: word + payload detail trong 1 query theo primary key
+        doc = documents.load(kwargs["pk"])
+        word = doc.word if doc else self.get_object()
+
+        if doc is None or not documents.is_complete(doc.data):
+            # Còn meaning chưa có example -> enrich (câu đã lưu trước, rồi Tatoeba)
+            if needs_examples(word):
+                start = time.perf_counter()
+                _fill_examples_for_word(word, per_meaning=3)
+                logger.info(f"[TIMING] DetailView fetch examples: {(time.perf_counter() - start) * 1000:.2f}ms")
+            # enrich có thêm example thì document đã được build lại
+            doc = documents.get_or_build(word.id)
+
+        # Dữ liệu quá hạn -> trả bản hiện tại, refresh nền từ Jisho
+        if is_stale(word):
+            schedule_refresh([word.id])
+
+        etag = make_etag(request, "w", word.id, doc.version)
+        if is_not_modified(request, etag, doc.updated_at):
+            response = Response(status=304)
+        else:
+            response = Response(attach_request_fields(doc.data, word.id, self.get_serializer_context()))
+        return add_validators(response, request, etag, doc.updated_at)
@@ -0,0 +1,88 @@
+import gzip
+import time
+from types import SimpleNamespace
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Prefetch
+from rest_framework.renderers import JSONRenderer
+
+from core.middleware import BROTLI_QUALITY, brotli
+from core.models import Favorite, Word, WordMeaning
+from core.renderers import ORJSONRenderer, stream_json_list
+from core.serializers.word import WordSerializer
+
+
+class _QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark payload size and serialization time of the favorites list "
+        "(old DRF JSON path vs prefetch + orjson streaming). Read-only."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", help="Username whose favorites are rendered.")
+        parser.add_argument(
+            "--limit", type=int, default=1000,
+            help="Without --user: render the first N words of the dictionary (default 1000).",
+        )
+        parser.add_argument("--repeat", type=int, default=3, help="Best of N runs (default 3).")
+
+    def handle(self, *args, **opts):
+        if opts["user"]:
+            try:
+                user = get_user_model().objects.get(username=opts["user"])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"User {opts['user']} not found")
+            base = Word.objects.filter(favorite__user=user).distinct()
+        else:
+            user = SimpleNamespace(is_authenticated=True, id=None, pk=None)
+            ids = list(Word.objects.order_by("id").values_list("id", flat=True)[:opts["limit"]])
+            base = Word.objects.filter(id__in=ids)
+
+        request = SimpleNamespace(user=user)
+
+        def before():
+            data = WordSerializer(base, many=True, context={"request": request}).data
+            return JSONRenderer().render(data)
+
+        def after():
+            qs = base.prefetch_related(
+                Prefetch("meanings", queryset=WordMeaning.objects.prefetch_related("examples"))
+            )
+            favorited = set(
+                Favorite.objects.filter(user_id=user.id).values_list("word_id", flat=True)
+            )
+            context = {"request": request, "favorited_ids": favorited}
+            return b"".join(stream_json_list(qs, WordSerializer, context))
+
+        def orjson_only():
+            data = WordSerializer(base, many=True, context={"request": request}).data
+            return ORJSONRenderer().render(data)
+
+        for label, fn in (("before (DRF JSON)", before),
+                          ("orjson renderer only", orjson_only),
+                          ("after (prefetch + orjson stream)", after)):
+            best, body, queries = None, b"", 0
+            for _ in range(opts["repeat"]):
+                counter = _QueryCounter()
+                with connection.execute_wrapper(counter):
+                    start = time.perf_counter()
+                    body = fn()
+                    elapsed = time.perf_counter() - start
+                queries = counter.count
+                best = elapsed if best is None else min(best, elapsed)
+
+            sizes = f"raw={len(body):,}B gzip={len(gzip.compress(body)):,}B"
+            if brotli is not None:
+                sizes += f" br={len(brotli.compress(body, quality=BROTLI_QUALITY)):,}B"
+            self.stdout.write(f"{label:<34} {best * 1000:9.2f}ms  queries={queries:<5} {sizes}")
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from core.services.bundle import build_bundle, delta
+
+
+class Command(BaseCommand):
+    help = "Build (incrementally by default) the offline dictionary bundle and publish a new version."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full", action="store_true",
+            help="Rebuild from scratch (picks up deleted words, compacts the file).",
+        )
+
+    def handle(self, *args, **opts):
+        manifest = build_bundle(full=opts["full"])
+        if manifest is None:
+            self.stdout.write("No changes since the last build")
+            return
+
+        version = manifest["version"]
+        line = (
+            f"v{version}: {manifest['word_count']} words, {manifest['size']:,} bytes, "
+            f"{len(manifest['chunks'])} chunks"
+        )
+        if version > 1:
+            patch = delta(version - 1)
+            if patch["from_version"]:
+                line += f", delta from v{version - 1}: {len(patch['download'])} chunks / {patch['download_bytes']:,} bytes"
+        self.stdout.write(line)
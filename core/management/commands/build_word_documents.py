@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from core.models import Word
+from core.services.documents import BATCH_SIZE, rebuild_documents
+
+
+class Command(BaseCommand):
+    help = "Rebuild the precomputed word-detail documents (only changed documents are written)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--missing", action="store_true",
+            help="Only build documents for words that do not have one yet.",
+        )
+
+    def handle(self, *args, **opts):
+        qs = Word.objects.order_by("id")
+        if opts["missing"]:
+            qs = qs.filter(document__isnull=True)
+        ids = list(qs.values_list("id", flat=True))
+
+        for start in range(0, len(ids), BATCH_SIZE):
+            rebuild_documents(ids[start:start + BATCH_SIZE])
+        self.stdout.write(f"Checked documents for {len(ids)} words")
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from core.models import ExampleSentence
+from core.services.sentences import BATCH_SIZE, index_sentences
+
+
+class Command(BaseCommand):
+    help = "Build the token -> sentence posting index for stored example sentences."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all", action="store_true",
+            help="Re-index every sentence (picks up words added to the dictionary since), "
+                 "not only sentences that were never indexed.",
+        )
+
+    def handle(self, *args, **opts):
+        qs = ExampleSentence.objects.only("id", "jp").order_by("id")
+        if not opts["all"]:
+            qs = qs.filter(indexed=False)
+
+        batch, sentences, postings = [], 0, 0
+        for sentence in qs.iterator(chunk_size=BATCH_SIZE):
+            batch.append(sentence)
+            if len(batch) >= BATCH_SIZE:
+                postings += index_sentences(batch)
+                sentences += len(batch)
+                batch = []
+        if batch:
+            postings += index_sentences(batch)
+            sentences += len(batch)
+
+        self.stdout.write(f"Indexed {sentences} sentences ({postings} postings)")
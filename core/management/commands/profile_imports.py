@@ -0,0 +1,68 @@
+import os
+import re
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# SDK nặng chỉ được import lúc dùng lần đầu (quiz / translate), không được xuất hiện lúc boot
+LAZY_MODULES = ("google.generativeai", "deep_translator")
+
+# Giống lúc worker boot: load WSGI app + resolve toàn bộ URLconf (import mọi view / service)
+BOOT_SCRIPT = (
+    "import backend.wsgi\n"
+    "from django.urls import get_resolver\n"
+    "get_resolver().url_patterns\n"
+)
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+class Command(BaseCommand):
+    help = (
+        "Report import time of a fresh worker boot (python -X importtime), grouped by "
+        "top-level package, and check that heavy SDKs are not imported eagerly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=15, help="Number of packages / modules to list (default 15).")
+
+    def handle(self, *args, **opts):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get("DJANGO_SETTINGS_MODULE", "backend.settings"))
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", BOOT_SCRIPT],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if proc.returncode:
+            raise CommandError(f"Boot failed:\n{proc.stderr[-2000:]}")
+
+        by_package: dict[str, int] = {}
+        cumulative: dict[str, int] = {}
+        for line in proc.stderr.splitlines():
+            m = _LINE.match(line)
+            if not m:
+                continue
+            self_us, cum_us, _, name = int(m[1]), int(m[2]), m[3], m[4]
+            root = name.split(".")[0]
+            by_package[root] = by_package.get(root, 0) + self_us
+            cumulative[name] = cum_us
+
+        total = sum(by_package.values())
+        top = opts["top"]
+        self.stdout.write(f"Total import time: {total / 1000:.1f} ms ({len(cumulative)} modules)\n")
+
+        self.stdout.write("By top-level package (self time):")
+        for root, us in sorted(by_package.items(), key=lambda kv: -kv[1])[:top]:
+            self.stdout.write(f"  {us / 1000:8.1f} ms  {100 * us / total:5.1f}%  {root}")
+
+        self.stdout.write("\nProject modules (cumulative):")
+        ours = {n: us for n, us in cumulative.items() if n.split(".")[0] in ("core", "backend")}
+        for name, us in sorted(ours.items(), key=lambda kv: -kv[1])[:top]:
+            self.stdout.write(f"  {us / 1000:8.1f} ms  {name}")
+
+        eager = [m for m in LAZY_MODULES if m in cumulative]
+        if eager:
+            self.stderr.write(self.style.WARNING(f"\nImported at boot but expected lazy: {', '.join(eager)}"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"\nLazy SDKs not imported at boot: {', '.join(LAZY_MODULES)}"))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core.services.mailer import purge_emails, purge_reset_tokens
+
+
+class Command(BaseCommand):
+    help = "Delete expired or used password reset tokens and old sent/failed outbound emails."
+
+    def handle(self, *args, **opts):
+        self.stdout.write(f"Purged {purge_reset_tokens()} reset tokens")
+        self.stdout.write(f"Purged {purge_emails()} outbound emails")
@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from core.services.sync import TOMBSTONE_TTL, purge_tombstones
+
+
+class Command(BaseCommand):
+    help = "Delete delta-sync tombstones older than the cursor lifetime (clients older than that do a full resync)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, default=TOMBSTONE_TTL.days,
+            help=f"Minimum tombstone age in days (default {TOMBSTONE_TTL.days}).",
+        )
+
+    def handle(self, *args, **opts):
+        days = max(opts["days"], TOMBSTONE_TTL.days)
+        if days != opts["days"]:
+            self.stderr.write(f"--days raised to {days}: cursors stay valid for {TOMBSTONE_TTL.days} days")
+        deleted = purge_tombstones(timedelta(days=days))
+        self.stdout.write(f"Purged {deleted} tombstones")
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from core.services.quiz import LEVEL_INFO, normalize_level
+from core.services.quiz_bank import TARGET_SIZE, refill_bank
+
+
+class Command(BaseCommand):
+    help = "Top up the pre-generated JLPT quiz question bank (Gemini) for each level."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--level", action="append",
+            help="JLPT level to refill (N5..N1). Repeatable; default: all levels.",
+        )
+        parser.add_argument(
+            "--target", type=int, default=TARGET_SIZE,
+            help=f"Number of questions to keep per level (default {TARGET_SIZE}).",
+        )
+
+    def handle(self, *args, **opts):
+        levels = [normalize_level(l) for l in opts["level"] or LEVEL_INFO]
+
+        for level in levels:
+            if level not in LEVEL_INFO:
+                self.stderr.write(f"Skipping unknown level {level}")
+                continue
+            try:
+                added = refill_bank(level, target=opts["target"])
+            except Exception as e:
+                self.stderr.write(f"{level}: refill failed: {e}")
+                continue
+            self.stdout.write(f"{level}: +{added} questions")
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core.services.ranking import refresh_scores
+
+
+class Command(BaseCommand):
+    help = "Recompute search ranking scores (commonness + SearchHistory popularity) for all words."
+
+    def handle(self, *args, **opts):
+        updated = refresh_scores()
+        self.stdout.write(f"Updated scores for {updated} words")
@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.services.mailer import send_pending
+
+
+class Command(BaseCommand):
+    help = "Deliver queued outbound emails (password reset...), retrying failures with backoff."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true",
+            help="Send everything that is due, then exit (for cron).",
+        )
+        parser.add_argument(
+            "--interval", type=float, default=5.0,
+            help="Seconds between polls when running as a worker (default 5).",
+        )
+
+    def handle(self, *args, **opts):
+        if opts["once"]:
+            self.stdout.write(f"Processed {send_pending()} emails")
+            return
+
+        self.stdout.write("Email worker started")
+        while True:
+            close_old_connections()
+            try:
+                sent = send_pending()
+            except Exception as e:
+                # DB tạm lỗi -> thử lại ở vòng sau, worker không chết
+                self.stderr.write(f"Send failed: {e}")
+                sent = 0
+            if sent:
+                self.stdout.write(f"Processed {sent} emails")
+            else:
+                time.sleep(opts["interval"])
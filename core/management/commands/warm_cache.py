@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.services.query_stats import flush_query_counts, purge_query_counts, top_queries
+from core.services.warming import warm_jlpt_words, warm_queries
+
+
+class Command(BaseCommand):
+    help = (
+        "Off-peak warming: ingest and enrich the most searched queries and all JLPT-tagged "
+        "words so peak traffic is served from the database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, default=7,
+            help="Rank queries by search count over the last N days (default 7).",
+        )
+        parser.add_argument(
+            "--top", type=int, default=500,
+            help="Number of top queries to warm (default 500).",
+        )
+        parser.add_argument(
+            "--skip-jlpt", action="store_true",
+            help="Only warm top queries, not JLPT-tagged words.",
+        )
+        parser.add_argument(
+            "--max-minutes", type=int, default=180,
+            help="Stop starting new work after this many minutes (default 180).",
+        )
+
+    def handle(self, *args, **opts):
+        deadline = time.monotonic() + opts["max_minutes"] * 60
+        flush_query_counts()
+
+        queries = [q for q, _ in top_queries(days=opts["days"], limit=opts["top"])]
+        stats = warm_queries(queries, deadline=deadline)
+        self.stdout.write(
+            f"Queries: {stats['queries']}/{len(queries)} warmed, {stats['enriched']} words enriched"
+        )
+
+        if not opts["skip_jlpt"]:
+            stats = warm_jlpt_words(deadline=deadline)
+            self.stdout.write(
+                f"JLPT words: {stats['candidates']} candidates, {stats['refreshed']} refreshed, "
+                f"{stats['enriched']} enriched"
+            )
+
+        if time.monotonic() >= deadline:
+            self.stderr.write("Stopped at --max-minutes; the rest is picked up on the next run")
+
+        purged = purge_query_counts()
+        self.stdout.write(f"Purged {purged} old query rollup rows")
@@ -0,0 +1,75 @@
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+
+try:
+    import brotli
+except ImportError:  # không có brotli -> chỉ gzip
+    brotli = None
+
+re_accepts_br = _lazy_re_compile(r"\bbr\b")
+
+BROTLI_QUALITY = 4  # response động: ưu tiên tốc độ nén
+
+
+def _brotli_sequence(sequence):
+    compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+    for chunk in sequence:
+        data = compressor.process(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Nén response theo Accept-Encoding: brotli (br) nếu client hỗ trợ, ngược lại gzip.
+    Hỗ trợ cả StreamingHttpResponse (vd. favorites stream).
+    Response hỗ trợ Range (Accept-Ranges) giữ nguyên bytes gốc.
+    """
+
+    def process_response(self, request, response):
+        # Range request tính offset trên bytes gốc -> không nén (vd. chunk offline bundle)
+        if response.has_header("Accept-Ranges"):
+            return response
+
+        ae = request.META.get("HTTP_ACCEPT_ENCODING", "")
+        if brotli is None or not re_accepts_br.search(ae):
+            return super().process_response(request, response)
+
+        if not response.streaming and len(response.content) < 200:
+            return response
+        if response.has_header("Content-Encoding"):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+
+        if response.streaming:
+            if response.is_async:
+                original_iterator = response.streaming_content
+
+                async def brotli_wrapper():
+                    compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+                    async for chunk in original_iterator:
+                        data = compressor.process(chunk) + compressor.flush()
+                        if data:
+                            yield data
+                    yield compressor.finish()
+
+                response.streaming_content = brotli_wrapper()
+            else:
+                response.streaming_content = _brotli_sequence(response.streaming_content)
+            del response.headers["Content-Length"]
+        else:
+            compressed = brotli.compress(response.content, quality=BROTLI_QUALITY)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(response.content))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = "br"
+
+        return response
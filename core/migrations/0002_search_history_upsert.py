@@ -0,0 +1,50 @@
+# Generated by Django 5.2.5 on 2026-10-19 15:08
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def dedupe_search_history(apps, schema_editor):
+    """Giữ lại bản ghi mới nhất cho mỗi (user, word) trước khi thêm unique constraint."""
+    SearchHistory = apps.get_model("core", "SearchHistory")
+    seen = set()
+    stale = []
+    for pk, user_id, word_id in SearchHistory.objects.order_by(
+        "-searched_at", "-id"
+    ).values_list("id", "user_id", "word_id"):
+        if (user_id, word_id) in seen:
+            stale.append(pk)
+        else:
+            seen.add((user_id, word_id))
+    if stale:
+        SearchHistory.objects.filter(id__in=stale).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="searchhistory",
+            name="searched_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name="searchhistory",
+            index=models.Index(
+                fields=["user", "-searched_at"],
+                include=("word",),
+                name="idx_history_user_recent",
+            ),
+        ),
+        migrations.RunPython(dedupe_search_history, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="searchhistory",
+            constraint=models.UniqueConstraint(
+                fields=("user", "word"), name="uq_search_history_user_word"
+            ),
+        ),
+    ]
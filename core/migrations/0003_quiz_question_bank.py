@@ -0,0 +1,38 @@
+# Generated by Django 5.2.5 on 2026-10-19 15:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0002_search_history_upsert"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="QuizQuestion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("level", models.CharField(max_length=10)),
+                ("sentence", models.TextField()),
+                ("sentence_hash", models.CharField(max_length=64, unique=True)),
+                ("choices", models.JSONField()),
+                ("correct_index", models.PositiveSmallIntegerField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["level"], name="idx_quiz_question_level")
+                ],
+            },
+        ),
+    ]
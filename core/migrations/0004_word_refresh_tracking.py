@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-19 15:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0003_quiz_question_bank"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="word",
+            name="fetched_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="word",
+            name="refreshed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,116 @@
+# Generated by Django 5.2.5 on 2026-10-19 15:25
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_sync_log(apps, schema_editor):
+    """Dữ liệu có sẵn -> 1 dòng upsert / object, để lần sync đầu trả đủ state."""
+    SyncChange = apps.get_model("core", "SyncChange")
+    Favorite = apps.get_model("core", "Favorite")
+    Flashcard = apps.get_model("core", "Flashcard")
+    FlashcardWord = apps.get_model("core", "FlashcardWord")
+    SearchHistory = apps.get_model("core", "SearchHistory")
+
+    def rows():
+        for f in Favorite.objects.values("id", "user_id", "word_id").iterator():
+            yield SyncChange(
+                user_id=f["user_id"],
+                entity="favorite",
+                object_id=f["id"],
+                op="upsert",
+                data={"word_id": f["word_id"]},
+            )
+        for fc in Flashcard.objects.values(
+            "id", "user_id", "name", "created_at"
+        ).iterator():
+            yield SyncChange(
+                user_id=fc["user_id"],
+                entity="flashcard",
+                object_id=fc["id"],
+                op="upsert",
+                data={"name": fc["name"], "created_at": fc["created_at"].isoformat()},
+            )
+        for item in FlashcardWord.objects.values(
+            "id", "flashcard_id", "flashcard__user_id", "word_id"
+        ).iterator():
+            yield SyncChange(
+                user_id=item["flashcard__user_id"],
+                entity="flashcard_word",
+                object_id=item["id"],
+                op="upsert",
+                data={"flashcard_id": item["flashcard_id"], "word_id": item["word_id"]},
+            )
+        for h in SearchHistory.objects.values(
+            "user_id", "word_id", "searched_at"
+        ).iterator():
+            yield SyncChange(
+                user_id=h["user_id"],
+                entity="history",
+                object_id=h["word_id"],
+                op="upsert",
+                data={"searched_at": h["searched_at"].isoformat()},
+            )
+
+    batch = []
+    for row in rows():
+        batch.append(row)
+        if len(batch) >= 1000:
+            SyncChange.objects.bulk_create(batch)
+            batch = []
+    SyncChange.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0004_word_refresh_tracking"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SyncChange",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("entity", models.CharField(max_length=20)),
+                ("object_id", models.BigIntegerField()),
+                (
+                    "op",
+                    models.CharField(
+                        choices=[("upsert", "upsert"), ("delete", "delete")],
+                        max_length=6,
+                    ),
+                ),
+                ("data", models.JSONField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="sync_changes",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["user", "id"], name="idx_sync_user_version"),
+                    models.Index(
+                        fields=["user", "entity", "object_id"],
+                        name="idx_sync_user_object",
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_sync_log, migrations.RunPython.noop),
+    ]
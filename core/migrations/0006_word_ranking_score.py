@@ -0,0 +1,71 @@
+# Generated by Django 5.2.5 on 2026-10-19 15:45
+
+import math
+
+from django.db import migrations, models
+from django.db.models import Count
+
+# Công thức chép cố định từ core.services.ranking tại thời điểm migration này
+# (migration không import code app: service đổi sau này không được làm đổi lịch sử)
+JLPT_WEIGHT = {"N5": 50, "N4": 40, "N3": 30, "N2": 20, "N1": 10}
+POPULARITY_WEIGHT = 10
+POPULARITY_CAP = 100
+
+
+def _score(jlpt_level, search_count):
+    score = JLPT_WEIGHT.get((jlpt_level or "").upper(), 0)
+    score += min(POPULARITY_CAP, int(POPULARITY_WEIGHT * math.log2(1 + search_count)))
+    return score
+
+
+def backfill_scores(apps, schema_editor):
+    """Word có sẵn: score từ JLPT + popularity (is_common có sau lần refresh từ Jisho kế tiếp)."""
+    Word = apps.get_model("core", "Word")
+    SearchHistory = apps.get_model("core", "SearchHistory")
+
+    counts = dict(
+        SearchHistory.objects.values_list("word_id")
+        .annotate(n=Count("user_id", distinct=True))
+        .values_list("word_id", "n")
+    )
+
+    batch = []
+    for word in Word.objects.only("id", "jlpt_level").iterator(chunk_size=2000):
+        word.search_count = counts.get(word.id, 0)
+        word.score = _score(word.jlpt_level, word.search_count)
+        if word.score:
+            batch.append(word)
+        if len(batch) >= 2000:
+            Word.objects.bulk_update(batch, ["search_count", "score"])
+            batch = []
+    Word.objects.bulk_update(batch, ["search_count", "score"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0005_sync_change_log"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="word",
+            name="is_common",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="word",
+            name="score",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="word",
+            name="search_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name="word",
+            index=models.Index(fields=["-score", "id"], name="idx_word_score"),
+        ),
+        migrations.RunPython(backfill_scores, migrations.RunPython.noop),
+    ]
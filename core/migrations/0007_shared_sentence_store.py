@@ -0,0 +1,75 @@
+# Generated by Django 5.2.5 on 2026-10-19 15:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0006_word_ranking_score"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MeaningExample",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("added_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="SentenceToken",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("token", models.CharField(max_length=64)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="meaningexample",
+            name="meaning",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="example_links",
+                to="core.wordmeaning",
+            ),
+        ),
+        migrations.AddField(
+            model_name="meaningexample",
+            name="sentence",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="meaning_links",
+                to="core.examplesentence",
+            ),
+        ),
+        migrations.AddField(
+            model_name="sentencetoken",
+            name="sentence",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="tokens",
+                to="core.examplesentence",
+            ),
+        ),
+        migrations.RemoveConstraint(
+            model_name="examplesentence",
+            name="uq_example_by_sourceid",
+        ),
+    ]
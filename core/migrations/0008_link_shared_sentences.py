@@ -0,0 +1,45 @@
+from django.db import migrations
+
+
+def link_and_dedupe_sentences(apps, schema_editor):
+    """
+    Mỗi ExampleSentence cũ gắn với 1 meaning -> link qua MeaningExample;
+    câu trùng (source, source_id) gộp về bản có id nhỏ nhất, bản thừa bị xoá.
+    """
+    ExampleSentence = apps.get_model("core", "ExampleSentence")
+    MeaningExample = apps.get_model("core", "MeaningExample")
+
+    keep: dict[tuple, int] = {}
+    links: set[tuple[int, int]] = set()
+    duplicates = []
+    rows = ExampleSentence.objects.order_by("id").values_list(
+        "id", "meaning_id", "source", "source_id"
+    )
+    for sentence_id, meaning_id, source, source_id in rows.iterator(chunk_size=2000):
+        key = (source, source_id) if source_id else ("", sentence_id)
+        kept = keep.setdefault(key, sentence_id)
+        if kept != sentence_id:
+            duplicates.append(sentence_id)
+        links.add((meaning_id, kept))
+
+    MeaningExample.objects.bulk_create(
+        [MeaningExample(meaning_id=m, sentence_id=s) for m, s in sorted(links)],
+        batch_size=2000,
+    )
+    for start in range(0, len(duplicates), 2000):
+        ExampleSentence.objects.filter(id__in=duplicates[start : start + 2000]).delete()
+
+
+class Migration(migrations.Migration):
+    """
+    Bước data tách riêng: FK của Postgres là DEFERRABLE INITIALLY DEFERRED, ALTER TABLE
+    trong cùng transaction với INSERT/DELETE ở đây lỗi "pending trigger events".
+    """
+
+    dependencies = [
+        ("core", "0007_shared_sentence_store"),
+    ]
+
+    operations = [
+        migrations.RunPython(link_and_dedupe_sentences, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0008_link_shared_sentences"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="examplesentence",
+            name="meaning",
+        ),
+        migrations.AddConstraint(
+            model_name="examplesentence",
+            constraint=models.UniqueConstraint(
+                fields=("source", "source_id"), name="uq_sentence_by_sourceid"
+            ),
+        ),
+        migrations.AddField(
+            model_name="wordmeaning",
+            name="examples",
+            field=models.ManyToManyField(
+                related_name="meanings",
+                through="core.MeaningExample",
+                to="core.examplesentence",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="meaningexample",
+            constraint=models.UniqueConstraint(
+                fields=("meaning", "sentence"), name="uq_meaning_example"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="sentencetoken",
+            constraint=models.UniqueConstraint(
+                fields=("token", "sentence"), name="uq_sentence_token"
+            ),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.5 on 2026-10-19 16:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0009_shared_sentence_constraints"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WordDocument",
+            fields=[
+                (
+                    "word",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="document",
+                        serialize=False,
+                        to="core.word",
+                    ),
+                ),
+                ("version", models.PositiveIntegerField(default=1)),
+                ("data", models.JSONField()),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
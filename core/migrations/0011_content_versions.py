@@ -0,0 +1,48 @@
+# Generated by Django 5.2.5 on 2026-10-19 16:03
+
+from django.db import migrations, models
+
+
+def backfill_complete(apps, schema_editor):
+    WordDocument = apps.get_model("core", "WordDocument")
+    batch = []
+    for doc in WordDocument.objects.only("word_id", "data").iterator(chunk_size=500):
+        doc.complete = all(m["examples"] for m in doc.data["meanings"])
+        batch.append(doc)
+        if len(batch) >= 500:
+            WordDocument.objects.bulk_update(batch, ["complete"])
+            batch = []
+    WordDocument.objects.bulk_update(batch, ["complete"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0010_word_document"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ContentVersion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("key", models.CharField(max_length=64, unique=True)),
+                ("version", models.PositiveBigIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="worddocument",
+            name="complete",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(backfill_complete, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.5 on 2026-10-19 16:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0012_rate_limit_bucket"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchQueryCount",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("query", models.CharField(max_length=64)),
+                ("day", models.DateField()),
+                ("count", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("day", "query"), name="uq_search_query_day"
+                    )
+                ],
+            },
+        ),
+    ]
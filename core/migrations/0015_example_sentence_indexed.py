@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-19 16:30
+
+from django.db import migrations, models
+
+
+def mark_indexed(apps, schema_editor):
+    """Câu đã có posting coi như đã index; câu chưa có token sẽ được index_sentences xử lý 1 lần."""
+    ExampleSentence = apps.get_model("core", "ExampleSentence")
+    SentenceToken = apps.get_model("core", "SentenceToken")
+    ExampleSentence.objects.filter(
+        id__in=SentenceToken.objects.values("sentence_id")
+    ).update(indexed=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0014_outbound_email_queue"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="examplesentence",
+            name="indexed",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(mark_indexed, migrations.RunPython.noop),
+    ]
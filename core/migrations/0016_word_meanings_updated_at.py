@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-19 16:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0015_example_sentence_indexed"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="word",
+            name="meanings_updated_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
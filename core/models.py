@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from django.utils import timezone
 
 class User(AbstractUser):
     # giữ username/email như mặc định; thêm role
@@ -12,6 +13,18 @@ class Word(models.Model):
     parts_of_speech = models.CharField(max_length=255)
     jlpt_level = models.CharField(max_length=10, null=True, blank=True)
     is_cached = models.BooleanField(default=False)
+    fetched_at = models.DateTimeField(null=True, blank=True)     # lần đầu lấy từ Jisho
+    refreshed_at = models.DateTimeField(null=True, blank=True)   # lần cuối re-ingest từ Jisho
+    meanings_updated_at = models.DateTimeField(null=True, blank=True)  # lần cuối ingest thêm / bớt meaning
+    # ranking (xem services/ranking.py): score = commonness + popularity, tính trước
+    is_common = models.BooleanField(default=False)               # JMdict priority (Jisho is_common)
+    search_count = models.PositiveIntegerField(default=0)        # số user đã search word này
+    score = models.IntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-score', 'id'], name='idx_word_score'),
+        ]
 
     def __str__(self): return self.kanji or self.kana or "word"
 
@@ -19,11 +32,66 @@ class WordMeaning(models.Model):
     word = models.ForeignKey(Word, on_delete=models.CASCADE, related_name='meanings')
     meaning = models.TextField()
     example_sentence = models.TextField(null=True, blank=True)
+    examples = models.ManyToManyField(
+        'core.ExampleSentence', through='core.MeaningExample', related_name='meanings'
+    )
+
+class WordDocument(models.Model):
+    """
+    Payload detail dựng sẵn của 1 Word (WordSerializer, không gồm field theo request):
+    detail đọc đúng 1 row theo primary key. Build lại khi meanings / examples đổi;
+    version chỉ tăng khi nội dung thật sự khác.
+    """
+    word = models.OneToOneField(Word, on_delete=models.CASCADE, primary_key=True, related_name='document')
+    version = models.PositiveIntegerField(default=1)
+    data = models.JSONField()
+    # mọi meaning đã có example (không cần enrich) -> detail trả 304 được mà không đọc data
+    complete = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+
+class ContentVersion(models.Model):
+    """
+    Version stamp của resource dạng list (vd. "jlpt:N5"), tăng mỗi lần nội dung đổi:
+    ETag tính được mà không cần load list.
+    """
+    key = models.CharField(max_length=64, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
 
 class SearchHistory(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='searches')
     word = models.ForeignKey(Word, on_delete=models.CASCADE)
-    searched_at = models.DateTimeField(auto_now_add=True)
+    # default thay cho auto_now_add: buffer ghi lại thời điểm search thật, upsert sẽ bump giá trị này
+    searched_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'word'], name='uq_search_history_user_word'),
+        ]
+        indexes = [
+            # top-30 history đọc thẳng từ index (user, searched_at DESC)
+            models.Index(
+                fields=['user', '-searched_at'],
+                include=['word'],
+                name='idx_history_user_recent',
+            ),
+        ]
+
+class SearchQueryCount(models.Model):
+    """
+    Rollup số lần search theo (query đã normalize, ngày), gồm cả user chưa login.
+    Tăng theo batch (services/query_stats.py); warm_cache đọc top query từ đây.
+    """
+    query = models.CharField(max_length=64)
+    day = models.DateField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'query'], name='uq_search_query_day'),
+        ]
 
 class Favorite(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='favorites')
@@ -40,31 +108,105 @@ class FlashcardWord(models.Model):
     flashcard = models.ForeignKey(Flashcard, on_delete=models.CASCADE, related_name='items')
     word = models.ForeignKey(Word, on_delete=models.CASCADE)
 
+class SyncChange(models.Model):
+    """
+    Change log per user cho delta sync (favorites, flashcards, history).
+    id tăng dần = version; mỗi object chỉ giữ bản ghi mới nhất (log đã compact),
+    nên các dòng "upsert" của user chính là state hiện tại.
+    """
+    OP_CHOICES = (('upsert', 'upsert'), ('delete', 'delete'))
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='sync_changes')
+    entity = models.CharField(max_length=20)       # favorite / flashcard / flashcard_word / history
+    object_id = models.BigIntegerField()           # history: word_id (unique theo user)
+    op = models.CharField(max_length=6, choices=OP_CHOICES)
+    data = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # delta sync: WHERE user_id = ? AND id > cursor ORDER BY id
+            models.Index(fields=['user', 'id'], name='idx_sync_user_version'),
+            models.Index(fields=['user', 'entity', 'object_id'], name='idx_sync_user_object'),
+        ]
+
 class ExampleSentence(models.Model):
-    meaning = models.ForeignKey(
-        'core.WordMeaning', on_delete=models.CASCADE, related_name='examples'
-    )
+    """
+    Câu ví dụ dùng chung: 1 câu Tatoeba minh hoạ nhiều word chỉ lưu 1 lần,
+    gắn với từng meaning qua MeaningExample.
+    """
     jp = models.TextField()                         # câu JP
     en = models.TextField(null=True, blank=True)    # câu EN (nếu có)
     source = models.CharField(max_length=32, default='tatoeba')
     source_id = models.CharField(max_length=64, null=True, blank=True, db_index=True)
     added_at = models.DateTimeField(auto_now_add=True)
+    # đã segment vào SentenceToken (câu không có token nào vẫn True -> không segment lại mỗi deploy)
+    indexed = models.BooleanField(default=False)
 
     class Meta:
         constraints = [
             # Nếu source_id có giá trị (Tatoeba có id), unique theo id là đủ.
             models.UniqueConstraint(
-                fields=['meaning', 'source', 'source_id'],
-                name='uq_example_by_sourceid'
+                fields=['source', 'source_id'],
+                name='uq_sentence_by_sourceid'
             ),
         ]
 
 
+class MeaningExample(models.Model):
+    """Link meaning <-> câu ví dụ (through table của WordMeaning.examples)."""
+    meaning = models.ForeignKey(WordMeaning, on_delete=models.CASCADE, related_name='example_links')
+    sentence = models.ForeignKey(ExampleSentence, on_delete=models.CASCADE, related_name='meaning_links')
+    added_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['meaning', 'sentence'], name='uq_meaning_example'),
+        ]
+
+
+class SentenceToken(models.Model):
+    """
+    Posting list token -> câu (build lúc insert câu): trả lời "câu nào đã lưu chứa từ X"
+    mà không cần gọi Tatoeba. Token = mặt chữ + thể gốc của các từ trong câu (theo segment).
+    """
+    token = models.CharField(max_length=64)
+    sentence = models.ForeignKey(ExampleSentence, on_delete=models.CASCADE, related_name='tokens')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['token', 'sentence'], name='uq_sentence_token'),
+        ]
+
+
+class RateLimitBucket(models.Model):
+    """Token bucket dùng chung cả cluster cho 1 upstream (xem services/ratelimit.py)."""
+    name = models.CharField(max_length=32, unique=True)
+    tokens = models.FloatField()
+    updated_at = models.FloatField()    # epoch giây của lần refill gần nhất
+
+
+class QuizQuestion(models.Model):
+    """Câu hỏi JLPT sinh sẵn (bởi Gemini) để endpoint quiz không phải chờ LLM."""
+    level = models.CharField(max_length=10)
+    sentence = models.TextField()
+    sentence_hash = models.CharField(max_length=64, unique=True)
+    choices = models.JSONField()
+    correct_index = models.PositiveSmallIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['level'], name='idx_quiz_question_level'),
+        ]
+
+    def __str__(self): return f"[{self.level}] {self.sentence}"
+
+
 # ======================================
 # Password Reset Token
 # ======================================
 import uuid
-from django.utils import timezone
 from datetime import timedelta
 
 class PasswordResetToken(models.Model):
@@ -74,6 +216,12 @@ class PasswordResetToken(models.Model):
     expires_at = models.DateTimeField()
     is_used = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            # forgot-password xoá token còn hiệu lực của user; purge xoá token hết hạn / đã dùng
+            models.Index(fields=['user', 'is_used', 'expires_at'], name='idx_reset_token_user'),
+        ]
+
     def save(self, *args, **kwargs):
         if not self.token:
             self.token = uuid.uuid4().hex
@@ -86,3 +234,32 @@ class PasswordResetToken(models.Model):
 
     def __str__(self):
         return f"Reset token for {self.user.email}"
+
+
+# ======================================
+# Outbound Email Queue
+# ======================================
+class OutboundEmail(models.Model):
+    """
+    Email chờ gửi (services/mailer.py): request chỉ insert 1 row, SMTP chạy ngoài request
+    (thread nền / command send_emails), lỗi thì retry với backoff.
+    """
+    STATUS_CHOICES = (('pending', 'pending'), ('sent', 'sent'), ('failed', 'failed'))
+
+    to = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    status = models.CharField(max_length=7, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # lần gửi kế tiếp; worker đang gửi đẩy mốc này lên (lease) để worker khác không gửi trùng
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='idx_email_due'),
+        ]
+
+    def __str__(self): return f"[{self.status}] {self.subject} -> {self.to}"
@@ -1,5 +1,10 @@
+from django.db.models import Prefetch
 from rest_framework import serializers
-from core.models import Word, WordMeaning, ExampleSentence, Favorite
+from core.models import Word, WordDocument, WordMeaning, ExampleSentence, Favorite
+from core.services import hotcache
+
+# field phụ thuộc request -> không nằm trong payload của hot cache
+REQUEST_FIELDS = ("is_favorited", "deinflection", "fuzzy")
 
 class ExampleSentenceSerializer(serializers.ModelSerializer):
     class Meta:
@@ -24,8 +29,88 @@ class WordSerializer(serializers.ModelSerializer):
             "is_cached", "meanings", "is_favorited"
         ]
 
+    def to_representation(self, obj):
+        data = super().to_representation(obj)
+        # Search bằng dạng chia -> kèm trace, vd. "past negative of 行く"
+        trace = self.context.get("deinflections", {}).get(obj.id)
+        if trace:
+            data["deinflection"] = trace
+        # Kết quả gần đúng (typo / romaji) -> kèm term đã khớp và edit distance
+        match = self.context.get("fuzzy", {}).get(obj.id)
+        if match:
+            data["fuzzy"] = match
+        return data
+
     def get_is_favorited(self, obj):
+        # View đã load sẵn tập word_id favorite của user -> không query theo từng word
+        favorited_ids = self.context.get("favorited_ids")
+        if favorited_ids is not None:
+            return obj.id in favorited_ids
+
         request = self.context.get("request")
         if request and request.user.is_authenticated:
             return Favorite.objects.filter(user=request.user, word=obj).exists()
         return False
+
+
+# ---------------------------------------------------------
+#  HOT CACHE: payload chung lấy từ mmap, field theo request gắn lại sau
+# ---------------------------------------------------------
+
+def _favorited_ids(word_ids, context) -> set:
+    favorited_ids = context.get("favorited_ids")
+    if favorited_ids is not None:
+        return favorited_ids
+    request = context.get("request")
+    if request and request.user.is_authenticated:
+        return set(
+            Favorite.objects.filter(user=request.user, word_id__in=word_ids)
+            .values_list("word_id", flat=True)
+        )
+    return set()
+
+
+def attach_request_fields(payload: dict, word_id: int, context, favorited: set | None = None) -> dict:
+    if favorited is None:
+        favorited = _favorited_ids([word_id], context)
+    data = dict(payload, is_favorited=word_id in favorited)
+    for field, key in (("deinflection", "deinflections"), ("fuzzy", "fuzzy")):
+        trace = context.get(key, {}).get(word_id)
+        if trace:
+            data[field] = trace
+    return data
+
+
+def cacheable(data) -> dict:
+    return {k: v for k, v in data.items() if k not in REQUEST_FIELDS}
+
+
+def serialize_words(word_ids: list[int], context) -> list[dict]:
+    """
+    Giống WordSerializer(many=True).data theo thứ tự word_ids, nhưng word nóng đọc từ
+    hot cache (không query meanings/examples, không serialize lại); miss -> WordDocument dựng
+    sẵn, chưa có document mới serialize. Payload từ DB được admit vào hot cache.
+    """
+    generation = hotcache.generation()
+    payloads = hotcache.get_many(word_ids)
+
+    misses = [wid for wid in word_ids if wid not in payloads]
+    if misses:
+        for wid, payload in WordDocument.objects.filter(pk__in=misses).values_list("word_id", "data"):
+            payloads[wid] = payload
+            hotcache.put(wid, payload, generation)
+        misses = [wid for wid in misses if wid not in payloads]
+    if misses:
+        words = Word.objects.filter(id__in=misses).prefetch_related(
+            Prefetch("meanings", queryset=WordMeaning.objects.all().prefetch_related("examples"))
+        )
+        for item in WordSerializer(words, many=True).data:
+            payload = cacheable(item)
+            payloads[item["id"]] = payload
+            hotcache.put(item["id"], payload, generation)
+
+    favorited = _favorited_ids(word_ids, context)
+    return [
+        attach_request_fields(payloads[wid], wid, context, favorited)
+        for wid in word_ids if wid in payloads
+    ]
@@ -0,0 +1,66 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.cache import cache
+from django.db import close_old_connections
+
+from .ratelimit import BACKGROUND, priority
+
+logger = logging.getLogger(__name__)
+
+MAX_WORKERS = 2
+LOCK_TIMEOUT = 600  # giây; lock tự hết hạn nếu worker chết giữa chừng
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="bg")
+    return _executor
+
+
+def run_in_background(key: str, fn, *args, **kwargs) -> bool:
+    """
+    Chạy fn(*args, **kwargs) trong thread nền của worker hiện tại.
+    `key` dùng để chống chạy trùng giữa các worker (lock trong cache dùng chung).
+    Trả về False nếu job cùng key đang chạy / đã được xếp hàng.
+    """
+    lock_key = f"bg:{key}"
+    if not cache.add(lock_key, 1, LOCK_TIMEOUT):
+        return False
+
+    def _job():
+        close_old_connections()
+        try:
+            # call upstream từ job nền nhường token cho request interactive
+            with priority(BACKGROUND):
+                fn(*args, **kwargs)
+        except Exception:
+            logger.exception(f"[BACKGROUND] job '{key}' failed")
+        finally:
+            cache.delete(lock_key)
+            close_old_connections()
+
+    _get_executor().submit(_job)
+    return True
+
+
+def is_queued(key: str) -> bool:
+    """Job cùng key đang chạy / đã xếp hàng (run_in_background sẽ trả về False)."""
+    return cache.get(f"bg:{key}") is not None
+
+
+def take_budget(name: str, per_minute: int) -> bool:
+    """
+    Budget dùng chung giữa các worker: tối đa `per_minute` lần / phút cho `name`.
+    (cache DB không incr atomic -> giới hạn gần đúng, đủ để chặn burst)
+    """
+    key = f"budget:{name}:{int(time.time() // 60)}"
+    cache.add(key, 0, 120)
+    try:
+        return cache.incr(key) <= per_minute
+    except ValueError:
+        return False
@@ -0,0 +1,260 @@
+import logging
+import threading
+import time
+from collections import deque
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+
+from .ratelimit import RateLimiter, RateLimitExceeded, retry_after_seconds
+
+logger = logging.getLogger(__name__)
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Upstream đang bị ngắt (breaker open) -> fail fast, không gọi mạng."""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker cho 1 upstream (closed -> open -> half_open -> closed).
+
+    - State (failures, opened_at) nằm trong cache dùng chung -> mọi worker cùng thấy
+      upstream đang lỗi; đọc lại tối đa mỗi STATE_TTL giây để không tốn query mỗi call.
+      failures là counter riêng (cache.add + cache.incr) -> lỗi đồng thời ở nhiều worker
+      không ghi đè lẫn nhau như get/set cả dict.
+    - Timeout tự điều chỉnh theo p99 latency quan sát được (theo từng process).
+    - Mỗi call lấy 1 token của rate limiter dùng chung (nếu có); hết chờ -> CircuitOpenError
+      như upstream đang ngắt, caller dùng dữ liệu local.
+    """
+
+    STATE_TTL = 1.0
+    WINDOW = 200        # số mẫu latency giữ lại
+    MIN_SAMPLES = 20    # chưa đủ mẫu -> dùng max_timeout
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30,
+                 min_timeout=2.0, max_timeout=10.0, limiter: RateLimiter | None = None):
+        self.name = name
+        self.limiter = limiter
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+
+        self._key = f"breaker:{name}"
+        self._failures_key = f"breaker:{name}:failures"
+        self._probe_key = f"breaker:{name}:probe"
+        self._latencies = deque(maxlen=self.WINDOW)
+        self._lock = threading.Lock()
+        self._local = None
+        self._local_at = 0.0
+
+    # -----------------------------
+    # shared state
+    # -----------------------------
+    def _state(self) -> dict:
+        now = time.monotonic()
+        if self._local is None or now - self._local_at > self.STATE_TTL:
+            shared = cache.get_many([self._key, self._failures_key])
+            self._local = {
+                "failures": shared.get(self._failures_key, 0),
+                "opened_at": (shared.get(self._key) or {}).get("opened_at"),
+            }
+            self._local_at = now
+        return self._local
+
+    def _remember(self, failures: int, opened_at: float | None) -> None:
+        self._local = {"failures": failures, "opened_at": opened_at}
+        self._local_at = time.monotonic()
+
+    @property
+    def state(self) -> str:
+        opened_at = self._state()["opened_at"]
+        if opened_at is None:
+            return CLOSED
+        if time.time() - opened_at >= self.reset_timeout:
+            return HALF_OPEN
+        return OPEN
+
+    def allow(self) -> bool:
+        return self._admit() is not None
+
+    def _admit(self) -> bool | None:
+        """None: bị chặn; True: call này giữ probe của half_open; False: closed, call bình thường."""
+        state = self.state
+        if state == CLOSED:
+            return False
+        if state == HALF_OPEN:
+            # chỉ 1 request (trên toàn cluster) được thử lại upstream
+            return True if cache.add(self._probe_key, 1, self.reset_timeout) else None
+        return None
+
+    def check(self) -> bool:
+        """Raise CircuitOpenError nếu bị chặn; True nếu call này là probe của half_open."""
+        probing = self._admit()
+        if probing is None:
+            raise CircuitOpenError(f"{self.name} is unavailable (circuit open)")
+        return probing
+
+    def _release_probe(self, probing: bool, settled: bool) -> None:
+        """
+        Probe kết thúc mà không thành công / không tính lỗi (rate limiter chặn, 4xx thường)
+        -> nhả probe key ngay, không thì half_open bị chặn tới khi key hết hạn.
+        """
+        if probing and not settled:
+            cache.delete(self._probe_key)
+
+    def _acquire(self) -> None:
+        if self.limiter is None:
+            return
+        try:
+            self.limiter.acquire()
+        except RateLimitExceeded as e:
+            raise CircuitOpenError(str(e)) from e
+
+    async def _acquire_async(self) -> None:
+        if self.limiter is None:
+            return
+        try:
+            await self.limiter.acquire_async()
+        except RateLimitExceeded as e:
+            raise CircuitOpenError(str(e)) from e
+
+    def _throttled(self, exc: Exception) -> None:
+        """429: cả cluster lùi lại qua bucket dùng chung."""
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+        if status == 429 and self.limiter is not None:
+            self.limiter.penalize(retry_after_seconds(exc))
+
+    # -----------------------------
+    # outcomes
+    # -----------------------------
+    def record_success(self, latency: float) -> None:
+        with self._lock:
+            self._latencies.append(latency)
+
+        state = self._state()
+        if state["failures"] or state["opened_at"] is not None:
+            if state["opened_at"] is not None:
+                logger.warning(f"[BREAKER] {self.name} closed")
+            cache.set(self._key, {"opened_at": None}, None)
+            cache.delete_many([self._failures_key, self._probe_key])
+            self._remember(0, None)
+
+    def record_failure(self) -> None:
+        cache.add(self._failures_key, 0, None)
+        try:
+            failures = cache.incr(self._failures_key)
+        except ValueError:
+            failures = 1  # worker khác vừa reset (success) giữa add và incr
+            cache.add(self._failures_key, failures, None)
+        opened_at = (cache.get(self._key) or {}).get("opened_at")
+
+        if opened_at is not None or failures >= self.failure_threshold:
+            # half_open probe lỗi hoặc vượt ngưỡng -> open (lại) từ bây giờ
+            if opened_at is None:
+                logger.warning(f"[BREAKER] {self.name} opened after {failures} failures")
+            opened_at = time.time()
+            cache.set(self._key, {"opened_at": opened_at}, None)
+            cache.delete(self._probe_key)
+
+        self._remember(failures, opened_at)
+
+    # -----------------------------
+    # wrappers: fn nhận timeout (giây) và thực hiện request upstream
+    # -----------------------------
+    def call(self, fn):
+        probing = self.check()
+        settled = False
+        try:
+            self._acquire()
+            start = time.perf_counter()
+            try:
+                result = fn(self.timeout())
+            except Exception as e:
+                if is_upstream_failure(e):
+                    settled = True
+                    self.record_failure()
+                    self._throttled(e)
+                raise
+            settled = True
+            self.record_success(time.perf_counter() - start)
+            return result
+        finally:
+            self._release_probe(probing, settled)
+
+    async def acall(self, fn):
+        # state nằm trong DB cache -> đi qua sync_to_async
+        probing = await sync_to_async(self.check)()
+        settled = False
+        try:
+            await self._acquire_async()
+            start = time.perf_counter()
+            try:
+                result = await fn(self.timeout())
+            except Exception as e:
+                if is_upstream_failure(e):
+                    settled = True
+                    await sync_to_async(self.record_failure)()
+                    await sync_to_async(self._throttled)(e)
+                raise
+            settled = True
+            await sync_to_async(self.record_success)(time.perf_counter() - start)
+            return result
+        finally:
+            if probing and not settled:
+                await sync_to_async(self._release_probe)(probing, settled)
+
+    # -----------------------------
+    # adaptive timeout
+    # -----------------------------
+    def percentile(self, p: float):
+        with self._lock:
+            samples = sorted(self._latencies)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+    def timeout(self) -> float:
+        if len(self._latencies) < self.MIN_SAMPLES:
+            return self.max_timeout
+        return max(self.min_timeout, min(self.max_timeout, self.percentile(0.99) * 3))
+
+    def snapshot(self) -> dict:
+        state = self._state()
+        data = {
+            "name": self.name,
+            "state": self.state,
+            "failures": state["failures"],
+            "timeout": round(self.timeout(), 3),
+            "samples": len(self._latencies),
+            "p50_ms": _ms(self.percentile(0.5)),
+            "p95_ms": _ms(self.percentile(0.95)),
+            "p99_ms": _ms(self.percentile(0.99)),
+        }
+        if self.limiter is not None:
+            data["rate_limit"] = self.limiter.snapshot()
+        return data
+
+
+def is_upstream_failure(exc: Exception) -> bool:
+    """Timeout / lỗi kết nối / 5xx / 429 tính là lỗi upstream; 4xx khác thì không."""
+    status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status is None or status >= 500 or status == 429
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 2)
+
+
+# ---------------------------------------------------------
+#  BREAKERS PER UPSTREAM
+# ---------------------------------------------------------
+
+JISHO = CircuitBreaker("jisho", limiter=RateLimiter("jisho"))
+TATOEBA = CircuitBreaker("tatoeba", limiter=RateLimiter("tatoeba"))
+KANJIAPI = CircuitBreaker("kanjiapi", max_timeout=8.0, limiter=RateLimiter("kanjiapi"))
+
+BREAKERS = [JISHO, TATOEBA, KANJIAPI]
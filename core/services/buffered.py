@@ -0,0 +1,75 @@
+"""
+Buffer ghi theo batch cho mỗi worker process (SearchHistory, rollup SearchQueryCount).
+
+Request chỉ ghi vào dict trong bộ nhớ dưới lock; buffer được flush khi đủ `size` entry,
+khi entry cũ nhất đã nằm quá `interval` giây, bởi thread nền (worker ít traffic vẫn flush
+đúng hạn) và lúc process thoát (atexit).
+"""
+import atexit
+import threading
+import time
+
+from django.db import close_old_connections
+
+
+class FlushBuffer:
+    def __init__(self, name: str, write, size: int, interval: float, factory=dict):
+        """
+        `write(pending)` nhận bản chụp buffer (dict) và tự xử lý lỗi;
+        `factory` tạo buffer rỗng (dict, Counter...).
+        """
+        self.name = name
+        self.write = write
+        self.size = size
+        self.interval = interval
+        self.items = factory()
+        self._since = 0.0
+        self._lock = threading.Lock()
+        self._flusher_started = False
+        atexit.register(self.flush)
+
+    def add(self, update) -> None:
+        """update(items) sửa buffer dưới lock; flush ngay nếu đã đủ size / quá interval."""
+        with self._lock:
+            if not self.items:
+                self._since = time.monotonic()
+            update(self.items)
+            should_flush = (
+                len(self.items) >= self.size
+                or time.monotonic() - self._since >= self.interval
+            )
+
+        self._ensure_flusher()
+
+        if should_flush:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self.items:
+                return
+            pending = dict(self.items)
+            self.items.clear()
+        self.write(pending)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.items.clear()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.interval)
+            if not self.items:
+                continue
+            close_old_connections()
+            self.flush()
+            close_old_connections()
+
+    def _ensure_flusher(self):
+        if self._flusher_started:
+            return
+        with self._lock:
+            if self._flusher_started:
+                return
+            self._flusher_started = True
+        threading.Thread(target=self._flush_loop, name=f"{self.name}-flush", daemon=True).start()
@@ -0,0 +1,341 @@
+"""
+Offline dictionary bundle: 1 file SQLite (FTS5) export từ Word / WordMeaning /
+ExampleSentence (+ link MeaningExample), cắt thành các chunk content-addressed (tên = sha256) để client
+chỉ tải lại những chunk đã đổi giữa 2 version.
+
+Layout trong OFFLINE_BUNDLE_DIR:
+    bundle.sqlite              bản build mới nhất (base cho lần update incremental)
+    chunks/<sha256>            nội dung chunk, immutable
+    manifests/<version>.json   danh sách chunk của từng version (giữ KEEP_VERSIONS bản)
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import ExampleSentence, MeaningExample, Word, WordMeaning
+from core.services.background import run_in_background
+
+logger = logging.getLogger(__name__)
+
+FORMAT = 2                  # 2: câu ví dụ dùng chung (sentence + meaning_example)
+CHUNK_SIZE = 64 * 1024      # bội số page_size -> 1 page đổi chỉ làm đổi 1 chunk
+PAGE_SIZE = 4096
+BATCH_SIZE = 2000
+KEEP_VERSIONS = 10
+UPDATE_INTERVAL = 300       # giây; ingest liên tục -> tối đa 1 lần update / 5 phút
+CLOCK_SKEW = timedelta(minutes=1)
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE word (id INTEGER PRIMARY KEY, kanji TEXT, kana TEXT, pos TEXT, jlpt TEXT);
+CREATE INDEX word_kanji ON word(kanji);
+CREATE INDEX word_kana ON word(kana);
+CREATE TABLE meaning (id INTEGER PRIMARY KEY, word_id INTEGER NOT NULL, meaning TEXT);
+CREATE INDEX meaning_word ON meaning(word_id);
+CREATE TABLE sentence (id INTEGER PRIMARY KEY, jp TEXT, en TEXT);
+CREATE TABLE meaning_example (meaning_id INTEGER NOT NULL, sentence_id INTEGER NOT NULL,
+                              PRIMARY KEY (meaning_id, sentence_id)) WITHOUT ROWID;
+CREATE INDEX meaning_example_sentence ON meaning_example(sentence_id);
+CREATE VIRTUAL TABLE word_fts USING fts5(kanji, kana, meanings, prefix='1 2 3');
+"""
+
+
+class BundleNotBuilt(LookupError):
+    pass
+
+
+def bundle_dir() -> str:
+    return settings.OFFLINE_BUNDLE_DIR
+
+
+def _path(*parts) -> str:
+    return os.path.join(bundle_dir(), *parts)
+
+
+# ---------------------------------------------------------
+#  EXPORT
+# ---------------------------------------------------------
+
+def _write_words(db, word_ids) -> None:
+    """Ghi (hoặc ghi đè) các word + meanings + examples theo batch id."""
+    for start in range(0, len(word_ids), BATCH_SIZE):
+        ids = word_ids[start:start + BATCH_SIZE]
+
+        words = list(
+            Word.objects.filter(id__in=ids)
+            .values_list("id", "kanji", "kana", "parts_of_speech", "jlpt_level")
+        )
+        meanings = list(
+            WordMeaning.objects.filter(word_id__in=ids)
+            .order_by("id")
+            .values_list("id", "word_id", "meaning")
+        )
+        links = list(
+            MeaningExample.objects.filter(meaning__word_id__in=ids)
+            .order_by("meaning_id", "sentence_id")
+            .values_list("meaning_id", "sentence_id")
+        )
+        sentences = list(
+            ExampleSentence.objects.filter(id__in={s for _, s in links})
+            .order_by("id")
+            .values_list("id", "jp", "en")
+        )
+
+        glosses: dict[int, list[str]] = {}
+        for _, word_id, meaning in meanings:
+            glosses.setdefault(word_id, []).append(meaning)
+
+        marks = ",".join("?" * len(ids))
+        db.execute(f"DELETE FROM meaning_example WHERE meaning_id IN "
+                   f"(SELECT id FROM meaning WHERE word_id IN ({marks}))", ids)
+        db.execute(f"DELETE FROM meaning WHERE word_id IN ({marks})", ids)
+        db.execute(f"DELETE FROM word_fts WHERE rowid IN ({marks})", ids)
+        db.execute(f"DELETE FROM word WHERE id IN ({marks})", ids)
+
+        db.executemany("INSERT INTO word VALUES (?, ?, ?, ?, ?)", words)
+        db.executemany("INSERT INTO meaning VALUES (?, ?, ?)", meanings)
+        db.executemany("INSERT OR REPLACE INTO sentence VALUES (?, ?, ?)", sentences)
+        db.executemany("INSERT INTO meaning_example VALUES (?, ?)", links)
+        db.executemany(
+            "INSERT INTO word_fts (rowid, kanji, kana, meanings) VALUES (?, ?, ?, ?)",
+            [(w[0], w[1] or "", w[2] or "", "; ".join(glosses.get(w[0], []))) for w in words],
+        )
+
+
+def _dirty_word_ids(since: datetime, max_word_id: int) -> list[int]:
+    """Word mới / refresh / có meaning hoặc example mới kể từ lần build trước."""
+    since = since - CLOCK_SKEW
+    ids = set(
+        Word.objects.filter(
+            Q(id__gt=max_word_id) | Q(fetched_at__gt=since) | Q(refreshed_at__gt=since)
+            | Q(meanings_updated_at__gt=since)
+        ).values_list("id", flat=True)
+    )
+    ids.update(
+        MeaningExample.objects.filter(added_at__gt=since)
+        .values_list("meaning__word_id", flat=True)
+    )
+    return sorted(ids)
+
+
+def _read_meta(db) -> dict:
+    return dict(db.execute("SELECT key, value FROM meta"))
+
+
+def _base_format(path: str) -> int:
+    """Format của bản build trước (đổi schema -> phải build full)."""
+    db = sqlite3.connect(path)
+    try:
+        return int(_read_meta(db).get("format", 0))
+    except sqlite3.Error:
+        return 0
+    finally:
+        db.close()
+
+
+def build_bundle(full: bool = False) -> dict | None:
+    """
+    Cập nhật bundle và phát hành version mới.
+    Mặc định incremental (copy bản trước, ghi đè word đã đổi -> phần lớn page giữ nguyên);
+    full=True build lại từ đầu (cần khi có word bị xoá).
+    Trả về manifest mới, hoặc None nếu không có gì thay đổi.
+    """
+    start = time.time()
+    os.makedirs(_path("chunks"), exist_ok=True)
+    os.makedirs(_path("manifests"), exist_ok=True)
+
+    base = _path("bundle.sqlite")
+    incremental = not full and os.path.exists(base) and _base_format(base) == FORMAT
+    built_at = timezone.now()
+
+    fd, tmp = tempfile.mkstemp(dir=bundle_dir(), suffix=".sqlite.tmp")
+    os.close(fd)
+
+    try:
+        if incremental:
+            shutil.copyfile(base, tmp)
+        else:
+            os.remove(tmp)
+
+        db = sqlite3.connect(tmp)
+        try:
+            if incremental:
+                meta = _read_meta(db)
+                word_ids = _dirty_word_ids(
+                    datetime.fromisoformat(meta["built_at"]), int(meta["max_word_id"])
+                )
+                if not word_ids:
+                    return None
+            else:
+                db.execute(f"PRAGMA page_size = {PAGE_SIZE}")
+                db.executescript(SCHEMA)
+                word_ids = list(Word.objects.order_by("id").values_list("id", flat=True))
+            version = _latest_version() + 1
+
+            with db:
+                _write_words(db, word_ids)
+                if incremental:
+                    # câu không còn meaning nào dùng (meaning bị thay khi refresh word)
+                    db.execute("DELETE FROM sentence WHERE id NOT IN "
+                               "(SELECT sentence_id FROM meaning_example)")
+                max_word_id = db.execute("SELECT COALESCE(MAX(id), 0) FROM word").fetchone()[0]
+                word_count = db.execute("SELECT COUNT(*) FROM word").fetchone()[0]
+                db.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", [
+                    ("format", str(FORMAT)),
+                    ("version", str(version)),
+                    ("built_at", built_at.isoformat()),
+                    ("max_word_id", str(max_word_id)),
+                    ("word_count", str(word_count)),
+                ])
+                if not incremental:
+                    db.execute("INSERT INTO word_fts(word_fts) VALUES ('optimize')")
+            if not incremental:
+                db.execute("VACUUM")
+        finally:
+            db.close()
+
+        manifest = _publish(tmp, version, built_at, word_count, len(word_ids))
+        os.replace(tmp, base)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+    _prune()
+    logger.info(
+        f"[TIMING] Offline bundle v{version} ({'incremental' if incremental else 'full'}, "
+        f"{len(word_ids)} words) built in {time.time() - start:.2f}s"
+    )
+    return manifest
+
+
+# ---------------------------------------------------------
+#  CHUNKS + MANIFEST
+# ---------------------------------------------------------
+
+def _publish(path: str, version: int, built_at, word_count: int, changed: int) -> dict:
+    file_hash = hashlib.sha256()
+    chunks = []
+
+    with open(path, "rb") as f:
+        while block := f.read(CHUNK_SIZE):
+            file_hash.update(block)
+            digest = hashlib.sha256(block).hexdigest()
+            chunks.append(digest)
+
+            target = _path("chunks", digest)
+            if not os.path.exists(target):
+                _atomic_write(target, block)
+
+    manifest = {
+        "format": FORMAT,
+        "version": version,
+        "built_at": built_at.isoformat(),
+        "word_count": word_count,
+        "changed_words": changed,
+        "size": os.path.getsize(path),
+        "sha256": file_hash.hexdigest(),
+        "chunk_size": CHUNK_SIZE,
+        "chunks": chunks,
+    }
+    _atomic_write(_path("manifests", f"{version}.json"), json.dumps(manifest).encode())
+    return manifest
+
+
+def _atomic_write(target: str, data: bytes) -> None:
+    tmp = f"{target}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, target)
+
+
+def _versions() -> list[int]:
+    try:
+        names = os.listdir(_path("manifests"))
+    except FileNotFoundError:
+        return []
+    return sorted(int(n[:-5]) for n in names if n.endswith(".json"))
+
+
+def _latest_version() -> int:
+    versions = _versions()
+    return versions[-1] if versions else 0
+
+
+def _prune() -> None:
+    """Giữ KEEP_VERSIONS manifest gần nhất, xoá chunk không còn được tham chiếu."""
+    versions = _versions()
+    for v in versions[:-KEEP_VERSIONS]:
+        os.remove(_path("manifests", f"{v}.json"))
+
+    live = set()
+    for v in versions[-KEEP_VERSIONS:]:
+        live.update(get_manifest(v)["chunks"])
+    for name in os.listdir(_path("chunks")):
+        if name not in live and not name.endswith(".tmp"):
+            os.remove(_path("chunks", name))
+
+
+def get_manifest(version: int | None = None) -> dict:
+    version = version or _latest_version()
+    try:
+        with open(_path("manifests", f"{version}.json"), "rb") as f:
+            return json.loads(f.read())
+    except FileNotFoundError:
+        raise BundleNotBuilt(f"Offline bundle version {version} not available")
+
+
+def delta(since: int | None) -> dict:
+    """
+    Manifest mới nhất + danh sách chunk client cần tải thêm.
+    since không còn (đã prune) hoặc None -> cần tải toàn bộ chunk.
+    """
+    manifest = get_manifest()
+    have = set()
+    if since:
+        try:
+            have = set(get_manifest(since)["chunks"])
+        except BundleNotBuilt:
+            since = None
+
+    sizes = {}
+    for i, digest in enumerate(manifest["chunks"]):
+        if digest not in have:
+            sizes[digest] = min(CHUNK_SIZE, manifest["size"] - i * CHUNK_SIZE)
+
+    return {
+        "from_version": since,
+        "manifest": manifest,
+        "download": list(sizes),
+        "download_bytes": sum(sizes.values()),
+    }
+
+
+def chunk_path(digest: str) -> str:
+    if len(digest) != 64 or not all(c in "0123456789abcdef" for c in digest):
+        raise BundleNotBuilt("Unknown chunk")
+    path = _path("chunks", digest)
+    if not os.path.exists(path):
+        raise BundleNotBuilt("Unknown chunk")
+    return path
+
+
+# ---------------------------------------------------------
+#  TRIGGER SAU INGEST
+# ---------------------------------------------------------
+
+def schedule_bundle_update() -> bool:
+    """Gọi sau ingest: update incremental trong thread nền, tối đa 1 lần / UPDATE_INTERVAL."""
+    if not cache.add("offline-bundle:debounce", 1, UPDATE_INTERVAL):
+        return False
+    return run_in_background("offline-bundle", build_bundle)
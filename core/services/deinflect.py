@@ -0,0 +1,254 @@
+"""
+Deinflector rule-based cho tiếng Nhật: 食べた / 行かなかった / 高くない -> thể từ điển,
+kèm trace (vd. "past negative of 行く") để search tra DB trước khi gọi Jisho.
+
+Mỗi rule: (suffix dạng chia, suffix thể gốc, type dạng chia, type thể gốc, lý do).
+Type là bitmask nhóm từ; dạng chia cũng có type (vd. 行かない chia như i-adjective)
+nên các rule nối tiếp được: 行かなかった -> 行かない -> 行く. Query ban đầu chưa rõ type
+nên mọi rule đều thử được.
+"""
+import logging
+from typing import NamedTuple
+
+from django.db.models import Q
+
+from core.models import Word
+
+logger = logging.getLogger(__name__)
+
+V1, V5, VS, VK, ADJ_I = 1, 2, 4, 8, 16
+# dạng không chia tiếp được (た, て, ます...): rule chỉ áp dụng cho chính query
+TERMINAL = 0
+
+MAX_CANDIDATES = 200
+MAX_DEPTH = 6
+IN_BATCH = 5000     # số term tối đa trong 1 câu IN (batch lookup)
+
+# parts_of_speech (theo Jisho) tương ứng từng type
+POS_MARKERS = {
+    V1: "Ichidan verb",
+    V5: "Godan verb",
+    VS: "Suru verb",
+    VK: "Kuru verb",
+    ADJ_I: "I-adjective",
+}
+
+
+class Candidate(NamedTuple):
+    term: str
+    type: int
+    reasons: tuple[str, ...]
+
+    @property
+    def description(self) -> str:
+        return f"{' '.join(self.reasons)} of {self.term}"
+
+
+# ---------------------------------------------------------
+#  RULES
+# ---------------------------------------------------------
+
+# đuôi godan: u -> (i, a, e, o, te, ta)
+GODAN = {
+    "く": ("き", "か", "け", "こ", "いて", "いた"),
+    "ぐ": ("ぎ", "が", "げ", "ご", "いで", "いだ"),
+    "す": ("し", "さ", "せ", "そ", "して", "した"),
+    "つ": ("ち", "た", "て", "と", "って", "った"),
+    "ぬ": ("に", "な", "ね", "の", "んで", "んだ"),
+    "ぶ": ("び", "ば", "べ", "ぼ", "んで", "んだ"),
+    "む": ("み", "ま", "め", "も", "んで", "んだ"),
+    "る": ("り", "ら", "れ", "ろ", "って", "った"),
+    "う": ("い", "わ", "え", "お", "って", "った"),
+}
+
+
+def _verb_forms(neg, cont, te, ta, cond, vol, imp=(), pot=(), pas=(), caus=(), zu=None):
+    """Các dạng chia của 1 động từ, dựng từ các gốc (stem) -> [(suffix, type dạng chia, lý do)]."""
+    forms = [
+        (neg + "ない", ADJ_I, "negative"),
+        (zu if zu is not None else neg + "ず", TERMINAL, "negative"),
+        (cont + "ます", TERMINAL, "polite"),
+        (cont + "ました", TERMINAL, "polite past"),
+        (cont + "ません", TERMINAL, "polite negative"),
+        (cont + "ませんでした", TERMINAL, "polite past negative"),
+        (cont + "ましょう", TERMINAL, "polite volitional"),
+        (cont + "たい", ADJ_I, "want"),
+        (cont + "すぎる", V1, "too much"),
+        (cont + "ながら", TERMINAL, "while"),
+        (ta, TERMINAL, "past"),
+        (ta + "ら", TERMINAL, "conditional"),
+        (ta + "り", TERMINAL, "tari"),
+        (te, TERMINAL, "te-form"),
+        (te + "いる", V1, "progressive"),
+        (te + "る", V1, "progressive"),
+        (te + "しまう", V5, "completed"),
+        (te + "ください", TERMINAL, "request"),
+        (cond + "ば", TERMINAL, "provisional"),
+        (vol, TERMINAL, "volitional"),
+    ]
+    forms += [(s, TERMINAL, "imperative") for s in imp]
+    forms += [(s, V1, "potential") for s in pot]
+    forms += [(s, V1, "passive") for s in pas]
+    forms += [(s, V1, "causative") for s in caus]
+    return forms
+
+
+def _build_rules():
+    rules = []
+
+    def add(base, out_type, forms):
+        for suffix, in_type, reason in forms:
+            rules.append((suffix, base, in_type, out_type, reason))
+
+    for u, (i, a, e, o, te, ta) in GODAN.items():
+        add(u, V5, _verb_forms(
+            neg=a, cont=i, te=te, ta=ta, cond=e, vol=o + "う",
+            imp=[e], pot=[e + "る"], pas=[a + "れる"], caus=[a + "せる"],
+        ))
+    # 行く: te/ta bất quy tắc
+    for base in ("行く", "いく"):
+        stem = base[:-1]
+        add(base, V5, [(stem + "って", TERMINAL, "te-form"), (stem + "った", TERMINAL, "past"),
+                       (stem + "ったら", TERMINAL, "conditional"), (stem + "っている", V1, "progressive")])
+
+    add("る", V1, _verb_forms(
+        neg="", cont="", te="て", ta="た", cond="れ", vol="よう",
+        imp=["ろ", "よ"], pot=["られる", "れる"], pas=["られる"], caus=["させる"],
+    ))
+    add("する", VS, _verb_forms(
+        neg="し", cont="し", te="して", ta="した", cond="すれ", vol="しよう",
+        imp=["しろ", "せよ"], pas=["される"], caus=["させる"], zu="せず",
+    ))
+    for base, stem, kuru_stem in (("くる", "こ", "き"), ("来る", "来", "来")):
+        add(base, VK, _verb_forms(
+            neg=stem, cont=kuru_stem, te=kuru_stem + "て", ta=kuru_stem + "た",
+            cond=base[:-1] + "れ", vol=stem + "よう", imp=[stem + "い"],
+            pot=[stem + "られる"], pas=[stem + "られる"], caus=[stem + "させる"], zu=stem + "ず",
+        ))
+
+    add("い", ADJ_I, [
+        ("くない", ADJ_I, "negative"),
+        ("かった", TERMINAL, "past"),
+        ("かったら", TERMINAL, "conditional"),
+        ("くて", TERMINAL, "te-form"),
+        ("く", TERMINAL, "adverbial"),
+        ("ければ", TERMINAL, "provisional"),
+        ("すぎる", V1, "too much"),
+        ("いです", TERMINAL, "polite"),
+        ("かったです", TERMINAL, "polite past"),
+    ])
+
+    # cùng 1 đuôi cho 2 nghĩa (ichidan られる: potential / passive) -> gộp lý do
+    merged: dict[tuple, list[str]] = {}
+    for suffix, base, in_type, out_type, reason in rules:
+        reasons = merged.setdefault((suffix, base, in_type, out_type), [])
+        if reason not in reasons:
+            reasons.append(reason)
+
+    by_suffix: dict[str, list[tuple]] = {}
+    for (suffix, base, in_type, out_type), reasons in merged.items():
+        by_suffix.setdefault(suffix, []).append(
+            (suffix, base, in_type, out_type, "/".join(reasons))
+        )
+    return by_suffix
+
+
+RULES = _build_rules()
+MAX_SUFFIX = max(map(len, RULES))
+
+
+# ---------------------------------------------------------
+#  DEINFLECT
+# ---------------------------------------------------------
+
+def deinflect(text: str) -> list[Candidate]:
+    """
+    BFS qua các rule: trả về mọi thể gốc có thể (kể cả chính text, reasons rỗng).
+    reasons xếp từ ngoài vào trong: 行かなかった -> ("past", "negative") của 行く.
+    """
+    results = [Candidate(text, TERMINAL, ())]
+    seen = {(text, TERMINAL)}
+
+    i = 0
+    while i < len(results) and len(results) < MAX_CANDIDATES:
+        cur = results[i]
+        i += 1
+        if len(cur.reasons) >= MAX_DEPTH:
+            continue
+
+        for n in range(1, min(MAX_SUFFIX, len(cur.term)) + 1):
+            suffix = cur.term[-n:]
+            for _, base, in_type, out_type, reason in RULES.get(suffix, ()):
+                if cur.reasons and not cur.type & in_type:
+                    continue
+                term = cur.term[:-n] + base
+                if term == base and len(base) < 2:
+                    continue  # chỉ còn đuôi, không còn thân từ
+                key = (term, out_type)
+                if key in seen:
+                    continue
+                seen.add(key)
+                results.append(Candidate(term, out_type, cur.reasons + (reason,)))
+
+    return results
+
+
+def _pos_matches(cand_type: int, pos: str) -> bool:
+    if not pos:
+        return True
+    return any(marker in pos for t, marker in POS_MARKERS.items() if cand_type & t)
+
+
+def lookup_deinflected(q: str) -> dict[int, dict]:
+    """
+    Tra tất cả thể gốc của q trong 1 query (kanji hoặc kana), lọc theo từ loại.
+    Trả về {word_id: trace}; mỗi word giữ trace ngắn nhất.
+    """
+    traces = lookup_deinflected_many([q]).get(q, {})
+    if traces:
+        logger.info(f"[SEARCH] deinflected '{q}' -> {len(traces)} words")
+    return traces
+
+
+def lookup_deinflected_many(queries) -> dict[str, dict[int, dict]]:
+    """Bản batch: thể gốc của mọi query tra chung (mỗi IN_BATCH term 1 query)."""
+    # term thể gốc -> [(query, candidate)]
+    by_term: dict[str, list[tuple[str, Candidate]]] = {}
+    for q in queries:
+        for c in deinflect(q):
+            if not c.reasons:
+                continue
+            by_term.setdefault(c.term, []).append((q, c))
+            # danh động từ: 勉強した -> 勉強する -> từ "勉強" (POS có "Suru verb")
+            if c.type == VS and c.term.endswith("する") and len(c.term) > 2:
+                by_term.setdefault(c.term[:-2], []).append((q, c))
+
+    terms = list(by_term)
+    best: dict[str, dict[int, Candidate]] = {}
+    for start in range(0, len(terms), IN_BATCH):
+        chunk = terms[start:start + IN_BATCH]
+        rows = Word.objects.filter(
+            Q(kanji__in=chunk) | Q(kana__in=chunk)
+        ).values_list("id", "kanji", "kana", "parts_of_speech")
+
+        for word_id, kanji, kana, pos in rows:
+            for term in {kanji, kana}:
+                for q, c in by_term.get(term, ()):
+                    if not _pos_matches(c.type, pos):
+                        continue
+                    current = best.setdefault(q, {}).get(word_id)
+                    if current is None or len(c.reasons) < len(current.reasons):
+                        best[q][word_id] = c
+
+    return {
+        q: {
+            word_id: {
+                "query": q,
+                "base": c.term,
+                "reasons": list(c.reasons),
+                "description": c.description,
+            }
+            for word_id, c in sorted(matches.items(), key=lambda item: len(item[1].reasons))
+        }
+        for q, matches in best.items()
+    }
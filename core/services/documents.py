@@ -0,0 +1,99 @@
+"""
+Document detail của Word, denormalize sẵn (WordDocument): detail endpoint đọc 1 row theo
+primary key rồi gắn field theo user (is_favorited), không load meanings / examples, không
+serialize lại.
+
+Mọi chỗ ghi meanings / examples (ingest, enrich example) gọi rebuild_documents(); version
+của document chỉ tăng khi payload thật sự đổi (kèm bump version JLPT list chứa word đó).
+"""
+import logging
+import time
+
+from django.db import transaction
+from django.db.models import Prefetch
+from django.utils import timezone
+
+from core.models import Word, WordDocument, WordMeaning
+from core.serializers.word import WordSerializer, cacheable
+from core.services import hotcache, versions
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+
+
+def is_complete(data: dict) -> bool:
+    """Mọi meaning đã có example -> không cần enrich nữa."""
+    return all(m["examples"] for m in data["meanings"])
+
+
+def load_stamp(word_id: int) -> WordDocument | None:
+    """Chỉ version / updated_at / complete + refreshed_at của word (không đọc data) cho conditional GET."""
+    return (
+        WordDocument.objects.select_related("word")
+        .only("version", "updated_at", "complete", "word__id", "word__refreshed_at")
+        .filter(pk=word_id)
+        .first()
+    )
+
+
+def load(word_id: int) -> WordDocument | None:
+    """Document + word (cho check stale) trong 1 query."""
+    return WordDocument.objects.select_related("word").filter(pk=word_id).first()
+
+
+def get_or_build(word_id: int) -> WordDocument:
+    return load(word_id) or rebuild_documents([word_id])[word_id]
+
+
+def rebuild_documents(word_ids) -> dict[int, WordDocument]:
+    """Serialize lại các word, ghi document nào đổi (version + 1). Trả về {word_id: document}."""
+    word_ids = sorted({w for w in word_ids if w})
+    if not word_ids:
+        return {}
+    start = time.perf_counter()
+
+    documents: dict[int, WordDocument] = {}
+    written = 0
+    levels: set[str] = set()
+    for i in range(0, len(word_ids), BATCH_SIZE):
+        ids = word_ids[i:i + BATCH_SIZE]
+        words = Word.objects.filter(id__in=ids).prefetch_related(
+            Prefetch("meanings", queryset=WordMeaning.objects.order_by("id").prefetch_related("examples"))
+        )
+        existing = WordDocument.objects.in_bulk(ids)
+
+        new, changed = [], []
+        for item in WordSerializer(words, many=True).data:
+            data = cacheable(item)
+            doc = existing.get(item["id"])
+            if doc is None:
+                doc = WordDocument(word_id=item["id"], data=data, complete=is_complete(data))
+                new.append(doc)
+                levels.add(data["jlpt_level"])
+            elif doc.data != data:
+                # word đổi level -> list của level cũ cũng đổi
+                levels.update((doc.data.get("jlpt_level"), data["jlpt_level"]))
+                doc.data = data
+                doc.complete = is_complete(data)
+                doc.version += 1
+                changed.append(doc)
+            documents[item["id"]] = doc
+
+        WordDocument.objects.bulk_create(new, ignore_conflicts=True)
+        now = timezone.now()  # auto_now không chạy với bulk_update
+        for doc in changed:
+            doc.updated_at = now
+        WordDocument.objects.bulk_update(changed, ["data", "complete", "version", "updated_at"])
+        written += len(new) + len(changed)
+
+    # sau khi ghi (và sau commit nếu đang trong transaction): reader đã đọc bản cũ trước đó
+    # bị hotcache.put() từ chối theo generation
+    transaction.on_commit(lambda: hotcache.invalidate(word_ids))
+    versions.bump(versions.jlpt_key(level) for level in levels if level)
+
+    logger.info(
+        f"[TIMING] Word documents rebuilt: {len(word_ids)} words, {written} written "
+        f"in {(time.perf_counter() - start) * 1000:.2f}ms"
+    )
+    return documents
@@ -0,0 +1,326 @@
+"""
+Fuzzy search (gõ sai 1-2 ký tự) cho SearchView / ReverseLookupView, không gọi Jisho.
+
+Index SymSpell-style in-memory (mỗi worker): với mỗi term, lưu mọi chuỗi thu được khi
+xoá tối đa MAX_DISTANCE ký tự trong PREFIX_LENGTH ký tự đầu. Query sinh các chuỗi xoá
+tương tự rồi tra dict -> chỉ tính edit distance trên vài ứng viên, không quét toàn bộ.
+Tối đa MAX_CANDIDATES ứng viên được kiểm tra mỗi query -> worst case có giới hạn.
+Key trong dict là hash của chuỗi xoá (int nhỏ hơn str nhiều); va chạm hash chỉ thêm
+ứng viên, vẫn bị loại khi tính distance.
+
+Index build trong thread nền; khi chưa sẵn sàng fuzzy trả rỗng (search đi tiếp Jisho như cũ).
+
+2 index:
+  readings: kana (hiragana) + romaji của reading  -> "tabeu", "たべう" -> 食べる
+  meanings: từng token trong nghĩa                 -> "stuydy" -> 勉強
+"""
+import logging
+import re
+import threading
+import time
+import unicodedata
+
+from django.db import close_old_connections
+
+from core.models import Word, WordMeaning
+
+logger = logging.getLogger(__name__)
+
+INDEX_TTL = 600          # giây, giống segment index
+MAX_DISTANCE = 2
+PREFIX_LENGTH = 5        # chỉ sinh deletes trên 5 ký tự đầu (SymSpell prefix)
+MAX_CANDIDATES = 200     # số term tối đa được tính distance / query
+MAX_RESULTS = 20         # số word tối đa trả về
+MIN_TOKEN_LENGTH = 3
+
+_TOKEN_RE = re.compile(r"\w+")
+
+_lock = threading.Lock()
+_index = None
+_refreshing = False
+
+
+# ---------------------------------------------------------
+#  NORMALIZE (kana -> hiragana -> romaji Hepburn)
+# ---------------------------------------------------------
+
+_KANA_ROWS = [
+    ("", "あいうえお"), ("k", "かきくけこ"), ("g", "がぎぐげご"), ("s", "さしすせそ"),
+    ("z", "ざじずぜぞ"), ("t", "たちつてと"), ("d", "だぢづでど"), ("n", "なにぬねの"),
+    ("h", "はひふへほ"), ("b", "ばびぶべぼ"), ("p", "ぱぴぷぺぽ"), ("m", "まみむめも"),
+    ("r", "らりるれろ"),
+]
+ROMAJI = {ch: c + v for c, row in _KANA_ROWS for ch, v in zip(row, "aiueo")}
+ROMAJI.update({
+    "し": "shi", "ち": "chi", "つ": "tsu", "ふ": "fu", "じ": "ji", "ぢ": "ji", "づ": "zu",
+    "や": "ya", "ゆ": "yu", "よ": "yo", "わ": "wa", "を": "o", "ん": "n", "ゔ": "vu",
+    "ぁ": "a", "ぃ": "i", "ぅ": "u", "ぇ": "e", "ぉ": "o", "ゎ": "wa",
+})
+_SMALL_Y = {"ゃ": "a", "ゅ": "u", "ょ": "o"}
+
+
+def to_hiragana(text: str) -> str:
+    return "".join(chr(ord(ch) - 0x60) if "ァ" <= ch <= "ヶ" else ch for ch in text)
+
+
+def to_romaji(kana: str) -> str:
+    """Hepburn đơn giản: きょう -> kyou, がっこう -> gakkou, コーヒー -> koohii."""
+    out: list[str] = []
+    geminate = False
+    for ch in to_hiragana(kana):
+        if ch == "っ":
+            geminate = True
+            continue
+        if ch in _SMALL_Y and out and out[-1].endswith("i"):
+            head = out.pop()[:-1]
+            glide = "" if head.endswith(("sh", "ch", "j")) else "y"
+            out.append(head + glide + _SMALL_Y[ch])
+            continue
+        if ch == "ー":
+            r = out[-1][-1] if out and out[-1][-1] in "aiueo" else ""
+        else:
+            r = ROMAJI.get(ch, ch)
+        if geminate and r and r[0] not in "aiueon":
+            r = ("t" if r.startswith("ch") else r[0]) + r
+        geminate = False
+        out.append(r)
+    return "".join(out)
+
+
+def normalize(text: str) -> str:
+    return to_hiragana(unicodedata.normalize("NFKC", text).strip().lower())
+
+
+def tokens(text: str) -> list[str]:
+    return [t for t in _TOKEN_RE.findall(normalize(text)) if len(t) >= MIN_TOKEN_LENGTH]
+
+
+def max_distance_for(term: str) -> int:
+    """Query ngắn mà cho distance 2 thì khớp gần như mọi thứ."""
+    if len(term) <= 2:
+        return 0
+    if len(term) <= 4:
+        return 1
+    return MAX_DISTANCE
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Damerau-Levenshtein (OSA), dừng sớm khi chắc chắn > limit (trả về limit + 1)."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2 = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if prev2 and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+# ---------------------------------------------------------
+#  INDEX
+# ---------------------------------------------------------
+
+def _deletes(term: str, distance: int) -> set[str]:
+    prefix = term[:PREFIX_LENGTH]
+    out = level = {prefix}
+    for _ in range(min(distance, len(prefix))):
+        level = {s[:i] + s[i + 1:] for s in level for i in range(len(s))}
+        out = out | level
+    return out
+
+
+class DeletionIndex:
+    def __init__(self):
+        self.terms: list[str] = []
+        self.words: list[list[int]] = []       # song song với terms
+        self._term_ids: dict[str, int] = {}
+        # hash(chuỗi xoá) -> term id, hoặc list term id khi có nhiều term
+        self.deletes: dict[int, int | list[int]] = {}
+
+    def add(self, term: str, word_id: int) -> None:
+        if len(term) < MIN_TOKEN_LENGTH:
+            return
+        tid = self._term_ids.get(term)
+        if tid is None:
+            tid = self._term_ids[term] = len(self.terms)
+            self.terms.append(term)
+            self.words.append([])
+            deletes = self.deletes
+            for key in _deletes(term, max_distance_for(term)):
+                key = hash(key)
+                bucket = deletes.get(key)
+                if bucket is None:
+                    deletes[key] = tid
+                elif isinstance(bucket, int):
+                    deletes[key] = [bucket, tid]
+                else:
+                    bucket.append(tid)
+        if word_id not in self.words[tid][-1:]:
+            self.words[tid].append(word_id)
+
+    def _bucket(self, key: str):
+        bucket = self.deletes.get(hash(key), ())
+        return (bucket,) if isinstance(bucket, int) else bucket
+
+    def search(self, query: str) -> list[tuple[str, int, list[int]]]:
+        """[(term, distance, word_ids)] xếp theo distance; kiểm tra tối đa MAX_CANDIDATES term."""
+        limit = max_distance_for(query)
+        tid = self._term_ids.get(query)
+        if tid is not None:
+            return [(query, 0, self.words[tid])]
+        if not limit:
+            return []
+
+        seen: set[int] = set()
+        hits = []
+        # chuỗi xoá dài trước: ứng viên gần nhất được kiểm tra trước khi chạm cap
+        for key in sorted(_deletes(query, limit), key=len, reverse=True):
+            for tid in self._bucket(key):
+                if tid in seen:
+                    continue
+                seen.add(tid)
+                term = self.terms[tid]
+                term_limit = min(limit, max_distance_for(term))
+                d = edit_distance(query, term, term_limit)
+                if d <= term_limit:
+                    hits.append((term, d, self.words[tid]))
+                if len(seen) >= MAX_CANDIDATES:
+                    break
+            if len(seen) >= MAX_CANDIDATES:
+                logger.info(f"[FUZZY] candidate cap reached for '{query}'")
+                break
+        hits.sort(key=lambda h: h[1])
+        return hits
+
+
+class FuzzyIndex:
+    def __init__(self):
+        self.readings = DeletionIndex()
+        self.meanings = DeletionIndex()
+        self.built_at = time.monotonic()
+        self.ttl = INDEX_TTL      # index preload trong master: TTL dài hơn (xem preload.py)
+
+
+def _build_index() -> FuzzyIndex:
+    start = time.perf_counter()
+    index = FuzzyIndex()
+    for word_id, kana in Word.objects.values_list("id", "kana").iterator(chunk_size=5000):
+        if kana:
+            kana = normalize(kana)
+            index.readings.add(kana, word_id)
+            index.readings.add(to_romaji(kana), word_id)
+
+    rows = WordMeaning.objects.order_by("word_id").values_list("word_id", "meaning")
+    for word_id, meaning in rows.iterator(chunk_size=5000):
+        for token in tokens(meaning or ""):
+            index.meanings.add(token, word_id)
+
+    logger.info(
+        f"[TIMING] Fuzzy index built: {len(index.readings.terms)} readings, "
+        f"{len(index.meanings.terms)} meaning tokens, "
+        f"{len(index.readings.deletes) + len(index.meanings.deletes)} deletes "
+        f"in {(time.perf_counter() - start) * 1000:.2f}ms"
+    )
+    return index
+
+
+def _refresh():
+    global _index, _refreshing
+    try:
+        close_old_connections()
+        _index = _build_index()
+    except Exception:
+        logger.exception("[FUZZY] index refresh failed")
+    finally:
+        _refreshing = False
+        close_old_connections()
+
+
+def get_index() -> FuzzyIndex | None:
+    """
+    Không bao giờ chặn request: lần đầu (và khi hết TTL) build trong thread nền của worker;
+    trong lúc build lần đầu trả về None.
+    """
+    global _refreshing
+    if _index is not None and time.monotonic() - _index.built_at <= _index.ttl:
+        return _index
+    if not _refreshing:
+        with _lock:
+            if not _refreshing:
+                _refreshing = True
+                threading.Thread(target=_refresh, name="fuzzy-index", daemon=True).start()
+    return _index
+
+
+def preload(ttl: float = INDEX_TTL) -> None:
+    """Build đồng bộ, không qua thread nền (thread không sống sót qua fork)."""
+    global _index
+    index = _build_index()
+    index.ttl = ttl
+    _index = index
+
+
+# ---------------------------------------------------------
+#  LOOKUP
+# ---------------------------------------------------------
+
+def _collect(hits) -> dict[int, dict]:
+    found: dict[int, dict] = {}
+    for term, distance, word_ids in hits:
+        for word_id in word_ids:
+            if word_id not in found:
+                found[word_id] = {"term": term, "distance": distance}
+                if len(found) >= MAX_RESULTS:
+                    return found
+    return found
+
+
+def fuzzy_readings(q: str) -> dict[int, dict]:
+    """
+    Tra reading gần đúng (kana hoặc romaji). Trả về {word_id: {"term", "distance"}}.
+    distance 0 nghĩa là query romaji khớp đúng reading (vd. "taberu").
+    """
+    index = get_index()
+    if index is None:
+        return {}
+    t0 = time.perf_counter()
+    found = _collect(index.readings.search(normalize(q)))
+    logger.info(f"[TIMING] fuzzy readings '{q}': {(time.perf_counter() - t0) * 1000:.2f}ms, found={len(found)}")
+    return found
+
+
+def fuzzy_meanings(q: str) -> dict[int, dict]:
+    """Mọi token của query phải khớp (gần đúng) 1 token trong nghĩa của word."""
+    index = get_index()
+    if index is None:
+        return {}
+    t0 = time.perf_counter()
+    index = index.meanings
+    query_tokens = tokens(q)
+    matched: dict[int, dict] | None = None
+
+    for token in query_tokens:
+        per_token = {}
+        for term, distance, word_ids in index.search(token):
+            for word_id in word_ids:
+                per_token.setdefault(word_id, (term, distance))
+        if matched is None:
+            matched = {w: {"term": t, "distance": d} for w, (t, d) in per_token.items()}
+        else:
+            matched = {
+                w: {"term": f"{m['term']} {per_token[w][0]}", "distance": m["distance"] + per_token[w][1]}
+                for w, m in matched.items() if w in per_token
+            }
+        if not matched:
+            break
+
+    found = dict(sorted((matched or {}).items(), key=lambda item: item[1]["distance"])[:MAX_RESULTS])
+    logger.info(f"[TIMING] fuzzy meanings '{q}': {(time.perf_counter() - t0) * 1000:.2f}ms, found={len(found)}")
+    return found
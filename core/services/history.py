@@ -1,22 +1,111 @@
+import logging
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
 from core.models import SearchHistory
+from core.services import sync
+from core.services.buffered import FlushBuffer
+
+logger = logging.getLogger(__name__)
+
+FLUSH_SIZE = 50          # flush khi buffer đạt số entry này
+FLUSH_INTERVAL = 5.0     # hoặc khi entry cũ nhất đã nằm quá N giây
+MAX_PER_USER = 200       # số lịch sử tối đa giữ lại cho mỗi user
+
+_trimming: ContextVar[bool] = ContextVar("history_trimming", default=False)
+
 
 def save_search_history(user, words):
     """
-    Lưu lịch sử tìm kiếm cho user.
+    Lưu lịch sử tìm kiếm cho user (ghi vào buffer, flush theo batch).
     - Không lưu nếu user chưa login
-    - Không lưu trùng 1 word cho cùng user
+    - Search lại cùng 1 word -> chỉ bump searched_at (upsert theo (user, word))
     """
 
     if not user or not user.is_authenticated:
         return
-    
-    # Lưu tối đa 1 từ (từ đầu tiên)
-    for w in words[:1]:
 
-        # ⭐ KIỂM TRA: nếu user đã từng search từ này thì bỏ qua
-        exists = SearchHistory.objects.filter(user=user, word=w).exists()
-        if exists:
-            return   # không lưu nữa
+    # Lưu tối đa 1 từ (từ đầu tiên); words thường là queryset -> query chạy trước khi giữ lock
+    word_ids = [w.id for w in words[:1]]
+    if not word_ids:
+        return
+
+    searched_at = timezone.now()
+
+    def update(items):
+        for word_id in word_ids:
+            items[(user.id, word_id)] = searched_at
+
+    _buffer.add(update)
+
+
+def flush_search_history():
+    _buffer.flush()
+
+
+def _write_history(pending: dict):
+    """Upsert toàn bộ buffer trong 1 query, sau đó cắt lịch sử vượt MAX_PER_USER."""
+    rows = [
+        SearchHistory(user_id=user_id, word_id=word_id, searched_at=ts)
+        for (user_id, word_id), ts in pending.items()
+    ]
+
+    try:
+        SearchHistory.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["user", "word"],
+            update_fields=["searched_at"],
+        )
+        sync.record_changes(sync.HISTORY, (
+            (user_id, word_id, sync.UPSERT, {"searched_at": ts.isoformat()})
+            for (user_id, word_id), ts in pending.items()
+        ))
+        _trim_history({user_id for user_id, _ in pending})
+    except Exception:
+        logger.exception(f"[HISTORY] flush failed, dropped {len(rows)} entries")
+
+
+# (user_id, word_id) -> searched_at ; buffer riêng cho mỗi worker process
+_buffer = FlushBuffer("search-history", _write_history, FLUSH_SIZE, FLUSH_INTERVAL)
+
+
+def _trim_history(user_ids):
+    """
+    1 GROUP BY tìm user vượt MAX_PER_USER (thường không có ai -> dừng ở đây), rồi 1 query
+    window ROW_NUMBER() lấy phần vượt của mọi user đó và 1 DELETE.
+    """
+    over = list(
+        SearchHistory.objects.filter(user_id__in=user_ids)
+        .values("user_id")
+        .annotate(n=Count("id"))
+        .filter(n__gt=MAX_PER_USER)
+        .values_list("user_id", flat=True)
+    )
+    if not over:
+        return
+    stale = list(
+        SearchHistory.objects.filter(user_id__in=over)
+        .annotate(rank=Window(RowNumber(), partition_by=F("user_id"), order_by=F("searched_at").desc()))
+        .filter(rank__gt=MAX_PER_USER)
+        .values_list("id", "user_id", "word_id")
+    )
+    # tombstone sync ghi 1 lần cho cả batch (signal post_delete bỏ qua khi đang trim)
+    token = _trimming.set(True)
+    try:
+        with transaction.atomic():
+            SearchHistory.objects.filter(id__in=[row[0] for row in stale]).delete()
+            sync.record_changes(sync.HISTORY, (
+                (user_id, word_id, sync.DELETE, None) for _, user_id, word_id in stale
+            ))
+    finally:
+        _trimming.reset(token)
+
+
+def is_trimming() -> bool:
+    return _trimming.get()
 
-        # ⭐ Nếu chưa tồn tại -> lưu mới
-        SearchHistory.objects.create(user=user, word=w)
@@ -0,0 +1,278 @@
+"""
+Hot-entry cache dùng chung giữa các gunicorn worker trên cùng máy: payload WordSerializer
+(phần không phụ thuộc request) của top-K word, lưu trong 1 file memory-mapped.
+
+Layout file (HOT_CACHE_PATH):
+    header   magic, format, số set, số way, slot size, bộ đếm aging, generation
+    sketch   count-min sketch (DEPTH x WIDTH uint32) đếm tần suất truy cập mọi word
+    stamps   N_SETS uint64: generation của lần invalidate gần nhất chạm vào set
+    slots    N_SETS x WAYS slot cố định; word_id -> 1 set, tìm trong WAYS slot của set
+
+- Đọc không lock, không copy: orjson.loads trực tiếp trên memoryview của mmap.
+  Mỗi slot có seq (seqlock): lẻ = đang ghi; đọc lại seq sau khi decode, đổi -> coi như miss.
+- Ghi (admit / invalidate) tuần tự qua flock trên file.
+- LFU (TinyLFU): word mới chỉ được vào khi tần suất ước lượng (sketch) lớn hơn slot
+  ít dùng nhất trong set; mọi bộ đếm giảm một nửa sau 10 x capacity lượt truy cập.
+- Ingest / enrichment gọi invalidate() sau commit; entry quá MAX_AGE cũng bị bỏ (chặn trên
+  độ stale khi word đổi ở máy khác, vd. cron).
+- Chống put cũ sau invalidate: caller lấy generation() TRƯỚC khi đọc DB rồi truyền vào put();
+  set đã bị invalidate sau generation đó -> payload có thể là bản cũ, không admit.
+
+Không mở được file (read-only FS, HOT_CACHE_SLOTS=0...) -> cache tắt, mọi get là miss.
+"""
+import fcntl
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+
+import orjson
+from django.conf import settings
+from django.db import connection
+
+from core.renderers import dumps
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"NIHONHC1"
+FORMAT = 2
+WAYS = 8
+DEPTH, WIDTH = 4, 1 << 14
+MAX_AGE = 3600              # giây
+
+_HEADER = struct.Struct("<8s8sIIIIQQ")     # magic, db fingerprint, format, n_sets, ways, slot_size, additions, generation
+_SLOT = struct.Struct("<qQIId")            # word_id, seq, freq, length, stored_at
+_SEQ_OFFSET = 8
+_FREQ_OFFSET = 16
+_ADDITIONS_OFFSET = _HEADER.size - 16
+_GENERATION_OFFSET = _HEADER.size - 8
+_PAGE = mmap.PAGESIZE
+
+_lock = threading.Lock()         # ghi trong process (flock không chặn thread cùng process)
+_open_lock = threading.Lock()
+_store = None               # HotCache | False (tắt) | None (chưa mở)
+_store_pid = None
+
+
+def _mix(word_id: int, seed: int) -> int:
+    h = (word_id * 0x9E3779B1 + seed * 0x85EBCA77) & 0xFFFFFFFF
+    return h ^ (h >> 15)
+
+
+class HotCache:
+    def __init__(self, path: str, slots: int, slot_size: int, fingerprint: bytes = b""):
+        self.n_sets = max(1, slots // WAYS)
+        self.slot_size = slot_size
+        self.capacity = self.n_sets * WAYS
+        self.aging_sample = 10 * self.capacity
+
+        self.sketch_offset = _PAGE
+        self.stamps_offset = self.sketch_offset + -(-DEPTH * WIDTH * 4 // _PAGE) * _PAGE
+        self.slots_offset = self.stamps_offset + -(-self.n_sets * 8 // _PAGE) * _PAGE
+        size = self.slots_offset + self.capacity * slot_size
+
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        with self._write_lock():
+            header = os.pread(self.fd, _HEADER.size, 0)
+            expected = (MAGIC, fingerprint[:8].ljust(8, b"\0"), FORMAT, self.n_sets, WAYS, slot_size)
+            if len(header) < _HEADER.size or _HEADER.unpack(header)[:6] != expected \
+                    or os.fstat(self.fd).st_size != size:
+                # file mới, cấu hình đổi hoặc file của DB khác -> khởi tạo lại (truncate = xoá sạch)
+                os.ftruncate(self.fd, 0)
+                os.ftruncate(self.fd, size)
+                os.pwrite(self.fd, _HEADER.pack(*expected, 0, 0), 0)
+
+        self.mm = mmap.mmap(self.fd, size)
+        self.view = memoryview(self.mm)
+        self.sketch = self.view[self.sketch_offset:self.sketch_offset + DEPTH * WIDTH * 4].cast("I")
+        self.stamps = self.view[self.stamps_offset:self.stamps_offset + self.n_sets * 8].cast("Q")
+
+    # -----------------------------------------------------
+    #  helpers
+    # -----------------------------------------------------
+
+    @contextmanager
+    def _write_lock(self):
+        with _lock:
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+    def _set_index(self, word_id: int) -> int:
+        return _mix(word_id, 0) % self.n_sets
+
+    def _slot_offsets(self, word_id: int):
+        base = self.slots_offset + self._set_index(word_id) * WAYS * self.slot_size
+        return [base + way * self.slot_size for way in range(WAYS)]
+
+    def generation(self) -> int:
+        return struct.unpack_from("<Q", self.mm, _GENERATION_OFFSET)[0]
+
+    def _touch(self, word_id: int) -> None:
+        """Đếm 1 lượt truy cập vào sketch (không lock: mất vài lượt đếm khi race là chấp nhận được)."""
+        for row in range(DEPTH):
+            i = row * WIDTH + _mix(word_id, row + 1) % WIDTH
+            if self.sketch[i] < 0xFFFFFFFF:
+                self.sketch[i] += 1
+
+        additions = struct.unpack_from("<Q", self.mm, _ADDITIONS_OFFSET)[0] + 1
+        struct.pack_into("<Q", self.mm, _ADDITIONS_OFFSET, additions)
+        if additions >= self.aging_sample:
+            self._age()
+
+    def _estimate(self, word_id: int) -> int:
+        return min(self.sketch[row * WIDTH + _mix(word_id, row + 1) % WIDTH] for row in range(DEPTH))
+
+    def _age(self) -> None:
+        with self._write_lock():
+            if struct.unpack_from("<Q", self.mm, _ADDITIONS_OFFSET)[0] < self.aging_sample:
+                return  # worker khác vừa aging xong
+            for i in range(DEPTH * WIDTH):
+                self.sketch[i] >>= 1
+            for s in range(self.capacity):
+                off = self.slots_offset + s * self.slot_size + _FREQ_OFFSET
+                struct.pack_into("<I", self.mm, off, struct.unpack_from("<I", self.mm, off)[0] >> 1)
+            struct.pack_into("<Q", self.mm, _ADDITIONS_OFFSET, 0)
+
+    # -----------------------------------------------------
+    #  read
+    # -----------------------------------------------------
+
+    def get(self, word_id: int) -> dict | None:
+        self._touch(word_id)
+        now = time.time()
+        for off in self._slot_offsets(word_id):
+            wid, seq, freq, length, stored_at = _SLOT.unpack_from(self.mm, off)
+            if wid != word_id:
+                continue
+            if seq & 1 or now - stored_at > MAX_AGE:
+                return None
+            start = off + _SLOT.size
+            try:
+                data = orjson.loads(self.view[start:start + length])
+            except orjson.JSONDecodeError:
+                return None  # đọc trúng lúc đang ghi
+            if struct.unpack_from("<Q", self.mm, off + _SEQ_OFFSET)[0] != seq:
+                return None
+            struct.pack_into("<I", self.mm, off + _FREQ_OFFSET, min(freq + 1, 0xFFFFFFFF))
+            return data
+        return None
+
+    # -----------------------------------------------------
+    #  write
+    # -----------------------------------------------------
+
+    def _write_slot(self, off: int, word_id: int, freq: int, payload: bytes) -> None:
+        seq = struct.unpack_from("<Q", self.mm, off + _SEQ_OFFSET)[0]
+        struct.pack_into("<Q", self.mm, off + _SEQ_OFFSET, seq + 1)          # lẻ: đang ghi
+        self.mm[off + _SLOT.size:off + _SLOT.size + len(payload)] = payload
+        _SLOT.pack_into(self.mm, off, word_id, seq + 1, freq, len(payload), time.time())
+        struct.pack_into("<Q", self.mm, off + _SEQ_OFFSET, seq + 2)
+
+    def put(self, word_id: int, data: dict, generation: int) -> bool:
+        """
+        Admit theo LFU; trả về True nếu payload được ghi vào cache.
+        generation: giá trị generation() lấy trước khi đọc payload từ DB.
+        """
+        payload = dumps(data)
+        if len(payload) > self.slot_size - _SLOT.size:
+            return False
+
+        freq = self._estimate(word_id)
+        with self._write_lock():
+            if self.stamps[self._set_index(word_id)] > generation:
+                return False  # set bị invalidate sau khi payload được đọc -> có thể là bản cũ
+            slots = {off: _SLOT.unpack_from(self.mm, off) for off in self._slot_offsets(word_id)}
+            # đã có -> ghi đè; còn slot trống -> dùng; hết chỗ -> slot ít dùng nhất trong set
+            same = [off for off, slot in slots.items() if slot[0] == word_id]
+            empty = [off for off, slot in slots.items() if slot[0] == 0]
+            if same or empty:
+                victim, victim_freq = (same or empty)[0], -1
+            else:
+                victim = min(slots, key=lambda off: slots[off][2])
+                victim_freq = slots[victim][2]
+
+            if freq <= victim_freq:
+                return False
+            self._write_slot(victim, word_id, freq, payload)
+        return True
+
+    def invalidate(self, word_ids) -> None:
+        with self._write_lock():
+            generation = self.generation() + 1
+            struct.pack_into("<Q", self.mm, _GENERATION_OFFSET, generation)
+            for word_id in word_ids:
+                self.stamps[self._set_index(word_id)] = generation
+                for off in self._slot_offsets(word_id):
+                    if _SLOT.unpack_from(self.mm, off)[0] == word_id:
+                        self._write_slot(off, 0, 0, b"")
+
+
+def _db_fingerprint() -> bytes:
+    """Payload gắn với 1 database (id word): dev đổi DB / chạy test cùng máy -> file riêng."""
+    db = connection.settings_dict
+    return hashlib.sha1(f"{db['ENGINE']}|{db['HOST']}|{db['PORT']}|{db['NAME']}".encode()).digest()
+
+
+def _get_store() -> HotCache | None:
+    """Mở file 1 lần / process (mở lại sau fork: flock gắn với file description)."""
+    global _store, _store_pid
+    if _store_pid == os.getpid():
+        return _store or None
+
+    with _open_lock:
+        if _store_pid != os.getpid():
+            slots = settings.HOT_CACHE_SLOTS
+            try:
+                _store = HotCache(
+                    settings.HOT_CACHE_PATH, slots, settings.HOT_CACHE_SLOT_SIZE, _db_fingerprint()
+                ) if slots else False
+            except OSError as e:
+                logger.warning(f"[HOTCACHE] disabled: {e}")
+                _store = False
+            _store_pid = os.getpid()
+    return _store or None
+
+
+# ---------------------------------------------------------
+#  API
+# ---------------------------------------------------------
+
+def get_many(word_ids) -> dict[int, dict]:
+    store = _get_store()
+    if store is None:
+        return {}
+    found = {}
+    for word_id in word_ids:
+        data = store.get(word_id)
+        if data is not None:
+            found[word_id] = data
+    return found
+
+
+def get(word_id: int) -> dict | None:
+    return get_many([word_id]).get(word_id)
+
+
+def generation() -> int:
+    """Lấy TRƯỚC khi đọc payload từ DB, truyền lại cho put()."""
+    store = _get_store()
+    return store.generation() if store is not None else 0
+
+
+def put(word_id: int, data: dict, generation: int) -> bool:
+    store = _get_store()
+    return bool(store and store.put(word_id, data, generation))
+
+
+def invalidate(word_ids) -> None:
+    store = _get_store()
+    word_ids = [w for w in word_ids if w]
+    if store is not None and word_ids:
+        store.invalidate(word_ids)
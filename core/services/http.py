@@ -0,0 +1,25 @@
+import asyncio
+import weakref
+
+import httpx
+
+# 1 AsyncClient (connection pool) cho mỗi event loop
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Client httpx dùng chung cho các request upstream (Jisho, Tatoeba, KanjiAPI).
+    Dưới uvicorn mỗi process chỉ có 1 loop -> connection pool được tái sử dụng.
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(
+            timeout=10,
+            limits=httpx.Limits(max_connections=200, max_keepalive_connections=50),
+        )
+        _clients[loop] = client
+    return client
@@ -1,17 +1,30 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import time
 import logging
+import unicodedata
 
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
 from django.db import transaction
-from django.db.models import QuerySet
+from django.db.models import Count
+from django.utils import timezone
 
+from .breaker import CircuitOpenError
+from .bundle import schedule_bundle_update
+from .documents import rebuild_documents
+from .ranking import compute_score
 from .jisho import jisho_search
-from .tatoeba import search_examples
-from core.models import Word, WordMeaning, ExampleSentence
+from .sentences import assign_senses, link_examples, sentences_for_word, store_sentences
+from .tatoeba import search_examples, search_examples_async
+from core.models import ExampleSentence, MeaningExample, Word, WordMeaning
 
 logger = logging.getLogger(__name__)
 
+QUERY_TTL = 7 * 24 * 3600   # giây; query -> id word Jisho đã trả về
+
 
 # ---------------------------------------------------------
 #  HELPERS
@@ -24,7 +37,13 @@ def _gather_pos(senses: list[dict]) -> str:
     return ", ".join(dict.fromkeys(pos))
 
 
-def _get_or_create_word(kanji, kana, parts, jlpt_level):
+def _get_or_create_word(kanji, kana, parts, jlpt_level, is_common=False, refresh=False):
+    """
+    refresh=False: chỉ điền các field còn trống (ingest lúc search).
+    refresh=True: ghi đè bằng dữ liệu mới của Jisho + bump refreshed_at.
+    Score ranking tính lại mỗi khi commonness đổi.
+    """
+    now = timezone.now()
     w = Word.objects.filter(kanji=kanji, kana=kana).order_by("id").first()
     if w is None:
         return Word.objects.create(
@@ -32,74 +51,199 @@ def _get_or_create_word(kanji, kana, parts, jlpt_level):
             kana=kana,
             parts_of_speech=parts or "",
             jlpt_level=jlpt_level,
+            is_common=is_common,
+            score=compute_score(is_common, jlpt_level, 0),
             is_cached=True,
+            fetched_at=now,
+            refreshed_at=now,
         )
 
     changed = False
-    if parts and not w.parts_of_speech:
+    if parts and (not w.parts_of_speech or (refresh and w.parts_of_speech != parts)):
         w.parts_of_speech = parts
         changed = True
-    if jlpt_level and not w.jlpt_level:
+    if jlpt_level and (not w.jlpt_level or (refresh and w.jlpt_level != jlpt_level)):
         w.jlpt_level = jlpt_level
         changed = True
+    if is_common != w.is_common and (is_common or refresh):
+        w.is_common = is_common
+        changed = True
     if not w.is_cached:
         w.is_cached = True
         changed = True
+    if w.fetched_at is None:
+        w.fetched_at = now
+        changed = True
+    if refresh:
+        w.refreshed_at = now
+        changed = True
 
     if changed:
-        w.save(update_fields=["parts_of_speech", "jlpt_level", "is_cached"])
+        w.score = compute_score(w.is_common, w.jlpt_level, w.search_count)
+        w.save(update_fields=[
+            "parts_of_speech", "jlpt_level", "is_common", "score",
+            "is_cached", "fetched_at", "refreshed_at",
+        ])
 
     return w
 
 
-def _upsert_meanings(word: Word, senses: list[dict]):
+def _upsert_meanings(word: Word, senses: list[dict], refresh: bool = False):
+    """
+    refresh=True: meaning Jisho không còn trả về bị xoá (xem _drop_stale_meanings).
+    Có meaning mới / bị xoá -> bump Word.meanings_updated_at (offline bundle nhận ra word đã đổi).
+    """
     created_or_existing = []
+    changed = False
     for s in senses or []:
         meaning_text = "; ".join(s.get("english_definitions", []))
         if not meaning_text:
             continue
 
-        wm, _ = WordMeaning.objects.get_or_create(
+        wm, created = WordMeaning.objects.get_or_create(
             word=word,
             meaning=meaning_text,
         )
         created_or_existing.append(wm)
+        changed |= created
+
+    if refresh and created_or_existing:
+        changed |= _drop_stale_meanings(word, {wm.id for wm in created_or_existing}) > 0
+
+    if changed:
+        word.meanings_updated_at = timezone.now()
+        Word.objects.filter(pk=word.pk).update(meanings_updated_at=word.meanings_updated_at)
 
     return created_or_existing
 
 
+def _drop_stale_meanings(word: Word, keep: set[int]) -> int:
+    """
+    Xoá meaning không còn trong senses của Jisho. Câu ví dụ đã gắn vào chúng được chia lại
+    cho các meaning còn lại (assign_senses) thay vì mất theo cascade.
+    """
+    stale = list(WordMeaning.objects.filter(word=word).exclude(id__in=keep).values_list("id", flat=True))
+    if not stale:
+        return 0
+
+    sentences = list(
+        ExampleSentence.objects.filter(meaning_links__meaning_id__in=stale).distinct().order_by("id")
+    )
+    if sentences:
+        remaining = WordMeaning.objects.filter(id__in=keep).order_by("id")
+        MeaningExample.objects.bulk_create(
+            [
+                MeaningExample(meaning_id=meaning_id, sentence=sentence)
+                for meaning_id, assigned in assign_senses(remaining, sentences).items()
+                for sentence in assigned
+            ],
+            ignore_conflicts=True,
+        )
+
+    WordMeaning.objects.filter(id__in=stale).delete()
+    logger.info(f"[INGEST] word {word.id}: dropped {len(stale)} meanings, relinked {len(sentences)} examples")
+    return len(stale)
+
+
 # ---------------------------------------------------------
 #  FILL EXAMPLES — VERSION B + JP PRIORITY
 # ---------------------------------------------------------
 
-def _fill_examples_for_word(word: Word, per_meaning: int = 3) -> None:
+def needs_examples(word: Word) -> bool:
+    """True nếu word có ít nhất 1 meaning chưa có example (1 query)."""
+    return (
+        WordMeaning.objects.filter(word=word)
+        .annotate(n_examples=Count("examples"))
+        .filter(n_examples=0)
+        .exists()
+    )
+
+
+def _filter_jp_examples(raw_jp: list[dict], kanji, kana) -> list[dict]:
+    # Lọc đúng sentence chứa từ
+    return [
+        ex for ex in raw_jp
+        if ((kanji and kanji in ex["jp"]) or (kana and kana in ex["jp"]))
+    ]
+
+
+def _meaning_keywords(meaning: WordMeaning) -> list[str]:
+    return [kw for kw in (m.strip() for m in meaning.meaning.split(";")) if kw]
+
+
+def _save_examples(meaning: WordMeaning, examples: list[dict], lacking: int) -> int:
+    # lưu mọi câu đã fetch (word khác dùng lại qua posting index), chỉ gắn `lacking` câu
+    sentences = store_sentences(examples)
+    return link_examples(meaning, sentences, lacking)
+
+
+def _examples_changed(word: Word) -> None:
+    rebuild_documents([word.id])
+    schedule_bundle_update()
+
+
+def _link_local_examples(word: Word, per_meaning: int) -> tuple[list[tuple[WordMeaning, int]], int]:
+    """
+    Dùng lại câu đã lưu có chứa word (posting index) trước khi gọi Tatoeba; mỗi câu chỉ
+    gắn vào meaning khớp nghĩa với câu EN (assign_senses), không gắn cùng 1 loạt câu cho mọi meaning.
+    Trả về (các meaning vẫn còn thiếu example sau đó, số câu đã link).
+    """
+    meanings = list(
+        WordMeaning.objects.filter(word=word)
+        .order_by("id")
+        .annotate(n_examples=Count("examples"))
+    )
+    lacking = [
+        (m, per_meaning - m.n_examples)
+        for m in meanings
+        if per_meaning - m.n_examples > 0
+    ]
+    if not lacking:
+        return [], 0
+    local = sentences_for_word(word)
+    if not local:
+        return lacking, 0
+
+    by_sense = assign_senses(meanings, local)
+    remaining = []
+    linked = 0
+    for meaning, n in lacking:
+        added = link_examples(meaning, by_sense[meaning.id], n)
+        linked += added
+        if n - added > 0:
+            remaining.append((meaning, n - added))
+
+    if linked:
+        logger.info(f"[EXAMPLES] reused {linked} stored sentences for word {word.id}")
+        _examples_changed(word)
+    return remaining, linked
+
+
+def _fill_examples_for_word(word: Word, per_meaning: int = 3) -> tuple[int, bool]:
     """
     Logic mới:
+    0) Dùng lại câu đã lưu chứa word (posting index, không gọi mạng)
     1) Ưu tiên example JP theo kanji/kana
     2) Nếu không có → fallback theo English meaning
     3) Mỗi meaning gọi riêng (Option B)
+
+    Trả về (số example đã link, complete). complete=False nếu có call Tatoeba bị
+    breaker / rate limiter từ chối -> "không link được gì" chưa phải kết quả thật.
     """
 
     t_start = time.perf_counter()
 
-    meanings: QuerySet[WordMeaning] = (
-        WordMeaning.objects.filter(word=word)
-        .order_by("id")
-        .prefetch_related("examples")
-    )
-
     kanji = word.kanji
     kana = word.kana
 
     # Nếu từ không có gì để search
     if not kanji and not kana:
-        return
-
-    for meaning in meanings:
-        lacking = per_meaning - meaning.examples.count()
-        if lacking <= 0:
-            continue
+        return 0, True
 
+    complete = True
+    fetched = 0
+    lacking_meanings, linked = _link_local_examples(word, per_meaning)
+    for meaning, lacking in lacking_meanings:
         final_examples = []
 
         # ================================
@@ -112,14 +256,13 @@ def _fill_examples_for_word(word: Word, per_meaning: int = 3) -> None:
                 raw_jp += search_examples(kanji, limit=8)
             if kana and kana != kanji:
                 raw_jp += search_examples(kana, limit=8)
+        except CircuitOpenError:
+            complete = False
         except Exception:
-            pass
+            logger.exception(f"[EXAMPLES] Tatoeba search failed for {kanji or kana}")
+            complete = False
 
-        # Lọc đúng sentence chứa từ
-        filtered_jp = [
-            ex for ex in raw_jp
-            if ((kanji and kanji in ex["jp"]) or (kana and kana in ex["jp"]))
-        ]
+        filtered_jp = _filter_jp_examples(raw_jp, kanji, kana)
 
         if filtered_jp:
             final_examples = filtered_jp
@@ -128,17 +271,16 @@ def _fill_examples_for_word(word: Word, per_meaning: int = 3) -> None:
         # 2) FALLBACK: search theo meaning EN
         # ================================
         if not final_examples:
-            meaning_keywords = [m.strip() for m in meaning.meaning.split(";")]
-
             raw_en = []
 
-            for kw in meaning_keywords:
-                if not kw:
-                    continue
+            for kw in _meaning_keywords(meaning):
                 try:
                     raw_en += search_examples(kw, limit=5)
+                except CircuitOpenError:
+                    complete = False
                 except Exception:
-                    pass
+                    logger.exception(f"[EXAMPLES] Tatoeba search failed for '{kw}'")
+                    complete = False
 
             # Không filter theo JP vì fallback theo EN meaning
             final_examples = raw_en
@@ -150,31 +292,107 @@ def _fill_examples_for_word(word: Word, per_meaning: int = 3) -> None:
         # ================================
         # 3) Insert vào DB
         # ================================
-        for ex in final_examples[:lacking]:
-            ExampleSentence.objects.get_or_create(
-                meaning=meaning,
-                source="tatoeba",
-                source_id=str(ex["id"]),
-                defaults={
-                    "jp": ex["jp"],
-                    "en": ex["en"],
-                },
-            )
+        fetched += _save_examples(meaning, final_examples, lacking)
+
+    if fetched:
+        _examples_changed(word)
 
     logger.info(
         f"[TIMING] _fill_examples_for_word DONE: {(time.perf_counter() - t_start)*1000:.2f}ms"
     )
+    return linked + fetched, complete
+
+
+def _flatten(batches) -> list[dict]:
+    # bỏ qua batch lỗi (Tatoeba lỗi / circuit open) -> dùng những gì đã có
+    out = []
+    for batch in batches:
+        if isinstance(batch, Exception):
+            if not isinstance(batch, CircuitOpenError):
+                logger.error("[EXAMPLES] Tatoeba search failed", exc_info=batch)
+            continue
+        out.extend(batch)
+    return out
+
+
+async def fill_examples_for_word_async(word: Word, per_meaning: int = 3) -> None:
+    """
+    Bản async của _fill_examples_for_word cho ASGI:
+    các request Tatoeba chạy song song trên event loop, ORM bọc bằng sync_to_async.
+    Query JP (kanji/kana) giống nhau cho mọi meaning nên chỉ gọi 1 lần.
+    """
+    t_start = time.perf_counter()
+
+    kanji = word.kanji
+    kana = word.kana
+    if not kanji and not kana:
+        return
+
+    lacking, _ = await sync_to_async(_link_local_examples)(word, per_meaning)
+    if not lacking:
+        return
+
+    jp_queries = [k for k in dict.fromkeys([kanji, kana]) if k]
+    raw_jp = _flatten(await asyncio.gather(
+        *(search_examples_async(k, limit=8) for k in jp_queries), return_exceptions=True
+    ))
+    filtered_jp = _filter_jp_examples(raw_jp, kanji, kana)
+
+    if filtered_jp:
+        plan = [(m, filtered_jp, n) for m, n in lacking]
+    else:
+        # FALLBACK: search theo meaning EN, mọi keyword của mọi meaning song song
+        async def by_meaning(m):
+            return _flatten(await asyncio.gather(
+                *(search_examples_async(kw, limit=5) for kw in _meaning_keywords(m)),
+                return_exceptions=True,
+            ))
+
+        results = await asyncio.gather(*(by_meaning(m) for m, _ in lacking))
+        plan = [(m, exs, n) for (m, n), exs in zip(lacking, results) if exs]
+
+    def _save_all():
+        if sum(_save_examples(m, exs, n) for m, exs, n in plan):
+            _examples_changed(word)
+
+    await sync_to_async(_save_all)()
+
+    logger.info(
+        f"[TIMING] fill_examples_for_word_async DONE: {(time.perf_counter() - t_start)*1000:.2f}ms"
+    )
 
 
 # ---------------------------------------------------------
 #  MAIN INGEST (SEARCH ONLY)
 # ---------------------------------------------------------
 
-def upsert_from_jisho(keyword: str) -> list[Word]:
-    total_start = time.perf_counter()
-
+def upsert_from_jisho(keyword: str, refresh: bool = False) -> list[Word]:
     payload = jisho_search(keyword)
+    words = ingest_jisho_payload(payload, refresh=refresh)
+    remember_query(keyword, words)
+    return words
+
 
+def _query_key(keyword: str) -> str:
+    normalized = unicodedata.normalize("NFKC", keyword).strip().lower()
+    return "jisho-query:" + hashlib.sha1(normalized.encode()).hexdigest()
+
+
+def remember_query(keyword: str, words: list[Word]) -> None:
+    """
+    Ghi lại id word Jisho trả về cho keyword: query romaji / tiếng Anh ("dog" -> 犬) không khớp
+    kanji/kana của word đã ingest, lần sau SearchView tra mapping này thay vì fuzzy / Jisho.
+    """
+    cache.set(_query_key(keyword), [w.id for w in words], QUERY_TTL)
+
+
+def known_query_ids(keyword: str) -> list[int] | None:
+    """Id word Jisho đã trả cho keyword ([] = Jisho không có gì), None nếu chưa từng tra."""
+    return cache.get(_query_key(keyword))
+
+
+def ingest_jisho_payload(payload: dict, refresh: bool = False) -> list[Word]:
+    """Lưu kết quả Jisho (đã fetch, sync hoặc async) vào Word / WordMeaning."""
     words: list[Word] = []
 
     with transaction.atomic():
@@ -192,8 +410,17 @@ def upsert_from_jisho(keyword: str) -> list[Word]:
                     jlpt_level = tag.split("-")[-1].upper()
                     break
 
-            w = _get_or_create_word(kanji, kana, parts, jlpt_level)
-            _upsert_meanings(w, senses)
+            w = _get_or_create_word(
+                kanji, kana, parts, jlpt_level,
+                is_common=bool(item.get("is_common")), refresh=refresh,
+            )
+            _upsert_meanings(w, senses, refresh=refresh)
             words.append(w)
 
+    if words:
+        # document detail + payload trong hot cache của các worker không còn đúng
+        rebuild_documents([w.id for w in words])
+        # offline bundle cập nhật incremental trong thread nền (có debounce)
+        schedule_bundle_update()
+
     return words
@@ -2,15 +2,36 @@ import requests
 import time
 import logging
 
+from .breaker import JISHO
+from .http import get_async_client
+
 logger = logging.getLogger(__name__)
 
 BASE = "https://jisho.org/api/v1/search/words"
 
 def jisho_search(keyword: str) -> dict:
     start = time.perf_counter()
-    r = requests.get(BASE, params={"keyword": keyword}, timeout=10)
-    r.raise_for_status()
-    result = r.json()
+
+    def fetch(timeout):
+        r = requests.get(BASE, params={"keyword": keyword}, timeout=timeout)
+        r.raise_for_status()
+        return r.json()
+
+    result = JISHO.call(fetch)
     elapsed = (time.perf_counter() - start) * 1000
     logger.info(f"[TIMING] jisho_search('{keyword}'): {elapsed:.2f}ms")
     return result
+
+
+async def jisho_search_async(keyword: str) -> dict:
+    start = time.perf_counter()
+
+    async def fetch(timeout):
+        r = await get_async_client().get(BASE, params={"keyword": keyword}, timeout=timeout)
+        r.raise_for_status()
+        return r.json()
+
+    result = await JISHO.acall(fetch)
+    elapsed = (time.perf_counter() - start) * 1000
+    logger.info(f"[TIMING] jisho_search_async('{keyword}'): {elapsed:.2f}ms")
+    return result
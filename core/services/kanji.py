@@ -1,7 +1,67 @@
+import hashlib
+
 import requests
+from django.core.cache import cache
+
+from core.renderers import dumps
+
+from .breaker import KANJIAPI
+from .http import get_async_client
+
+BASE = "https://kanjiapi.dev/v1/kanji/"
+CACHE_TTL = 60 * 60 * 24 * 30  # dữ liệu kanji gần như không đổi
+
+
+def _cache_key(char: str) -> str:
+    return f"kanji:{char.encode('utf-8').hex()}"
+
+
+def content_stamp(data: dict) -> str:
+    return hashlib.sha1(dumps(data)).hexdigest()[:16]
+
+
+def _entries(key: str, data: dict) -> dict:
+    """Data + version stamp ghi cùng lúc: ETag check chỉ đọc stamp, không đọc data."""
+    return {key: data, f"{key}:stamp": content_stamp(data)}
+
+
+def kanji_stamp(char: str) -> str | None:
+    """Stamp của kanji đã cache; None nếu chưa có (phải fetch)."""
+    return cache.get(f"{_cache_key(char)}:stamp")
+
+
+async def kanji_stamp_async(char: str) -> str | None:
+    return await cache.aget(f"{_cache_key(char)}:stamp")
+
 
 def fetch_kanji_detail(char: str) -> dict:
-    url = f"https://kanjiapi.dev/v1/kanji/{char}"
-    r = requests.get(url, timeout=8)
-    r.raise_for_status()
-    return r.json()
+    """Đọc cache trước; chỉ gọi kanjiapi khi miss (breaker open -> CircuitOpenError)."""
+    key = _cache_key(char)
+    data = cache.get(key)
+    if data is not None:
+        return data
+
+    def fetch(timeout):
+        r = requests.get(f"{BASE}{char}", timeout=timeout)
+        r.raise_for_status()
+        return r.json()
+
+    data = KANJIAPI.call(fetch)
+    cache.set_many(_entries(key, data), CACHE_TTL)
+    return data
+
+
+async def fetch_kanji_detail_async(char: str) -> dict:
+    key = _cache_key(char)
+    data = await cache.aget(key)
+    if data is not None:
+        return data
+
+    async def fetch(timeout):
+        r = await get_async_client().get(f"{BASE}{char}", timeout=timeout)
+        r.raise_for_status()
+        return r.json()
+
+    data = await KANJIAPI.acall(fetch)
+    await cache.aset_many(_entries(key, data), CACHE_TTL)
+    return data
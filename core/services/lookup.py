@@ -0,0 +1,117 @@
+import hashlib
+import logging
+import unicodedata
+
+from django.db.models import OuterRef, Q, Subquery
+
+from core.models import Word, WordMeaning
+from .background import run_in_background, take_budget
+from .breaker import CircuitOpenError
+from .deinflect import IN_BATCH, lookup_deinflected_many
+from .ingest import upsert_from_jisho
+
+logger = logging.getLogger(__name__)
+
+MAX_TERM_LENGTH = 64
+INGEST_PER_MINUTE = 30          # số lần gọi Jisho / phút cho ingest nền (cả cluster)
+MAX_INGEST_PER_REQUEST = 200
+
+
+def normalize_term(term: str) -> str:
+    return unicodedata.normalize("NFKC", term).strip()[:MAX_TERM_LENGTH]
+
+
+# ---------------------------------------------------------
+#  WORD SUMMARY (1 query cho cả danh sách id)
+# ---------------------------------------------------------
+
+def word_summaries(ids) -> dict[int, dict]:
+    """{word_id: {id, kanji, kana, parts_of_speech, jlpt_level, gloss}}; gloss = nghĩa đầu tiên."""
+    ids = set(ids)
+    if not ids:
+        return {}
+
+    first_meaning = (
+        WordMeaning.objects.filter(word=OuterRef("pk")).order_by("id").values("meaning")[:1]
+    )
+    rows = (
+        Word.objects.filter(id__in=ids)
+        .annotate(gloss=Subquery(first_meaning))
+        .values("id", "kanji", "kana", "parts_of_speech", "jlpt_level", "gloss")
+    )
+    return {row["id"]: row for row in rows}
+
+
+# ---------------------------------------------------------
+#  BULK LOOKUP
+# ---------------------------------------------------------
+
+def bulk_lookup(terms: list[str]) -> dict:
+    """
+    Tra nhiều term cùng lúc, set-based:
+      1) khớp nguyên dạng kanji/kana (1 query / IN_BATCH term)
+      2) term còn thiếu -> thể gốc qua deinflect (1 query / IN_BATCH thể gốc)
+      3) thông tin word (1 query)
+    """
+    results: dict[str, list[int]] = {t: [] for t in terms}
+
+    for start in range(0, len(terms), IN_BATCH):
+        chunk = terms[start:start + IN_BATCH]
+        rows = Word.objects.filter(
+            Q(kanji__in=chunk) | Q(kana__in=chunk)
+        ).order_by("id").values_list("id", "kanji", "kana")
+        for word_id, kanji, kana in rows:
+            for surface in {kanji, kana}:
+                if surface in results:
+                    results[surface].append(word_id)
+
+    misses = [t for t, ids in results.items() if not ids]
+    deinflections = {}
+    for term, traces in lookup_deinflected_many(misses).items():
+        results[term] = list(traces)
+        trace = next(iter(traces.values()))
+        deinflections[term] = {k: trace[k] for k in ("base", "reasons", "description")}
+
+    return {
+        "results": results,
+        "deinflections": deinflections,
+        "words": word_summaries(wid for ids in results.values() for wid in ids),
+        "missing": [t for t, ids in results.items() if not ids],
+    }
+
+
+# ---------------------------------------------------------
+#  INGEST NỀN CHO TERM KHÔNG CÓ TRONG DB
+# ---------------------------------------------------------
+
+def ingest_terms(terms: list[str]) -> int:
+    """Gọi Jisho lần lượt cho từng term (trong giới hạn budget); trả về số term đã ingest."""
+    done = 0
+    for term in terms:
+        # request khác có thể đã ingest term này trong lúc chờ
+        if Word.objects.filter(Q(kanji=term) | Q(kana=term)).exists():
+            continue
+        if not take_budget("bulk-ingest", INGEST_PER_MINUTE):
+            logger.info(f"[LOOKUP] ingest budget exhausted, {len(terms) - done} terms left")
+            break
+        try:
+            upsert_from_jisho(term)
+        except CircuitOpenError:
+            logger.warning("[LOOKUP] Jisho circuit open, stopping background ingest")
+            break
+        except Exception as e:
+            logger.warning(f"[LOOKUP] ingest '{term}' failed: {e}")
+            continue
+        done += 1
+    return done
+
+
+def schedule_ingest(terms: list[str]) -> int:
+    """Xếp 1 job nền cho tối đa MAX_INGEST_PER_REQUEST term; trả về số term đã xếp hàng."""
+    terms = terms[:MAX_INGEST_PER_REQUEST]
+    if not terms:
+        return 0
+    key = hashlib.sha1("\n".join(sorted(terms)).encode()).hexdigest()[:16]
+    if not run_in_background(f"bulk-ingest:{key}", ingest_terms, terms):
+        return 0
+    return len(terms)
@@ -0,0 +1,147 @@
+"""
+Hàng đợi email gửi đi (OutboundEmail), lưu trong DB.
+
+- Request chỉ enqueue (1 INSERT) rồi trả về; SMTP chậm không còn giữ worker gunicorn.
+- Gửi: thread nền kick ngay sau enqueue (schedule_send) + command send_emails (worker / cron)
+  gom các email đến hạn, kể cả email retry.
+- Claim theo lease: lấy email đến hạn (SKIP LOCKED trên Postgres), đẩy next_attempt_at lên
+  LEASE rồi mới gửi ngoài transaction -> 2 worker không gửi trùng; worker chết giữa chừng
+  thì email tự đến hạn lại sau LEASE. EMAIL_TIMEOUT (settings) << LEASE: 1 lần gửi treo
+  không kéo quá lease.
+- Enqueue lúc job nền đang chạy (lock bận) -> đặt cờ RERUN_KEY; job quét lại email đến hạn
+  trước khi nhả lock, không để email mới chờ tới cron.
+- Lỗi -> retry với backoff luỹ thừa (RETRY_BASE * 2^(attempts-1), tối đa RETRY_MAX);
+  quá MAX_ATTEMPTS -> failed.
+"""
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import send_mail
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import OutboundEmail, PasswordResetToken
+from .background import LOCK_TIMEOUT, run_in_background
+
+logger = logging.getLogger(__name__)
+
+PENDING, SENT, FAILED = "pending", "sent", "failed"
+
+BATCH_SIZE = 20
+LEASE = timedelta(minutes=5)
+MAX_ATTEMPTS = 6
+RETRY_BASE = timedelta(minutes=1)
+RETRY_MAX = timedelta(hours=1)
+SENT_RETENTION = timedelta(days=1)      # body chứa link reset -> không giữ lâu
+FAILED_RETENTION = timedelta(days=7)
+RERUN_KEY = "send-emails:rerun"
+
+
+def enqueue_email(to: str, subject: str, body: str) -> OutboundEmail:
+    """Xếp hàng 1 email và kick gửi nền ngay (không chờ SMTP)."""
+    email = OutboundEmail.objects.create(to=to, subject=subject, body=body)
+    # gửi sau khi transaction của request commit (worker nền mới thấy row)
+    transaction.on_commit(schedule_send)
+    return email
+
+
+def schedule_send() -> bool:
+    if run_in_background("send-emails", _send_all):
+        return True
+    # job đang chạy -> báo nó quét lại trước khi nhả lock; thử lại phòng khi nó vừa nhả xong
+    cache.set(RERUN_KEY, 1, LOCK_TIMEOUT)
+    return run_in_background("send-emails", _send_all)
+
+
+def _send_all() -> int:
+    done = send_pending()
+    while cache.delete(RERUN_KEY):
+        done += send_pending()
+    return done
+
+
+def retry_delay(attempts: int) -> timedelta:
+    return min(RETRY_MAX, RETRY_BASE * 2 ** max(attempts - 1, 0))
+
+
+def _claim(limit: int) -> list[OutboundEmail]:
+    now = timezone.now()
+    with transaction.atomic():
+        emails = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=PENDING, next_attempt_at__lte=now)
+            .order_by("next_attempt_at")[:limit]
+        )
+        if emails:
+            OutboundEmail.objects.filter(id__in=[e.id for e in emails]).update(next_attempt_at=now + LEASE)
+    return emails
+
+
+def _deliver(email: OutboundEmail) -> None:
+    email.attempts += 1
+    try:
+        send_mail(
+            subject=email.subject,
+            message=email.body,
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            recipient_list=[email.to],
+            fail_silently=False,
+        )
+    except Exception as e:
+        email.last_error = str(e)[:1000]
+        if email.attempts >= MAX_ATTEMPTS:
+            email.status = FAILED
+            logger.error(f"[MAIL] email {email.id} failed after {email.attempts} attempts: {e}")
+        else:
+            email.next_attempt_at = timezone.now() + retry_delay(email.attempts)
+            logger.warning(f"[MAIL] email {email.id} attempt {email.attempts} failed, retry at {email.next_attempt_at:%H:%M:%S}: {e}")
+        email.save(update_fields=["attempts", "status", "next_attempt_at", "last_error"])
+        return
+
+    email.status = SENT
+    email.sent_at = timezone.now()
+    email.last_error = ""
+    email.save(update_fields=["attempts", "status", "sent_at", "last_error"])
+
+
+def send_pending(limit: int | None = None) -> int:
+    """Gửi các email đến hạn theo batch (tối đa `limit`). Trả về số email đã xử lý."""
+    start = time.perf_counter()
+    done = 0
+    while limit is None or done < limit:
+        batch = _claim(BATCH_SIZE if limit is None else min(BATCH_SIZE, limit - done))
+        if not batch:
+            break
+        for email in batch:
+            _deliver(email)
+        done += len(batch)
+    if done:
+        logger.info(f"[TIMING] send_pending: {done} emails in {(time.perf_counter() - start) * 1000:.2f}ms")
+    return done
+
+
+# ---------------------------------------------------------
+#  PURGE (cron purge_password_resets)
+# ---------------------------------------------------------
+
+def purge_reset_tokens() -> int:
+    """Xoá token hết hạn hoặc đã dùng (1 DELETE)."""
+    deleted, _ = PasswordResetToken.objects.filter(
+        Q(is_used=True) | Q(expires_at__lt=timezone.now())
+    ).delete()
+    logger.info(f"[MAIL] purged {deleted} password reset tokens")
+    return deleted
+
+
+def purge_emails() -> int:
+    now = timezone.now()
+    deleted, _ = OutboundEmail.objects.filter(
+        Q(status=SENT, sent_at__lt=now - SENT_RETENTION)
+        | Q(status=FAILED, created_at__lt=now - FAILED_RETENTION)
+    ).delete()
+    logger.info(f"[MAIL] purged {deleted} outbound emails")
+    return deleted
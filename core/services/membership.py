@@ -0,0 +1,56 @@
+import hashlib
+
+from core.models import Favorite, FlashcardWord
+from core.services.sync import MEMBERSHIP, latest_version
+
+
+# ---------------------------------------------------------
+#  VERSION STAMP
+# ---------------------------------------------------------
+
+def get_membership_version(user_id: int) -> str:
+    """
+    Version stamp cho favorites + flashcards của user = version mới nhất của các entity
+    membership trong change log delta sync (history không tính: flush history không đổi
+    ETag), bền qua restart / cull cache. purge_tombstones giữ lại dòng mới nhất -> không lùi.
+    """
+    return str(latest_version(user_id, MEMBERSHIP))
+
+
+def membership_etag(version: str, word_ids: list[int]) -> str:
+    digest = hashlib.sha1(",".join(map(str, word_ids)).encode()).hexdigest()[:12]
+    return f'"{version}-{digest}"'
+
+
+# ---------------------------------------------------------
+#  BATCH LOOKUP
+# ---------------------------------------------------------
+
+def batch_membership(user, word_ids: list[int]) -> dict[int, dict]:
+    """
+    Trả về {word_id: {"favorited": bool, "flashcards": [deck_id, ...]}}
+    chỉ với 2 query (favorites + flashcard items), không phụ thuộc số word.
+    """
+    result = {wid: {"favorited": False, "flashcards": []} for wid in word_ids}
+
+    if not user or not user.is_authenticated or not word_ids:
+        return result
+
+    favorited = set(
+        Favorite.objects.filter(user=user, word_id__in=word_ids)
+        .values_list("word_id", flat=True)
+    )
+
+    items = (
+        FlashcardWord.objects.filter(flashcard__user=user, word_id__in=word_ids)
+        .values_list("word_id", "flashcard_id")
+        .order_by("flashcard_id")
+        .distinct()
+    )
+
+    for wid in favorited:
+        result[wid]["favorited"] = True
+    for wid, deck_id in items:
+        result[wid]["flashcards"].append(deck_id)
+
+    return result
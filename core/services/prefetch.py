@@ -0,0 +1,63 @@
+"""
+Prefetch example cho các kết quả đầu của search: user gần như luôn mở 1 trong vài kết quả
+đầu -> enrich example nền ngay sau search, WordDetailView sau đó đọc thẳng từ DB thay vì
+chờ Tatoeba.
+"""
+import logging
+
+from django.core.cache import cache
+
+from core.models import Word
+from .background import is_queued, run_in_background, take_budget
+from .documents import is_complete
+from .ingest import _fill_examples_for_word, needs_examples
+
+logger = logging.getLogger(__name__)
+
+PREFETCH_TOP_N = 3          # số kết quả đầu trang được prefetch
+PREFETCH_PER_MINUTE = 30    # tổng số job prefetch / phút cho cả cluster
+RETRY_AFTER = 3600          # giây; Tatoeba không có câu cho word -> không thử lại ngay
+
+
+def _tried_key(word_id: int) -> str:
+    return f"prefetch-examples-tried:{word_id}"
+
+
+def prefetch_examples(word_id: int) -> bool:
+    """
+    Enrich example cho word nếu còn meaning chưa có; True nếu đã chạy enrich.
+    Chỉ đánh dấu "đã thử" khi đã thực sự tìm (không bị breaker / rate limiter chặn)
+    mà không link được câu nào -> schedule_prefetch không xếp lại trong RETRY_AFTER.
+    """
+    word = Word.objects.filter(pk=word_id).first()
+    if word is None or not needs_examples(word):
+        return False  # đã bị xoá hoặc detail view / worker khác vừa enrich xong
+    linked, complete = _fill_examples_for_word(word, per_meaning=3)
+    if complete and not linked:
+        cache.set(_tried_key(word_id), 1, RETRY_AFTER)
+    logger.info(f"[PREFETCH] examples prefetched for word {word_id}: {linked} linked")
+    return True
+
+
+def schedule_prefetch(payloads: list[dict]) -> int:
+    """
+    payloads: trang kết quả (payload word đã serialize, theo thứ tự hiển thị).
+    Xếp hàng enrich nền cho tối đa PREFETCH_TOP_N word đầu còn meaning chưa có example;
+    dừng khi hết budget phút này. Trả về số job đã xếp.
+    """
+    ids = [p["id"] for p in payloads[:PREFETCH_TOP_N] if not is_complete(p)]
+    if not ids:
+        return 0
+
+    tried = cache.get_many([_tried_key(wid) for wid in ids])
+    scheduled = 0
+    for word_id in ids:
+        key = f"prefetch-examples:{word_id}"
+        # job đang chạy / đã xếp -> bỏ qua trước khi tốn budget
+        if _tried_key(word_id) in tried or is_queued(key):
+            continue
+        if not take_budget("prefetch-examples", PREFETCH_PER_MINUTE):
+            break
+        if run_in_background(key, prefetch_examples, word_id):
+            scheduled += 1
+    return scheduled
@@ -0,0 +1,67 @@
+"""
+Build các index in-memory trước khi fork worker (gunicorn preload_app, xem gunicorn.conf.py).
+
+Worker fork từ master dùng chung các trang nhớ của index (copy-on-write) thay vì mỗi
+worker tự build 1 bản. gc.freeze() đưa mọi object hiện có ra khỏi GC để lượt quét GC
+trong worker không ghi vào header object -> trang nhớ không bị copy.
+
+Giữ được sharing lâu dài:
+- Index preload có TTL trong worker là SHARED_INDEX_TTL (không phải INDEX_TTL 10 phút):
+  worker không tự build bản riêng ngay sau deploy.
+- Master build lại index khi đã cũ hơn INDEX_TTL, ngay trước khi fork worker mới
+  (hook pre_fork); worker được recycle định kỳ (max_requests) -> worker mới fork bản mới.
+- SHARED_INDEX_TTL là chặn trên khi worker sống rất lâu (ít traffic): quá hạn thì worker
+  tự refresh như cũ.
+- Preload lỗi (DB chưa sẵn sàng...) -> không thử lại ở mỗi lần fork mà chờ PRELOAD_RETRY_AFTER:
+  worker vẫn tự build khi cần, master không build lại liên tục chặn việc spawn worker.
+"""
+import gc
+import logging
+import time
+
+from django.db import connections
+
+from . import fuzzy, segment
+
+logger = logging.getLogger(__name__)
+
+SHARED_INDEX_TTL = 6 * 3600   # giây
+PRELOAD_RETRY_AFTER = 300     # giây
+
+_preloaded_at = None
+_failed_at = None
+
+
+def preload_indexes() -> None:
+    global _preloaded_at, _failed_at
+    start = time.perf_counter()
+    try:
+        segment.preload(ttl=SHARED_INDEX_TTL)
+        fuzzy.preload(ttl=SHARED_INDEX_TTL)
+        _preloaded_at = time.monotonic()
+        _failed_at = None
+    except Exception:
+        # DB chưa sẵn sàng (vd. lần deploy đầu chưa migrate) -> worker tự build khi cần
+        _failed_at = time.monotonic()
+        logger.exception("[PRELOAD] index preload failed")
+    finally:
+        # kết nối DB mở trong master không được dùng chung với worker
+        connections.close_all()
+
+    gc.collect()
+    gc.freeze()
+    logger.info(f"[TIMING] preload_indexes: {(time.perf_counter() - start) * 1000:.2f}ms")
+
+
+def refresh_if_stale() -> bool:
+    """
+    Gọi trong master trước khi fork: index cũ hơn INDEX_TTL -> build lại. True nếu đã build.
+    Lần preload trước lỗi -> chờ PRELOAD_RETRY_AFTER rồi mới thử lại.
+    """
+    now = time.monotonic()
+    if _preloaded_at is not None and now - _preloaded_at <= segment.INDEX_TTL:
+        return False
+    if _failed_at is not None and now - _failed_at <= PRELOAD_RETRY_AFTER:
+        return False
+    preload_indexes()
+    return True
@@ -0,0 +1,85 @@
+"""
+Rollup tần suất query của SearchView: (query đã normalize, ngày) -> count, gồm cả user
+chưa login. Mỗi worker đếm trong buffer, flush theo batch (FlushBuffer, giống SearchHistory) -> 1 search
+không tốn thêm query nào. warm_cache đọc top query từ đây để làm nóng DB ngoài giờ cao điểm.
+"""
+import logging
+import unicodedata
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from core.models import SearchQueryCount
+from .buffered import FlushBuffer
+
+logger = logging.getLogger(__name__)
+
+MAX_QUERY_LENGTH = 64
+FLUSH_SIZE = 200         # flush khi buffer đạt số (query, ngày) khác nhau này
+FLUSH_INTERVAL = 30.0    # hoặc khi entry cũ nhất đã nằm quá N giây
+RETENTION = timedelta(days=90)
+
+
+def normalize_query(q: str) -> str:
+    """NFKC + lower + gộp khoảng trắng: "ＴＡＢＥＲＵ " và "taberu" là 1 query."""
+    return " ".join(unicodedata.normalize("NFKC", q).lower().split())[:MAX_QUERY_LENGTH]
+
+
+def record_query(q: str) -> None:
+    query = normalize_query(q)
+    if not query:
+        return
+
+    key = (query, timezone.localdate())
+
+    def update(items):
+        items[key] += 1
+
+    _buffer.add(update)
+
+
+def flush_query_counts() -> None:
+    _buffer.flush()
+
+
+def _write_counts(pending: dict) -> None:
+    """Tạo row còn thiếu (count 0) rồi cộng dồn: 1 UPDATE cho mỗi (ngày, mức tăng)."""
+    try:
+        SearchQueryCount.objects.bulk_create(
+            [SearchQueryCount(query=query, day=day) for query, day in pending],
+            ignore_conflicts=True,
+        )
+        # phần lớn query chỉ +1 trong 1 batch -> vài UPDATE cho cả batch
+        groups: dict[tuple, list[str]] = defaultdict(list)
+        for (query, day), n in pending.items():
+            groups[(day, n)].append(query)
+        for (day, n), queries in groups.items():
+            SearchQueryCount.objects.filter(day=day, query__in=queries).update(count=F("count") + n)
+    except Exception:
+        logger.exception(f"[QUERY_STATS] flush failed, dropped {len(pending)} entries")
+
+
+# (query, day) -> số lần ; buffer riêng cho mỗi worker process
+_buffer = FlushBuffer("query-stats", _write_counts, FLUSH_SIZE, FLUSH_INTERVAL, factory=Counter)
+
+
+def top_queries(days: int = 7, limit: int = 200) -> list[tuple[str, int]]:
+    """[(query, tổng count)] trong `days` ngày gần nhất, nhiều nhất trước."""
+    since = timezone.localdate() - timedelta(days=days - 1)
+    return list(
+        SearchQueryCount.objects.filter(day__gte=since)
+        .values("query")
+        .annotate(total=Sum("count"))
+        .order_by("-total", "query")
+        .values_list("query", "total")[:limit]
+    )
+
+
+def purge_query_counts(older_than: timedelta = RETENTION) -> int:
+    cutoff = timezone.localdate() - older_than
+    deleted, _ = SearchQueryCount.objects.filter(day__lt=cutoff).delete()
+    logger.info(f"[QUERY_STATS] purged {deleted} rollup rows before {cutoff:%Y-%m-%d}")
+    return deleted
+
@@ -1,15 +1,32 @@
 import os
 import json
+import asyncio
+import logging
+import threading
 import time
 import random
-import google.generativeai as genai
+
+logger = logging.getLogger(__name__)
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-else:
-    print("[WARN] GEMINI_API_KEY not set!")
+if not GEMINI_API_KEY:
+    logger.warning("[QUIZ] GEMINI_API_KEY not set")
+
+_genai = None
+_genai_lock = threading.Lock()
+
+
+def _gemini_model():
+    """Import SDK Gemini (~1s) lần đầu sinh quiz thay vì lúc boot mỗi worker."""
+    global _genai
+    if _genai is None:
+        with _genai_lock:
+            if _genai is None:
+                import google.generativeai as genai
+                genai.configure(api_key=GEMINI_API_KEY)
+                _genai = genai
+    return _genai.GenerativeModel("gemini-2.0-flash")
 
 
 LEVEL_INFO = {
@@ -28,7 +45,7 @@ def retry_call(fn, retries=5):
         except Exception as e:
             if "429" in str(e):
                 wait = (2 ** i) + random.random()
-                print(f"[429] Retry after {wait:.1f}s...")
+                logger.warning(f"[QUIZ] Gemini 429, retry after {wait:.1f}s")
                 time.sleep(wait)
             else:
                 raise e
@@ -52,10 +69,31 @@ def clean_gemini_text(text: str) -> str:
     return cleaned
 
 
-def build_jlpt_prompt(level, count):
-    level = level.upper()
+def normalize_level(level) -> str:
+    level = str(level or "").upper()
     if not level.startswith("N"):
         level = "N" + level
+    return level
+
+
+def validate_questions(data) -> list[dict]:
+    """Giữ lại các câu hỏi đúng format: sentence + 4 choices + correct_index."""
+    questions = []
+    for q in data if isinstance(data, list) else []:
+        if (
+            isinstance(q, dict)
+            and "sentence" in q
+            and isinstance(q.get("choices"), list)
+            and len(q["choices"]) == 4
+            and isinstance(q.get("correct_index"), int)
+            and 0 <= q["correct_index"] < 4
+        ):
+            questions.append(q)
+    return questions
+
+
+def build_jlpt_prompt(level, count):
+    level = normalize_level(level)
 
     desc = LEVEL_INFO.get(level, "JLPT Japanese")
 
@@ -82,6 +120,24 @@ Difficulty: {desc}
 """
 
 
+def parse_quiz_response(raw_text: str, count: int) -> list[dict]:
+    cleaned = clean_gemini_text(raw_text)
+
+    # Must start with [
+    if not cleaned.startswith("["):
+        raise RuntimeError("Gemini output not JSON")
+
+    data = json.loads(cleaned)
+
+    # Validate
+    questions = validate_questions(data)
+
+    if not questions:
+        raise RuntimeError("Gemini JSON structure invalid")
+
+    return questions[:count]
+
+
 def generate_jlpt_quiz(level="N5", count=10):
     if not GEMINI_API_KEY:
         raise RuntimeError("Missing GEMINI_API_KEY")
@@ -89,39 +145,46 @@ def generate_jlpt_quiz(level="N5", count=10):
     prompt = build_jlpt_prompt(level, count)
 
     try:
-        model = genai.GenerativeModel("gemini-2.0-flash")
+        model = _gemini_model()
 
         response = retry_call(lambda: model.generate_content(prompt))
 
         raw_text = response.text or ""
-        print("========== RAW GEMINI ==========")
-        print(raw_text)
-        print("================================")
-
-        cleaned = clean_gemini_text(raw_text)
-
-        # Must start with [
-        if not cleaned.startswith("["):
-            raise RuntimeError("Gemini output not JSON")
-
-        data = json.loads(cleaned)
-
-        # Validate
-        questions = []
-        for q in data:
-            if (
-                isinstance(q, dict)
-                and "sentence" in q
-                and isinstance(q.get("choices"), list)
-                and len(q["choices"]) == 4
-                and isinstance(q.get("correct_index"), int)
-            ):
-                questions.append(q)
-
-        if not questions:
-            raise RuntimeError("Gemini JSON structure invalid")
-
-        return questions[:count]
+        logger.debug(f"[QUIZ] raw Gemini output: {raw_text}")
+
+        return parse_quiz_response(raw_text, count)
+
+    except Exception as e:
+        raise RuntimeError(f"Failed to generate quiz: {e}")
+
+
+async def retry_call_async(fn, retries=5):
+    """Như retry_call nhưng chờ bằng asyncio.sleep -> không chặn event loop."""
+    for i in range(retries):
+        try:
+            return await fn()
+        except Exception as e:
+            if "429" in str(e):
+                wait = (2 ** i) + random.random()
+                logger.warning(f"[QUIZ] Gemini 429, retry after {wait:.1f}s")
+                await asyncio.sleep(wait)
+            else:
+                raise e
+    raise RuntimeError("Too many retries")
+
+
+async def generate_jlpt_quiz_async(level="N5", count=10):
+    if not GEMINI_API_KEY:
+        raise RuntimeError("Missing GEMINI_API_KEY")
+
+    prompt = build_jlpt_prompt(level, count)
+
+    try:
+        model = _gemini_model()
+
+        response = await retry_call_async(lambda: model.generate_content_async(prompt))
+
+        return parse_quiz_response(response.text or "", count)
 
     except Exception as e:
         raise RuntimeError(f"Failed to generate quiz: {e}")
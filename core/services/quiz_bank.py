@@ -0,0 +1,112 @@
+import hashlib
+import logging
+import time
+
+from django.db.models import Count, Window
+
+from core.models import QuizQuestion
+from .background import run_in_background
+from .quiz import LEVEL_INFO, generate_jlpt_quiz, validate_questions
+
+logger = logging.getLogger(__name__)
+
+LOW_WATER = 50        # còn ít hơn số này -> trigger refill nền
+TARGET_SIZE = 200     # refill tới khi bank đạt số này
+BATCH_SIZE = 20       # số câu mỗi lần gọi Gemini
+MAX_BATCHES = 15      # giới hạn số lần gọi Gemini cho 1 lần refill
+EMPTY_RETRY_AFTER = 30  # giây; bank trống -> client thử lại sau khi refill nền chạy
+
+
+class QuizBankEmpty(Exception):
+    """Bank của level chưa có câu nào; refill nền đã được xếp hàng (-> 503 + Retry-After)."""
+
+    retry_after = EMPTY_RETRY_AFTER
+
+
+def sentence_hash(sentence: str) -> str:
+    normalized = "".join(sentence.split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+# ---------------------------------------------------------
+#  STORE / REFILL
+# ---------------------------------------------------------
+
+def store_questions(level: str, questions: list[dict]) -> int:
+    """Lưu câu hỏi hợp lệ vào bank, bỏ qua câu trùng (theo sentence hash)."""
+    rows = {}
+    for q in validate_questions(questions):
+        h = sentence_hash(q["sentence"])
+        rows[h] = QuizQuestion(
+            level=level,
+            sentence=q["sentence"],
+            sentence_hash=h,
+            choices=q["choices"],
+            correct_index=q["correct_index"],
+        )
+
+    before = QuizQuestion.objects.filter(level=level).count()
+    QuizQuestion.objects.bulk_create(rows.values(), ignore_conflicts=True)
+    return QuizQuestion.objects.filter(level=level).count() - before
+
+
+def refill_bank(level: str, target: int = TARGET_SIZE) -> int:
+    """Gọi Gemini theo batch cho tới khi bank của level đạt `target` câu."""
+    start = time.perf_counter()
+    added = 0
+
+    for _ in range(MAX_BATCHES):
+        size = QuizQuestion.objects.filter(level=level).count()
+        if size >= target:
+            break
+
+        questions = generate_jlpt_quiz(level, min(BATCH_SIZE, target - size))
+        added += store_questions(level, questions)
+
+    logger.info(
+        f"[TIMING] refill_bank({level}): +{added} questions in {(time.perf_counter() - start) * 1000:.2f}ms"
+    )
+    return added
+
+
+def trigger_refill(level: str) -> bool:
+    return run_in_background(f"quiz-refill:{level}", refill_bank, level)
+
+
+# ---------------------------------------------------------
+#  SAMPLE
+# ---------------------------------------------------------
+
+def sample_questions(level: str, count: int) -> list[dict]:
+    """
+    Lấy ngẫu nhiên `count` câu của level trong 1 query
+    (window COUNT trả luôn kích thước bank để so với low-water mark).
+    Bank trống (lần đầu deploy) -> xếp refill nền rồi raise QuizBankEmpty,
+    request không bao giờ chờ Gemini.
+    """
+    if level not in LEVEL_INFO:
+        raise ValueError(f"Unknown JLPT level: {level}")
+
+    rows = list(
+        QuizQuestion.objects.filter(level=level)
+        .annotate(bank_size=Window(Count("id")))
+        .order_by("?")
+        .values("id", "sentence", "choices", "correct_index", "bank_size")[:count]
+    )
+
+    bank_size = rows[0]["bank_size"] if rows else 0
+    if bank_size < LOW_WATER:
+        trigger_refill(level)
+
+    if not rows:
+        raise QuizBankEmpty(f"Question bank for {level} is being generated, retry shortly")
+
+    return [
+        {
+            "id": r["id"],
+            "sentence": r["sentence"],
+            "choices": r["choices"],
+            "correct_index": r["correct_index"],
+        }
+        for r in rows
+    ]
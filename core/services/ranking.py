@@ -0,0 +1,85 @@
+"""
+Xếp hạng kết quả search: exact > prefix > substring, cùng hạng thì theo Word.score.
+
+score tính trước và lưu trong cột có index (order by không tốn gì lúc query):
+  commonness  : is_common (JMdict priority news1/ichi1/spec1/gai1, Jisho trả về) + JLPT
+  popularity  : số user có word trong SearchHistory (log2, để vài word hot không lấn hết)
+"""
+import logging
+import math
+import time
+
+from django.db.models import Case, Count, IntegerField, Q, Value, When
+
+from core.models import SearchHistory, Word
+
+logger = logging.getLogger(__name__)
+
+COMMON_WEIGHT = 100
+JLPT_WEIGHT = {"N5": 50, "N4": 40, "N3": 30, "N2": 20, "N1": 10}
+POPULARITY_WEIGHT = 10      # mỗi lần số user tăng gấp đôi -> +10
+POPULARITY_CAP = 100
+
+EXACT, PREFIX, SUBSTRING = 0, 1, 2
+BATCH_SIZE = 2000
+
+
+def compute_score(is_common: bool, jlpt_level: str | None, search_count: int) -> int:
+    score = COMMON_WEIGHT if is_common else 0
+    score += JLPT_WEIGHT.get((jlpt_level or "").upper(), 0)
+    score += min(POPULARITY_CAP, int(POPULARITY_WEIGHT * math.log2(1 + search_count)))
+    return score
+
+
+# ---------------------------------------------------------
+#  QUERY TIME
+# ---------------------------------------------------------
+
+def rank_matches(qs, q: str):
+    """qs đã lọc icontains trên kanji/kana -> thêm match_rank, order theo hạng rồi score."""
+    return qs.annotate(
+        match_rank=Case(
+            When(Q(kanji=q) | Q(kana=q), then=Value(EXACT)),
+            When(Q(kanji__startswith=q) | Q(kana__startswith=q), then=Value(PREFIX)),
+            default=Value(SUBSTRING),
+            output_field=IntegerField(),
+        )
+    ).order_by("match_rank", "-score", "id")
+
+
+def by_score(qs):
+    """Kết quả không khớp nguyên văn query (deinflect, fuzzy, reverse, Jisho)."""
+    return qs.order_by("-score", "id")
+
+
+# ---------------------------------------------------------
+#  PRECOMPUTE
+# ---------------------------------------------------------
+
+def refresh_scores() -> int:
+    """
+    Đếm lại popularity từ SearchHistory (1 GROUP BY) và ghi lại score cho các word bị đổi.
+    Chạy định kỳ (cron refresh_word_scores); ingest tự tính score cho word mới.
+    """
+    start = time.perf_counter()
+    counts = dict(
+        SearchHistory.objects.values_list("word_id")
+        .annotate(n=Count("user_id", distinct=True))
+        .values_list("word_id", "n")
+    )
+
+    changed = []
+    rows = Word.objects.only("id", "is_common", "jlpt_level", "search_count", "score")
+    for word in rows.iterator(chunk_size=BATCH_SIZE):
+        search_count = counts.get(word.id, 0)
+        score = compute_score(word.is_common, word.jlpt_level, search_count)
+        if (word.search_count, word.score) != (search_count, score):
+            word.search_count, word.score = search_count, score
+            changed.append(word)
+
+    Word.objects.bulk_update(changed, ["search_count", "score"], batch_size=BATCH_SIZE)
+    logger.info(
+        f"[TIMING] refresh_scores: {len(changed)} words updated "
+        f"in {(time.perf_counter() - start) * 1000:.2f}ms"
+    )
+    return len(changed)
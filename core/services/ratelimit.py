@@ -0,0 +1,235 @@
+"""
+Rate limiter dùng chung cả cluster cho từng upstream (Jisho, Tatoeba, KanjiAPI).
+
+Token bucket lưu trong DB (RateLimitBucket, 1 row / upstream): lấy token = 1 câu UPDATE
+có điều kiện (refill theo thời gian + trừ 1 token trong cùng statement) -> atomic giữa mọi
+worker; row lock chỉ giữ trong đúng câu UPDATE đó (không transaction, không SELECT FOR UPDATE).
+Thời gian refill lấy từ đồng hồ của DB (db_epoch), không phải time.time() của từng worker:
+lệch giờ giữa các host không làm refill chạy lùi / vượt.
+Hết token -> chờ tới khi đủ (tối đa MAX_WAIT theo priority).
+
+Priority:
+  INTERACTIVE  request của user (search miss, enrich detail): được dùng cạn bucket
+  BACKGROUND   job nền (run_in_background, cron): chỉ lấy khi bucket còn trên
+               BACKGROUND_RESERVE -> phần dự trữ luôn dành cho request interactive.
+               Chờ tối đa ~1s rồi bỏ cuộc: job nền chạy trên pool 2 thread, không được
+               giữ thread để ngủ chờ token. Command cron (không dùng pool) có thể chờ lâu
+               hơn qua priority(BACKGROUND, max_wait=...).
+
+Upstream trả 429 -> penalize(): bucket âm (theo Retry-After) -> mọi worker cùng lùi lại,
+throughput nằm ngay dưới limit thay vì dao động thành bão 429.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import F, FloatField, Func, Value
+from django.db.models.functions import Greatest, Least
+from django.db.models.lookups import GreaterThanOrEqual
+
+from core.models import RateLimitBucket
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE, BACKGROUND = "interactive", "background"
+PRIORITIES = (INTERACTIVE, BACKGROUND)
+
+BACKGROUND_RESERVE = 0.5                       # phần burst chỉ dành cho interactive
+MAX_WAIT = {INTERACTIVE: 3.0, BACKGROUND: 1.0}   # giây
+POLL_INTERVAL = 0.5
+DEFAULT_PENALTY = 2.0                          # giây, khi 429 không có Retry-After
+WINDOW = 200
+
+_priority: ContextVar[str] = ContextVar("upstream_priority", default=INTERACTIVE)
+_max_wait: ContextVar[float | None] = ContextVar("upstream_max_wait", default=None)
+
+
+class RateLimitExceeded(RuntimeError):
+    """Chờ token quá MAX_WAIT của priority hiện tại."""
+
+
+def current_priority() -> str:
+    return _priority.get()
+
+
+def current_max_wait() -> float:
+    return _max_wait.get() or MAX_WAIT[current_priority()]
+
+
+@contextmanager
+def priority(value: str, max_wait: float | None = None):
+    """
+    Mọi call upstream trong block dùng priority này (vd. job nền -> BACKGROUND).
+    max_wait: ghi đè thời gian chờ token tối đa (command cron chờ được lâu hơn job trong pool).
+    """
+    token = _priority.set(value)
+    wait_token = _max_wait.set(max_wait)
+    try:
+        yield
+    finally:
+        _max_wait.reset(wait_token)
+        _priority.reset(token)
+
+
+class db_epoch(Func):
+    """Giờ hiện tại của DB (epoch, giây, float): mọi worker dùng chung 1 đồng hồ."""
+    template = "EXTRACT(EPOCH FROM CURRENT_TIMESTAMP)"
+    output_field = FloatField()
+
+    def as_postgresql(self, compiler, connection, **extra):
+        return self.as_sql(
+            compiler, connection,
+            template="EXTRACT(EPOCH FROM clock_timestamp())::double precision", **extra,
+        )
+
+    def as_sqlite(self, compiler, connection, **extra):
+        return self.as_sql(
+            compiler, connection,
+            template="((julianday('now') - 2440587.5) * 86400.0)", **extra,
+        )
+
+
+class RateLimiter:
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        # metric theo process: thời gian chờ token (queue wait) theo priority
+        self._waits = {p: deque(maxlen=WINDOW) for p in PRIORITIES}
+        self._rejected = {p: 0 for p in PRIORITIES}
+
+    @property
+    def rate(self) -> tuple[float, float]:
+        """(token / giây, burst)."""
+        return settings.UPSTREAM_RATE_LIMITS[self.name]
+
+    # -----------------------------
+    # shared bucket
+    # -----------------------------
+    def _level(self, per_sec: float, burst: float):
+        """Số token hiện có, tính trong SQL theo đồng hồ DB (refill không bao giờ âm)."""
+        elapsed = Greatest(db_epoch() - F("updated_at"), Value(0.0), output_field=FloatField())
+        return Least(
+            Value(float(burst)),
+            F("tokens") + elapsed * Value(per_sec),
+            output_field=FloatField(),
+        )
+
+    def _create_bucket(self, burst: int) -> None:
+        # lần đầu: bucket đầy (updated_at = 0 -> refill tới burst); worker khác tạo trước -> bỏ qua
+        RateLimitBucket.objects.bulk_create(
+            [RateLimitBucket(name=self.name, tokens=float(burst), updated_at=0.0)],
+            ignore_conflicts=True,
+        )
+
+    def _take(self, prio: str) -> float:
+        """Lấy 1 token; trả về 0 nếu được, ngược lại số giây ước tính phải chờ."""
+        per_sec, burst = self.rate
+        floor = burst * BACKGROUND_RESERVE if prio == BACKGROUND else 0.0
+        level = self._level(per_sec, burst)
+        taken = RateLimitBucket.objects.filter(
+            GreaterThanOrEqual(level, floor + 1), name=self.name,
+        ).update(tokens=level - 1, updated_at=db_epoch())
+        if taken:
+            return 0.0
+
+        current = (
+            RateLimitBucket.objects.filter(name=self.name)
+            .annotate(level=level)
+            .values_list("level", flat=True)
+            .first()
+        )
+        if current is None:
+            self._create_bucket(burst)
+            return self._take(prio)
+        return max((floor + 1 - current) / per_sec, 0.01)
+
+    def penalize(self, retry_after: float | None = None) -> None:
+        """Upstream trả 429: rút cạn bucket (âm) -> cả cluster chờ retry_after giây."""
+        per_sec, burst = self.rate
+        seconds = retry_after or DEFAULT_PENALTY
+        # 429 ngay call đầu tiên của process (chưa có row) -> UPDATE không có gì để rút
+        self._create_bucket(burst)
+        RateLimitBucket.objects.filter(name=self.name).update(
+            tokens=-per_sec * seconds, updated_at=db_epoch()
+        )
+        logger.warning(f"[RATELIMIT] {self.name} got 429, backing off {seconds:.1f}s")
+
+    # -----------------------------
+    # acquire
+    # -----------------------------
+    def _record(self, prio: str, waited: float, ok: bool) -> None:
+        with self._lock:
+            self._waits[prio].append(waited)
+            if not ok:
+                self._rejected[prio] += 1
+        if waited >= POLL_INTERVAL:
+            logger.info(f"[TIMING] {self.name} {prio} queue wait: {waited * 1000:.0f}ms")
+
+    def _rejected_error(self, prio: str) -> RateLimitExceeded:
+        return RateLimitExceeded(f"{self.name} rate limit reached ({prio})")
+
+    def acquire(self) -> None:
+        prio = current_priority()
+        start = time.monotonic()
+        deadline = start + current_max_wait()
+        while True:
+            wait = self._take(prio)
+            if not wait:
+                self._record(prio, time.monotonic() - start, True)
+                return
+            if time.monotonic() + wait > deadline:
+                self._record(prio, time.monotonic() - start, False)
+                raise self._rejected_error(prio)
+            time.sleep(min(wait, POLL_INTERVAL))
+
+    async def acquire_async(self) -> None:
+        prio = current_priority()
+        start = time.monotonic()
+        deadline = start + current_max_wait()
+        while True:
+            wait = await sync_to_async(self._take)(prio)
+            if not wait:
+                self._record(prio, time.monotonic() - start, True)
+                return
+            if time.monotonic() + wait > deadline:
+                self._record(prio, time.monotonic() - start, False)
+                raise self._rejected_error(prio)
+            await asyncio.sleep(min(wait, POLL_INTERVAL))
+
+    # -----------------------------
+    # metrics
+    # -----------------------------
+    def snapshot(self) -> dict:
+        per_sec, burst = self.rate
+        out = {"rate_per_sec": per_sec, "burst": burst}
+        with self._lock:
+            for prio in PRIORITIES:
+                waits = sorted(self._waits[prio])
+                out[prio] = {
+                    "samples": len(waits),
+                    "rejected": self._rejected[prio],
+                    "wait_p50_ms": _percentile_ms(waits, 0.5),
+                    "wait_p95_ms": _percentile_ms(waits, 0.95),
+                }
+        return out
+
+
+def retry_after_seconds(exc: Exception) -> float | None:
+    response = getattr(exc, "response", None)
+    value = getattr(response, "headers", {}).get("Retry-After") if response is not None else None
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None  # dạng HTTP-date -> dùng DEFAULT_PENALTY
+
+
+def _percentile_ms(samples: list[float], p: float):
+    if not samples:
+        return None
+    return round(samples[min(len(samples) - 1, int(len(samples) * p))] * 1000, 2)
@@ -0,0 +1,65 @@
+import logging
+from datetime import timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import Word
+from .background import is_queued, run_in_background, take_budget
+from .ingest import upsert_from_jisho
+
+logger = logging.getLogger(__name__)
+
+FRESHNESS_TTL = timedelta(days=30)
+REFRESH_PER_MINUTE = 20     # tổng số re-ingest / phút cho cả cluster
+MAX_PER_REQUEST = 5         # số từ stale tối đa được xếp hàng từ 1 request
+
+
+# ---------------------------------------------------------
+#  STALE-WHILE-REVALIDATE
+# ---------------------------------------------------------
+
+def stale_q() -> Q:
+    cutoff = timezone.now() - FRESHNESS_TTL
+    return Q(refreshed_at__isnull=True) | Q(refreshed_at__lt=cutoff)
+
+
+def is_stale(word: Word) -> bool:
+    return word.refreshed_at is None or word.refreshed_at < timezone.now() - FRESHNESS_TTL
+
+
+def refresh_word(word_id: int) -> None:
+    """Re-ingest 1 từ qua upsert_from_jisho (ghi đè dữ liệu cũ nếu Jisho đã cập nhật)."""
+    word = Word.objects.filter(pk=word_id).first()
+    if word is None or not is_stale(word):
+        return  # đã bị xoá hoặc worker khác vừa refresh xong
+
+    upsert_from_jisho(word.kanji or word.kana, refresh=True)
+
+    # Jisho có thể không còn trả đúng cặp kanji/kana -> vẫn đánh dấu để không xếp hàng lại liên tục
+    Word.objects.filter(pk=word_id).update(refreshed_at=timezone.now())
+    logger.info(f"[REFRESH] word {word_id} refreshed")
+
+
+def schedule_refresh(word_ids) -> int:
+    """Xếp hàng refresh nền; dừng khi hết budget phút này. Trả về số job đã xếp."""
+    scheduled = 0
+    for word_id in word_ids:
+        key = f"refresh-word:{word_id}"
+        # job đang chạy / đã xếp -> bỏ qua trước khi tốn budget
+        if is_queued(key):
+            continue
+        if not take_budget("refresh", REFRESH_PER_MINUTE):
+            break
+        if run_in_background(key, refresh_word, word_id):
+            scheduled += 1
+    return scheduled
+
+
+def schedule_stale(words) -> int:
+    """
+    words: các Word đã load (có refreshed_at) của trang kết quả.
+    Không có từ nào stale -> không chạm cache / DB; có -> xếp hàng tối đa MAX_PER_REQUEST.
+    """
+    ids = [w.id for w in words if is_stale(w)][:MAX_PER_REQUEST]
+    return schedule_refresh(ids) if ids else 0
@@ -0,0 +1,270 @@
+"""
+Tách câu tiếng Nhật thành từ theo từ điển local (không gọi Jisho).
+
+Index in-memory (mỗi worker) gồm mặt chữ kanji/kana của mọi Word và "stem" của
+động từ / tính từ để bắt cả dạng chia (食べた -> 食べる). Lattice trên từng vị trí,
+Viterbi chọn đường có tổng cost nhỏ nhất (ít token nhất, ít ký tự lạ nhất).
+"""
+import logging
+import threading
+import time
+from functools import lru_cache
+
+from django.db import close_old_connections
+
+from core.models import Word
+from core.services.deinflect import ADJ_I, GODAN, V1, V5, VS, deinflect
+from core.services.lookup import word_summaries
+
+logger = logging.getLogger(__name__)
+
+INDEX_TTL = 600          # giây; word mới ingest xuất hiện sau ~10 phút
+MAX_WORD_LENGTH = 12
+MAX_INFLECTION = 8       # số kana tối đa sau stem (食べ|させられた)
+
+WORD_COST = 1.0
+INFLECTED_COST = 1.1     # cùng độ dài thì ưu tiên khớp nguyên dạng
+UNKNOWN_COST = 3.0       # 1 ký tự tiếng Nhật không có trong từ điển
+
+_lock = threading.Lock()
+_index = None
+_refreshing = False
+
+
+def _is_hiragana(ch: str) -> bool:
+    return "ぁ" <= ch <= "ゟ"
+
+
+def _is_japanese(ch: str) -> bool:
+    return (
+        "ぁ" <= ch <= "ヿ"      # hiragana + katakana
+        or "一" <= ch <= "鿿"   # CJK
+        or "㐀" <= ch <= "䶿"
+        or ch in "々〆ヵヶ"
+    )
+
+
+# ---------------------------------------------------------
+#  INDEX
+# ---------------------------------------------------------
+
+def _inflection_type(surface: str, pos: str) -> int:
+    """Type deinflect của word (0 nếu không chia được)."""
+    if "Godan verb" in pos and surface[-1] in GODAN:
+        return V5
+    if "Ichidan verb" in pos and surface.endswith("る"):
+        return V1
+    if "I-adjective" in pos and surface.endswith("い"):
+        return ADJ_I
+    if "Suru verb" in pos and not surface.endswith("する"):
+        return VS  # danh động từ: 勉強 -> 勉強する
+    return 0
+
+
+class SegmentIndex:
+    def __init__(self):
+        self.surfaces: dict[str, list[int]] = {}
+        # stem -> {(thể từ điển, type): [word_id]}
+        self.stems: dict[str, dict[tuple[str, int], list[int]]] = {}
+        self.prefixes: set[str] = set()
+        self.built_at = time.monotonic()
+        self.ttl = INDEX_TTL      # index preload trong master: TTL dài hơn (xem preload.py)
+
+    def add(self, word_id: int, surface: str, pos: str) -> None:
+        if not surface or len(surface) > MAX_WORD_LENGTH:
+            return
+        self.surfaces.setdefault(surface, []).append(word_id)
+        self._add_prefixes(surface)
+
+        wtype = _inflection_type(surface, pos or "")
+        if not wtype:
+            return
+        if wtype == VS:
+            stem, base = surface, surface + "する"
+        else:
+            stem, base = surface[:-1], surface
+        if stem:
+            self.stems.setdefault(stem, {}).setdefault((base, wtype), []).append(word_id)
+            self._add_prefixes(stem)
+
+    def _add_prefixes(self, s: str) -> None:
+        for i in range(1, len(s) + 1):
+            self.prefixes.add(s[:i])
+
+
+def _build_index() -> SegmentIndex:
+    start = time.perf_counter()
+    index = SegmentIndex()
+    rows = Word.objects.values_list("id", "kanji", "kana", "parts_of_speech")
+    for word_id, kanji, kana, pos in rows.iterator(chunk_size=5000):
+        index.add(word_id, kanji, pos)
+        if kana != kanji:
+            index.add(word_id, kana, pos)
+
+    logger.info(
+        f"[TIMING] Segment index built: {len(index.surfaces)} surfaces, "
+        f"{len(index.stems)} stems in {(time.perf_counter() - start) * 1000:.2f}ms"
+    )
+    return index
+
+
+def _refresh():
+    global _index, _refreshing
+    try:
+        close_old_connections()
+        _index = _build_index()
+    except Exception:
+        logger.exception("[SEGMENT] index refresh failed")
+    finally:
+        _refreshing = False
+        close_old_connections()
+
+
+def get_index() -> SegmentIndex:
+    """
+    Lần đầu build đồng bộ; sau đó hết TTL thì build lại trong thread nền của worker,
+    request vẫn dùng index cũ (không request nào phải chờ build).
+    """
+    global _index, _refreshing
+    if _index is None:
+        with _lock:
+            if _index is None:
+                _index = _build_index()
+        return _index
+
+    if time.monotonic() - _index.built_at > _index.ttl and not _refreshing:
+        with _lock:
+            if not _refreshing:
+                _refreshing = True
+                threading.Thread(target=_refresh, name="segment-index", daemon=True).start()
+    return _index
+
+
+def is_ready() -> bool:
+    """Index đã build trong worker này (segment() không phải chờ build lần đầu)."""
+    return _index is not None
+
+
+def preload(ttl: float = INDEX_TTL) -> None:
+    """Build đồng bộ (gunicorn preload_app: build 1 lần trong master, worker fork dùng chung)."""
+    global _index
+    index = _build_index()
+    index.ttl = ttl
+    _index = index
+
+
+@lru_cache(maxsize=8192)
+def _base_forms(text: str) -> dict[tuple[str, int], tuple[str, ...]]:
+    """(thể gốc, type) -> reasons ngắn nhất; cache vì cùng 1 chuỗi lặp lại nhiều trong đoạn văn."""
+    forms = {}
+    for c in deinflect(text):
+        if c.reasons and (c.term, c.type) not in forms:
+            forms[(c.term, c.type)] = c.reasons
+    return forms
+
+
+# ---------------------------------------------------------
+#  LATTICE + VITERBI
+# ---------------------------------------------------------
+
+def _edges(index: SegmentIndex, text: str, i: int):
+    """Các từ bắt đầu tại i: (end, word_ids, trace hoặc None, cost)."""
+    n = len(text)
+    for j in range(i + 1, min(n, i + MAX_WORD_LENGTH) + 1):
+        s = text[i:j]
+        if s not in index.prefixes:
+            break
+
+        if s in index.surfaces:
+            yield j, index.surfaces[s], None, WORD_COST
+
+        # dạng chia: stem + đuôi hiragana
+        stem_forms = index.stems.get(s)
+        if not stem_forms:
+            continue
+        for e in range(j + 1, min(n, j + MAX_INFLECTION) + 1):
+            if not _is_hiragana(text[e - 1]):
+                break
+            for (base, btype), reasons in _base_forms(text[i:e]).items():
+                ids = stem_forms.get((base, btype))
+                if ids:
+                    trace = {"base": base, "reasons": list(reasons),
+                             "description": f"{' '.join(reasons)} of {base}"}
+                    yield e, ids, trace, INFLECTED_COST
+
+
+def segment(text: str) -> list[dict]:
+    """
+    Trả về danh sách span phủ toàn bộ text:
+    {"start", "end", "surface", "word_ids", "deinflection"} — word_ids rỗng nếu không có trong từ điển.
+    """
+    index = get_index()
+    n = len(text)
+    INF = float("inf")
+    best = [INF] * (n + 1)
+    back: list[tuple | None] = [None] * (n + 1)
+    best[0] = 0.0
+
+    for i in range(n):
+        if best[i] == INF:
+            continue
+        base_cost = best[i]
+
+        if not _is_japanese(text[i]):
+            # chữ Latin / số / dấu câu: gom nguyên cụm thành 1 span, không tính cost
+            j = i + 1
+            while j < n and not _is_japanese(text[j]):
+                j += 1
+            if base_cost < best[j]:
+                best[j], back[j] = base_cost, (i, [], None)
+            continue
+
+        # ký tự lạ: luôn có cạnh 1 ký tự để lattice không bị đứt
+        if base_cost + UNKNOWN_COST < best[i + 1]:
+            best[i + 1], back[i + 1] = base_cost + UNKNOWN_COST, (i, [], None)
+
+        for end, ids, trace, cost in _edges(index, text, i):
+            total = base_cost + cost
+            # chỉ thay khi tốt hơn hẳn (cùng cost thì giữ cạnh tìm thấy trước)
+            if total < best[end]:
+                best[end], back[end] = total, (i, ids, trace)
+
+    spans = []
+    pos = n
+    while pos > 0:
+        start, ids, trace = back[pos]
+        spans.append({
+            "start": start,
+            "end": pos,
+            "surface": text[start:pos],
+            "word_ids": list(ids),
+            "deinflection": trace,
+        })
+        pos = start
+    spans.reverse()
+
+    return _merge_unknown(spans)
+
+
+def _merge_unknown(spans: list[dict]) -> list[dict]:
+    """Gộp các ký tự tiếng Nhật lạ liền nhau thành 1 span."""
+    merged = []
+    for span in spans:
+        prev = merged[-1] if merged else None
+        if (
+            prev and not prev["word_ids"] and not span["word_ids"]
+            and _is_japanese(prev["surface"][-1]) and _is_japanese(span["surface"][0])
+        ):
+            prev["end"] = span["end"]
+            prev["surface"] += span["surface"]
+        else:
+            merged.append(span)
+    return merged
+
+
+# ---------------------------------------------------------
+#  WORD INFO (1 query cho mọi span)
+# ---------------------------------------------------------
+
+def words_for_spans(spans: list[dict]) -> dict[int, dict]:
+    return word_summaries(wid for span in spans for wid in span["word_ids"])
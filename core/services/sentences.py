@@ -0,0 +1,179 @@
+"""
+Kho câu ví dụ dùng chung + posting index token -> câu.
+
+- ExampleSentence unique theo (source, source_id): 1 câu Tatoeba minh hoạ 10 word chỉ lưu 1 lần,
+  gắn với từng meaning qua MeaningExample.
+- Lúc insert câu mới: segment câu theo từ điển local, lưu mặt chữ + thể gốc của từng từ
+  vào SentenceToken -> "câu đã lưu nào chứa từ X" là 1 query trên index, không gọi Tatoeba.
+  ExampleSentence.indexed đánh dấu câu đã segment (kể cả câu không sinh token nào).
+- Câu chứa word được chia theo nghĩa (assign_senses): câu EN khớp từ khoá của meaning nào
+  thì gắn vào meaning đó, không khớp gì -> meaning chính (đầu tiên) của word.
+"""
+import logging
+import re
+import time
+
+from django.db.models import Subquery
+
+from core.models import ExampleSentence, MeaningExample, SentenceToken
+
+from .background import run_in_background
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 2000
+MAX_TOKEN_LENGTH = 64
+CANDIDATE_LIMIT = 50    # số câu local tối đa xét cho 1 word trước khi chia theo nghĩa
+
+# từ không mang nghĩa trong gloss / câu EN ("to eat", "a kind of ...")
+STOPWORDS = frozenset(
+    "a an the to of in on at for by with from and or be is are was were it its "
+    "one's someone something etc esp".split()
+)
+_WORD_RE = re.compile(r"[a-z]+(?:'[a-z]+)?")
+
+
+def _is_kana(ch: str) -> bool:
+    return "ぁ" <= ch <= "ヿ"
+
+
+def sentence_tokens(jp: str) -> set[str]:
+    """Token của 1 câu: mặt chữ các từ có trong từ điển + thể gốc nếu là dạng chia (食べた -> 食べる)."""
+    # import muộn: segment -> lookup -> ingest -> sentences (vòng import)
+    from core.services.segment import segment
+
+    out = set()
+    for span in segment(jp):
+        surface = span["surface"]
+        if not span["word_ids"] or (len(surface) == 1 and _is_kana(surface)):
+            continue  # ký tự lạ / trợ từ 1 kana (は, を...) không đáng index
+        out.add(surface)
+        trace = span["deinflection"]
+        if trace:
+            base = trace["base"]
+            out.add(base)
+            if base.endswith("する") and len(base) > 2:
+                out.add(base[:-2])  # 勉強した -> 勉強する -> 勉強
+    return {t for t in out if len(t) <= MAX_TOKEN_LENGTH}
+
+
+def index_sentences(sentences) -> int:
+    """
+    Ghi posting cho các câu (idempotent: token đã có bị bỏ qua) và đánh dấu indexed.
+    Trả về số posting đã sinh.
+    """
+    sentences = list(sentences)
+    rows = [
+        SentenceToken(token=token, sentence_id=s.id)
+        for s in sentences
+        for token in sentence_tokens(s.jp)
+    ]
+    SentenceToken.objects.bulk_create(rows, batch_size=BATCH_SIZE, ignore_conflicts=True)
+    ExampleSentence.objects.filter(id__in=[s.id for s in sentences], indexed=False).update(indexed=True)
+    return len(rows)
+
+
+def index_pending(limit: int = BATCH_SIZE) -> int:
+    """Index tối đa `limit` câu chưa index (indexed=False). Trả về số posting đã sinh."""
+    sentences = list(ExampleSentence.objects.filter(indexed=False).only("id", "jp").order_by("id")[:limit])
+    return index_sentences(sentences) if sentences else 0
+
+
+def store_sentences(examples: list[dict], source: str = "tatoeba") -> list[ExampleSentence]:
+    """
+    Upsert câu từ Tatoeba ({"id", "jp", "en"}) -> ExampleSentence theo đúng thứ tự input.
+    Câu đã có được dùng lại; câu mới được index token ngay khi insert (hoặc trong job nền
+    nếu index segment chưa sẵn sàng).
+    """
+    by_id = {str(ex["id"]): ex for ex in examples if ex.get("id") is not None and ex.get("jp")}
+    if not by_id:
+        return []
+
+    existing = set(
+        ExampleSentence.objects.filter(source=source, source_id__in=list(by_id))
+        .values_list("source_id", flat=True)
+    )
+    new = [
+        ExampleSentence(jp=ex["jp"], en=ex.get("en"), source=source, source_id=sid)
+        for sid, ex in by_id.items()
+        if sid not in existing
+    ]
+    if new:
+        # worker khác insert cùng câu -> conflict bị bỏ qua, đọc lại bên dưới
+        ExampleSentence.objects.bulk_create(new, ignore_conflicts=True)
+
+    stored = {
+        s.source_id: s
+        for s in ExampleSentence.objects.filter(source=source, source_id__in=list(by_id))
+    }
+    if new:
+        from core.services.segment import is_ready
+
+        if is_ready():
+            index_sentences([stored[s.source_id] for s in new if s.source_id in stored])
+        else:
+            # index segment chưa build trong worker này: build lần đầu mất vài giây -> không
+            # chặn request, job nền build + index; câu sót lại indexed=False cho lệnh index_sentences
+            run_in_background("index-sentences", index_pending)
+    return [stored[sid] for sid in by_id if sid in stored]
+
+
+def link_examples(meaning, sentences: list[ExampleSentence], limit: int) -> int:
+    """Gắn tối đa limit câu (chưa gắn) vào meaning. Trả về số link mới."""
+    if limit <= 0 or not sentences:
+        return 0
+    linked = set(
+        MeaningExample.objects.filter(meaning=meaning, sentence__in=sentences)
+        .values_list("sentence_id", flat=True)
+    )
+    todo = [s for s in sentences if s.id not in linked][:limit]
+    MeaningExample.objects.bulk_create(
+        [MeaningExample(meaning=meaning, sentence=s) for s in todo], ignore_conflicts=True
+    )
+    return len(todo)
+
+
+def sentences_for_word(word, limit: int = CANDIDATE_LIMIT) -> list[ExampleSentence]:
+    """Câu đã lưu có chứa word (theo kanji hoặc kana), tra qua posting index."""
+    terms = [t for t in dict.fromkeys([word.kanji, word.kana]) if t]
+    if not terms:
+        return []
+    t0 = time.perf_counter()
+    postings = SentenceToken.objects.filter(token__in=terms).values("sentence_id")
+    found = list(ExampleSentence.objects.filter(id__in=Subquery(postings)).order_by("id")[:limit])
+    logger.info(
+        f"[TIMING] local sentences for '{terms[0]}': {(time.perf_counter() - t0) * 1000:.2f}ms, found={len(found)}"
+    )
+    return found
+
+
+# ---------------------------------------------------------
+#  SENSE MATCHING
+# ---------------------------------------------------------
+
+def _content_words(text: str | None) -> set[str]:
+    return {w for w in _WORD_RE.findall((text or "").lower()) if w not in STOPWORDS}
+
+
+def assign_senses(meanings, sentences: list[ExampleSentence]) -> dict[int, list[ExampleSentence]]:
+    """
+    meanings: mọi meaning của word, theo thứ tự id (meaning đầu = nghĩa chính).
+    Mỗi câu thuộc đúng 1 meaning: meaning có nhiều từ khoá chung với câu EN nhất
+    (hoà -> meaning đứng trước); không chung từ nào -> nghĩa chính.
+    Trả về {meaning_id: [câu]} giữ thứ tự câu đầu vào.
+    """
+    meanings = list(meanings)
+    if not meanings:
+        return {}
+    keywords = [(m.id, _content_words(m.meaning)) for m in meanings]
+    primary = meanings[0].id
+    out: dict[int, list[ExampleSentence]] = {m.id: [] for m in meanings}
+    for sentence in sentences:
+        words = _content_words(sentence.en)
+        best, best_overlap = primary, 0
+        for meaning_id, kws in keywords:
+            overlap = len(kws & words)
+            if overlap > best_overlap:
+                best, best_overlap = meaning_id, overlap
+        out[best].append(sentence)
+    return out
@@ -0,0 +1,191 @@
+import logging
+import time
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Max, Q, Subquery
+from django.utils import timezone
+
+from core.models import SyncChange, User
+
+logger = logging.getLogger(__name__)
+
+FAVORITE = "favorite"
+FLASHCARD = "flashcard"
+FLASHCARD_WORD = "flashcard_word"
+HISTORY = "history"
+# entity ảnh hưởng is_favorited / membership (xoá deck cũng đổi danh sách deck của word)
+MEMBERSHIP = (FAVORITE, FLASHCARD, FLASHCARD_WORD)
+
+UPSERT, DELETE = "upsert", "delete"
+
+PAGE_SIZE = 500
+TOMBSTONE_TTL = timedelta(days=30)   # tombstone (delete) cũ hơn -> purge; cursor cũ hơn -> full resync
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+# ---------------------------------------------------------
+#  WRITE: ghi change log (compact theo object)
+# ---------------------------------------------------------
+
+def record_changes(entity: str, changes) -> None:
+    """
+    changes: iterable (user_id, object_id, op, data).
+    Xoá bản ghi cũ của cùng object rồi ghi bản mới -> log chỉ giữ trạng thái mới nhất,
+    id mới (lớn hơn mọi cursor đã phát) là version của thay đổi.
+
+    id autoincrement được cấp lúc INSERT, không phải lúc commit: 2 transaction cùng ghi log
+    của 1 user có thể commit ngược thứ tự id -> client đọc giữa 2 lần commit nhận cursor
+    vượt qua id nhỏ hơn chưa commit và bỏ lỡ thay đổi đó. Khoá row User (FOR UPDATE, theo
+    thứ tự id để không deadlock) tới hết transaction -> ghi log của cùng user tuần tự,
+    id commit theo đúng thứ tự cấp.
+    """
+    changes = list(changes)
+    if not changes:
+        return
+
+    by_user: dict[int, list[int]] = {}
+    for user_id, object_id, _, _ in changes:
+        by_user.setdefault(user_id, []).append(object_id)
+
+    superseded = reduce(or_, (
+        Q(user_id=user_id, object_id__in=ids) for user_id, ids in by_user.items()
+    ))
+
+    with transaction.atomic():
+        _lock_users(by_user)
+        SyncChange.objects.filter(superseded, entity=entity).delete()
+        SyncChange.objects.bulk_create([
+            SyncChange(user_id=user_id, entity=entity, object_id=object_id, op=op, data=data)
+            for user_id, object_id, op, data in changes
+        ])
+
+
+def _lock_users(user_ids) -> None:
+    list(
+        User.objects.select_for_update()
+        .filter(id__in=sorted(user_ids))
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+
+
+def record_change(user_id: int, entity: str, object_id: int, op: str, data=None) -> None:
+    record_changes(entity, [(user_id, object_id, op, data)])
+
+
+def latest_version(user_id: int, entities=None) -> int:
+    qs = SyncChange.objects.filter(user_id=user_id)
+    if entities is not None:
+        qs = qs.filter(entity__in=entities)
+    return (
+        qs.order_by("-id")
+        .values_list("id", flat=True)
+        .first()
+    ) or 0
+
+
+# ---------------------------------------------------------
+#  CURSOR: "<version>.<issued_at>"
+# ---------------------------------------------------------
+
+def encode_cursor(version: int, issued_at: float) -> str:
+    return f"{version}.{int(issued_at)}"
+
+
+def decode_cursor(cursor: str) -> tuple[int, int]:
+    try:
+        version, issued_at = cursor.split(".")
+        return int(version), int(issued_at)
+    except ValueError:
+        raise InvalidCursor("Invalid cursor")
+
+
+# ---------------------------------------------------------
+#  READ: delta sync
+# ---------------------------------------------------------
+
+def changes_since(user_id: int, cursor: str | None, limit: int = PAGE_SIZE) -> dict:
+    """
+    cursor = None (lần đầu) hoặc quá TOMBSTONE_TTL -> reset: trả toàn bộ state (các dòng upsert).
+    Ngược lại chỉ trả thay đổi có id > version: 1 range query trên index (user, id).
+    """
+    now = time.time()
+    reset = True
+    version = 0
+
+    if cursor:
+        version, issued_at = decode_cursor(cursor)
+        reset = now - issued_at > TOMBSTONE_TTL.total_seconds()
+
+    qs = SyncChange.objects.filter(user_id=user_id)
+    if reset:
+        qs = qs.filter(op=UPSERT)
+        version = 0
+    else:
+        qs = qs.filter(id__gt=version)
+
+    rows = list(
+        qs.order_by("id")
+        .values("id", "entity", "object_id", "op", "data", "created_at")[:limit + 1]
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    if has_more:
+        # Delta: tombstone sau trang này có thể bị purge theo tuổi của chính nó
+        # -> cursor mang thời điểm của dòng cuối, không phải "now".
+        # Reset: client đang dựng lại state từ đầu, tombstone cũ hơn snapshot không ảnh hưởng.
+        issued_at = now if reset else rows[-1]["created_at"].timestamp()
+        next_cursor = encode_cursor(rows[-1]["id"], issued_at)
+    else:
+        last = rows[-1]["id"] if rows else version
+        if reset:
+            last = max(last, latest_version(user_id))
+        next_cursor = encode_cursor(last, now)
+
+    return {
+        "cursor": next_cursor,
+        "reset": reset,
+        "has_more": has_more,
+        "changes": [
+            {
+                "version": r["id"],
+                "entity": r["entity"],
+                "id": r["object_id"],
+                "op": r["op"],
+                "data": r["data"],
+            }
+            for r in rows
+        ],
+    }
+
+
+# ---------------------------------------------------------
+#  MAINTENANCE
+# ---------------------------------------------------------
+
+def purge_tombstones(older_than: timedelta = TOMBSTONE_TTL) -> int:
+    """
+    Xoá tombstone cũ, trừ dòng membership mới nhất của mỗi user: membership version
+    (= id dòng đó) không bao giờ lùi -> ETag cũ không bị trả 304 nhầm.
+    """
+    cutoff = timezone.now() - older_than
+    newest = (
+        SyncChange.objects.filter(entity__in=MEMBERSHIP)
+        .values("user_id")
+        .annotate(last=Max("id"))
+        .values("last")
+    )
+    deleted, _ = (
+        SyncChange.objects.filter(op=DELETE, created_at__lt=cutoff)
+        .exclude(id__in=Subquery(newest))
+        .delete()
+    )
+    logger.info(f"[SYNC] purged {deleted} tombstones older than {cutoff:%Y-%m-%d}")
+    return deleted
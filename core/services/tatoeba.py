@@ -2,6 +2,9 @@ import requests
 import time
 import logging
 
+from .breaker import TATOEBA
+from .http import get_async_client
+
 logger = logging.getLogger(__name__)
 
 BASE = "https://tatoeba.org/en/api_v0/search"
@@ -78,37 +81,52 @@ def _iter_english_translations(translations):
 # Main search function (strict → fallback)
 # ---------------------------------------------------------
 
+def _strict_params(query: str, limit: int) -> dict:
+    # STRICT MODE (JP→ENG)
+    return {
+        "query": query,
+        "from": "jpn",
+        "to": "eng",
+        "orphans": "no",
+        "unapproved": "no",
+        "trans_filter": "limit",
+        "trans_to": "eng",
+        "sort": "relevance",
+        "page": 1,
+        "limit": limit * 3,
+    }
+
+
+def _fallback_params(query: str, limit: int) -> dict:
+    # FALLBACK MODE (JP-ONLY)
+    return {
+        "query": query,
+        "sort": "relevance",
+        "page": 1,
+        "limit": limit * 3,
+    }
+
+
 def search_examples(query: str, limit: int = 3) -> list[dict]:
     """
     1) Strict mode: query JP→EN (ưu tiên câu có dịch tiếng Anh)
     2) Nếu strict = 0 → fallback mode: JP-only search
+    Tatoeba lỗi / circuit open -> raise, caller quyết định dùng dữ liệu có sẵn.
     """
 
     def fetch(params):
-        try:
-            r = requests.get(BASE, params=params, timeout=10)
+        def get(timeout):
+            r = requests.get(BASE, params=params, timeout=timeout)
             r.raise_for_status()
             return r.json().get("results", [])
-        except Exception:
-            return []
+
+        # lỗi upstream / breaker open -> raise (không nuốt lỗi, không thử fallback vô ích)
+        return TATOEBA.call(get)
 
     # -----------------------------------------------------
     # STEP 1 — STRICT MODE (JP→ENG)
     # -----------------------------------------------------
-    strict_params = {
-        "query": query,
-        "from": "jpn",
-        "to": "eng",
-        "orphans": "no",
-        "unapproved": "no",
-        "trans_filter": "limit",
-        "trans_to": "eng",
-        "sort": "relevance",
-        "page": 1,
-        "limit": limit * 3,
-    }
-
-    strict_results = fetch(strict_params)
+    strict_results = fetch(_strict_params(query, limit))
 
     if strict_results:
         logger.info(f"[TATOEBA] STRICT mode used for '{query}'")
@@ -119,14 +137,33 @@ def search_examples(query: str, limit: int = 3) -> list[dict]:
     # -----------------------------------------------------
     # STEP 2 — FALLBACK MODE (JP-ONLY)
     # -----------------------------------------------------
-    fallback_params = {
-        "query": query,
-        "sort": "relevance",
-        "page": 1,
-        "limit": limit * 3,
-    }
+    fallback_results = fetch(_fallback_params(query, limit))
+
+    logger.info(f"[TATOEBA] FALLBACK mode used for '{query}'")
+
+    return _parse_results(fallback_results, limit)
+
+
+async def search_examples_async(query: str, limit: int = 3) -> list[dict]:
+    """Bản async của search_examples (cùng logic strict → fallback)."""
+
+    async def fetch(params):
+        async def get(timeout):
+            r = await get_async_client().get(BASE, params=params, timeout=timeout)
+            r.raise_for_status()
+            return r.json().get("results", [])
+
+        return await TATOEBA.acall(get)
+
+    strict_results = await fetch(_strict_params(query, limit))
+
+    if strict_results:
+        logger.info(f"[TATOEBA] STRICT mode used for '{query}'")
+        parsed = _parse_results(strict_results, limit)
+        if parsed:
+            return parsed
 
-    fallback_results = fetch(fallback_params)
+    fallback_results = await fetch(_fallback_params(query, limit))
 
     logger.info(f"[TATOEBA] FALLBACK mode used for '{query}'")
 
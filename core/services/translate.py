@@ -0,0 +1,183 @@
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+import unicodedata
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+
+if TYPE_CHECKING:
+    from deep_translator import GoogleTranslator
+
+logger = logging.getLogger(__name__)
+
+CACHE_TTL = 60 * 60 * 24 * 30   # 30 ngày
+MAX_IN_FLIGHT = 4               # số request song song tối đa tới Google Translate
+
+_local = threading.local()
+_executor = None
+_languages = None
+
+
+def _get_executor():
+    # pool dùng chung cả process -> giới hạn in-flight áp dụng cho mọi request của worker
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=MAX_IN_FLIGHT, thread_name_prefix="translate")
+    return _executor
+
+
+def supported_languages() -> frozenset[str]:
+    """Mã ngôn ngữ Google Translate hỗ trợ ("ja", "en", "zh-CN"...)."""
+    global _languages
+    if _languages is None:
+        from deep_translator.constants import GOOGLE_LANGUAGES_TO_CODES
+        _languages = frozenset(GOOGLE_LANGUAGES_TO_CODES.values())
+    return _languages
+
+
+# ---------------------------------------------------------
+#  CACHE KEY
+# ---------------------------------------------------------
+
+def normalize_text(text: str) -> str:
+    # NFKC: gộp full-width / half-width; gộp khoảng trắng thừa
+    return " ".join(unicodedata.normalize("NFKC", text or "").split())
+
+
+def _cache_key(text: str, source: str, target: str) -> str:
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return f"tr:{source}:{target}:{digest}"
+
+
+# ---------------------------------------------------------
+#  TRANSLATE
+# ---------------------------------------------------------
+
+def _translator(source: str, target: str) -> "GoogleTranslator":
+    # GoogleTranslator giữ state theo request -> mỗi thread 1 instance cho mỗi cặp ngôn ngữ
+    cache_ = getattr(_local, "translators", None)
+    if cache_ is None:
+        cache_ = _local.translators = {}
+    key = (source, target)
+    if key not in cache_:
+        # import lúc dùng lần đầu: worker không dịch thì không tốn thời gian boot
+        from deep_translator import GoogleTranslator
+        cache_[key] = GoogleTranslator(source=source, target=target)
+    return cache_[key]
+
+
+def _translate_remote(text: str, source: str, target: str) -> str:
+    start = time.perf_counter()
+    translated = _translator(source, target).translate(text)
+    logger.info(f"[TIMING] google_translate({len(text)} chars): {(time.perf_counter() - start) * 1000:.2f}ms")
+    return translated
+
+
+def translate_many(texts: list[str], source: str = "ja", target: str = "en") -> tuple[list, int]:
+    """
+    Dịch nhiều câu: bỏ trùng, lấy từ cache trước, chỉ dịch các câu miss
+    (song song, tối đa MAX_IN_FLIGHT). Trả về (kết quả theo thứ tự input, số câu cache hit).
+    Câu dịch lỗi -> None (không cache).
+    """
+    normalized = [normalize_text(t) for t in texts]
+    keys = {t: _cache_key(t, source, target) for t in dict.fromkeys(normalized) if t}
+
+    cached = cache.get_many(keys.values())
+    results = {t: cached[k] for t, k in keys.items() if k in cached}
+    misses = [t for t in keys if t not in results]
+
+    if misses:
+        pool = _get_executor()
+        futures = {t: pool.submit(_translate_remote, t, source, target) for t in misses}
+
+        fresh = {}
+        for t, fut in futures.items():
+            try:
+                fresh[t] = fut.result()
+            except Exception:
+                logger.exception(f"[TRANSLATE] failed for {t[:30]!r}")
+        results.update(fresh)
+        cache.set_many({keys[t]: v for t, v in fresh.items() if v}, CACHE_TTL)
+
+    return [results.get(t) for t in normalized], len(keys) - len(misses)
+
+
+def translate(text: str, source: str = "ja", target: str = "en") -> str:
+    normalized = normalize_text(text)
+    key = _cache_key(normalized, source, target)
+
+    translated = cache.get(key)
+    if translated is None:
+        translated = _translate_remote(normalized, source, target)
+        if translated:
+            cache.set(key, translated, CACHE_TTL)
+    return translated
+
+
+# ---------------------------------------------------------
+#  ASYNC (ASGI)
+# ---------------------------------------------------------
+
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    sem = _semaphores.get(loop)
+    if sem is None:
+        sem = _semaphores[loop] = asyncio.Semaphore(MAX_IN_FLIGHT)
+    return sem
+
+
+async def _translate_remote_async(text: str, source: str, target: str) -> str:
+    # deep_translator chỉ có API sync -> chạy trong thread riêng (không đụng ORM)
+    async with _get_semaphore():
+        return await sync_to_async(_translate_remote, thread_sensitive=False)(text, source, target)
+
+
+async def translate_many_async(texts: list[str], source: str = "ja", target: str = "en") -> tuple[list, int]:
+    normalized = [normalize_text(t) for t in texts]
+    keys = {t: _cache_key(t, source, target) for t in dict.fromkeys(normalized) if t}
+
+    cached = await cache.aget_many(keys.values())
+    results = {t: cached[k] for t, k in keys.items() if k in cached}
+    misses = [t for t in keys if t not in results]
+
+    if misses:
+        outcomes = await asyncio.gather(
+            *(_translate_remote_async(t, source, target) for t in misses),
+            return_exceptions=True,
+        )
+        fresh = {}
+        for t, out in zip(misses, outcomes):
+            if isinstance(out, Exception):
+                logger.error(f"[TRANSLATE] failed for {t[:30]!r}: {out}")
+            else:
+                fresh[t] = out
+        results.update(fresh)
+        await cache.aset_many({keys[t]: v for t, v in fresh.items() if v}, CACHE_TTL)
+
+    return [results.get(t) for t in normalized], len(keys) - len(misses)
+
+
+async def translate_async(text: str, source: str = "ja", target: str = "en") -> str:
+    normalized = normalize_text(text)
+    key = _cache_key(normalized, source, target)
+
+    translated = await cache.aget(key)
+    if translated is None:
+        async with _get_semaphore():
+            translated = await sync_to_async(_translate_remote, thread_sensitive=False)(
+                normalized, source, target
+            )
+        if translated:
+            await cache.aset(key, translated, CACHE_TTL)
+    return translated
@@ -0,0 +1,33 @@
+"""
+Version stamp cho resource đọc nhiều (JLPT list...): tăng lúc ghi, đọc 1 row lúc check ETag.
+Word detail dùng WordDocument.version, kanji dùng stamp cạnh cache entry (xem kanji.py).
+"""
+from datetime import datetime
+
+from django.db.models import F
+from django.utils import timezone
+
+from core.models import ContentVersion
+
+
+def jlpt_key(level: str) -> str:
+    return f"jlpt:{level}"
+
+
+def bump(keys) -> None:
+    keys = sorted({k for k in keys if k})
+    if not keys:
+        return
+    # row chưa có -> tạo với version 0, rồi mọi key cùng +1 (không mất lượt bump khi 2 worker cùng tạo)
+    ContentVersion.objects.bulk_create(
+        [ContentVersion(key=k) for k in keys], ignore_conflicts=True
+    )
+    ContentVersion.objects.filter(key__in=keys).update(
+        version=F("version") + 1, updated_at=timezone.now()
+    )
+
+
+def get(key: str) -> tuple[int, datetime | None]:
+    """(version, updated_at); resource chưa từng đổi -> (0, None)."""
+    row = ContentVersion.objects.filter(key=key).values_list("version", "updated_at").first()
+    return row or (0, None)
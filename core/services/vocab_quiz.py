@@ -0,0 +1,164 @@
+import random
+import threading
+import time
+import logging
+
+from core.models import Word, WordMeaning
+from .quiz import LEVEL_INFO
+
+logger = logging.getLogger(__name__)
+
+POOL_TTL = 600  # giây; pool được build lại định kỳ để thấy từ mới ingest
+QUESTION_TYPES = ("reading_to_meaning", "meaning_to_word", "kanji_to_reading")
+
+# level -> (built_at, pool)
+_pools: dict[str, tuple[float, dict]] = {}
+_lock = threading.Lock()
+
+
+# ---------------------------------------------------------
+#  CANDIDATE POOLS (precomputed per level / part of speech)
+# ---------------------------------------------------------
+
+def _pos_key(parts_of_speech: str) -> str:
+    return (parts_of_speech or "").split(",")[0].strip() or "Other"
+
+
+def _short_meaning(meaning: str) -> str:
+    # "to eat; to live on" -> giữ tối đa 2 nghĩa cho choice gọn
+    return "; ".join(m.strip() for m in meaning.split(";")[:2] if m.strip())
+
+
+def build_pool(level: str) -> dict:
+    """
+    2 query: words của level + nghĩa đầu tiên của mỗi word.
+    Kết quả: {"all": [entry...], "by_pos": {pos: [entry...]}}
+    """
+    start = time.perf_counter()
+
+    words = {
+        w["id"]: w
+        for w in Word.objects.filter(jlpt_level=level)
+        .values("id", "kanji", "kana", "parts_of_speech")
+    }
+
+    first_meaning = {}
+    for word_id, meaning in (
+        WordMeaning.objects.filter(word__jlpt_level=level)
+        .order_by("word_id", "id")
+        .values_list("word_id", "meaning")
+    ):
+        first_meaning.setdefault(word_id, meaning)
+
+    entries = []
+    by_pos: dict[str, list[dict]] = {}
+    for word_id, w in words.items():
+        meaning = _short_meaning(first_meaning.get(word_id) or "")
+        if not meaning or not (w["kanji"] or w["kana"]):
+            continue
+        entry = {
+            "id": word_id,
+            "kanji": w["kanji"],
+            "kana": w["kana"],
+            "meaning": meaning,
+            "pos": _pos_key(w["parts_of_speech"]),
+        }
+        entries.append(entry)
+        by_pos.setdefault(entry["pos"], []).append(entry)
+
+    logger.info(
+        f"[TIMING] vocab build_pool({level}): {len(entries)} words in {(time.perf_counter() - start) * 1000:.2f}ms"
+    )
+    return {"all": entries, "by_pos": by_pos}
+
+
+def get_pool(level: str) -> dict:
+    now = time.monotonic()
+    cached = _pools.get(level)
+    if cached and now - cached[0] < POOL_TTL:
+        return cached[1]
+
+    with _lock:
+        cached = _pools.get(level)
+        if cached and now - cached[0] < POOL_TTL:
+            return cached[1]
+        pool = build_pool(level)
+        _pools[level] = (time.monotonic(), pool)
+        return pool
+
+
+# ---------------------------------------------------------
+#  QUESTION BUILDING (pure in-memory sampling)
+# ---------------------------------------------------------
+
+def _pick_distractors(pool: dict, entry: dict, field: str, n: int = 3) -> list[str]:
+    """Ưu tiên cùng part of speech, thiếu thì lấy thêm từ cả level."""
+    answer = entry[field]
+    picked: list[str] = []
+
+    for candidates in (pool["by_pos"].get(entry["pos"], []), pool["all"]):
+        if len(picked) >= n:
+            break
+        # sample dư một chút để bù các giá trị trùng / rỗng
+        for c in random.sample(candidates, min(len(candidates), n * 3)):
+            value = c[field]
+            if value and value != answer and value not in picked:
+                picked.append(value)
+                if len(picked) >= n:
+                    break
+
+    return picked
+
+
+def _build_question(pool: dict, entry: dict, qtype: str):
+    if qtype == "reading_to_meaning":
+        prompt, field = entry["kana"] or entry["kanji"], "meaning"
+    elif qtype == "meaning_to_word":
+        prompt, field = entry["meaning"], "kanji" if entry["kanji"] else "kana"
+    else:  # kanji_to_reading
+        if not entry["kanji"] or not entry["kana"] or entry["kanji"] == entry["kana"]:
+            return None
+        prompt, field = entry["kanji"], "kana"
+
+    distractors = _pick_distractors(pool, entry, field)
+    if len(distractors) < 3:
+        return None
+
+    choices = distractors + [entry[field]]
+    random.shuffle(choices)
+
+    return {
+        "type": qtype,
+        "word_id": entry["id"],
+        "sentence": prompt,
+        "choices": choices,
+        "correct_index": choices.index(entry[field]),
+    }
+
+
+def generate_vocab_quiz(level: str = "N5", count: int = 10, types=None) -> list[dict]:
+    if level not in LEVEL_INFO:
+        raise ValueError(f"Unknown JLPT level: {level}")
+
+    types = [t for t in (types or QUESTION_TYPES) if t in QUESTION_TYPES]
+    if not types:
+        raise ValueError(f"types must be a subset of {', '.join(QUESTION_TYPES)}")
+
+    pool = get_pool(level)
+    entries = pool["all"]
+    if len(entries) < 4:
+        raise ValueError(f"Not enough {level} words in the dictionary for a quiz")
+
+    questions = []
+    order: list[dict] = []
+    attempts = 0
+    while len(questions) < count and attempts < count * 5:
+        if not order:
+            # hết lượt thì xáo lại -> quiz lớn hơn pool vẫn được
+            order = random.sample(entries, len(entries))
+        attempts += 1
+        q = _build_question(pool, order.pop(), random.choice(types))
+        if q:
+            questions.append(q)
+
+    return questions
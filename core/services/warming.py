@@ -0,0 +1,112 @@
+"""
+Làm nóng DB ngoài giờ cao điểm (cron warm_cache): top query gần đây (rollup SearchQueryCount)
+và mọi word có JLPT level được ingest / refresh từ Jisho, enrich example từ Tatoeba và có sẵn
+WordDocument -> giờ cao điểm gần như mọi search / detail là DB hit, không chờ upstream.
+
+Mọi call upstream chạy với priority BACKGROUND: traffic thật (nếu có) luôn được ưu tiên.
+Command chạy trong process cron riêng (không chiếm pool thread nền) -> chờ token được lâu.
+"""
+import logging
+import time
+
+from django.db.models import Q
+
+from core.models import Word, WordDocument
+from .breaker import CircuitOpenError
+from .deinflect import lookup_deinflected
+from .documents import rebuild_documents
+from .ingest import upsert_from_jisho
+from .prefetch import PREFETCH_TOP_N, prefetch_examples
+from .ranking import by_score, rank_matches
+from .ratelimit import BACKGROUND, priority
+from .refresh import refresh_word, stale_q
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+MAX_WAIT = 30.0      # giây chờ token upstream tối đa cho mỗi call
+
+
+def _out_of_time(deadline: float | None) -> bool:
+    return deadline is not None and time.monotonic() >= deadline
+
+
+def _result_ids(q: str) -> list[int]:
+    """Top kết quả của q theo đúng thứ tự SearchView (DB -> deinflect -> Jisho)."""
+    local = Word.objects.filter(Q(kanji__icontains=q) | Q(kana__icontains=q))
+    if local.exists():
+        qs = rank_matches(local, q)
+    else:
+        deinflections = lookup_deinflected(q)
+        if deinflections:
+            qs = by_score(Word.objects.filter(id__in=list(deinflections)))
+        else:
+            words = upsert_from_jisho(q)
+            qs = by_score(Word.objects.filter(id__in=[w.id for w in words]))
+    return list(qs.values_list("id", flat=True)[:PREFETCH_TOP_N])
+
+
+def warm_queries(queries: list[str], deadline: float | None = None) -> dict:
+    """Ingest query chưa có trong DB + enrich example cho các kết quả đầu của mỗi query."""
+    stats = {"queries": 0, "enriched": 0}
+    with priority(BACKGROUND, max_wait=MAX_WAIT):
+        for q in queries:
+            if _out_of_time(deadline):
+                break
+            try:
+                ids = _result_ids(q)
+            except CircuitOpenError as e:
+                logger.warning(f"[WARM] {e}; stopping query warming")
+                break
+            except Exception as e:
+                logger.warning(f"[WARM] query '{q}' failed: {e}")
+                continue
+            stats["queries"] += 1
+            stats["enriched"] += sum(prefetch_examples(word_id) for word_id in ids)
+    rebuild_missing_documents()
+    return stats
+
+
+def jlpt_candidates() -> list[int]:
+    """Word có JLPT level còn thiếu gì đó (stale / chưa có document / thiếu example), score cao trước."""
+    incomplete = Q(document__isnull=True) | Q(document__complete=False)
+    return list(
+        by_score(
+            Word.objects.exclude(jlpt_level__isnull=True).exclude(jlpt_level="")
+            .filter(stale_q() | incomplete)
+        ).values_list("id", flat=True)
+    )
+
+
+def warm_jlpt_words(deadline: float | None = None) -> dict:
+    stats = {"candidates": 0, "refreshed": 0, "enriched": 0}
+    ids = jlpt_candidates()
+    stats["candidates"] = len(ids)
+    jisho_open = True
+    with priority(BACKGROUND, max_wait=MAX_WAIT):
+        for word_id in ids:
+            if _out_of_time(deadline):
+                break
+            if jisho_open and Word.objects.filter(stale_q(), pk=word_id).exists():
+                try:
+                    refresh_word(word_id)
+                    stats["refreshed"] += 1
+                except CircuitOpenError as e:
+                    # Jisho lỗi -> vẫn enrich example (Tatoeba) cho phần còn lại
+                    logger.warning(f"[WARM] {e}; skipping refresh for remaining words")
+                    jisho_open = False
+                except Exception as e:
+                    logger.warning(f"[WARM] refresh word {word_id} failed: {e}")
+            stats["enriched"] += prefetch_examples(word_id)
+    rebuild_missing_documents()
+    return stats
+
+
+def rebuild_missing_documents() -> int:
+    """Word chưa có WordDocument (ingest cũ / enrich không thêm được example) -> build sẵn."""
+    ids = list(
+        Word.objects.exclude(pk__in=WordDocument.objects.values("pk")).values_list("id", flat=True)
+    )
+    for i in range(0, len(ids), BATCH_SIZE):
+        rebuild_documents(ids[i:i + BATCH_SIZE])
+    return len(ids)
@@ -0,0 +1,78 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from core.models import User, Favorite, Flashcard, FlashcardWord, SearchHistory
+from core.services import history, sync
+
+
+def _deleting_user(kwargs) -> bool:
+    # Xoá cả user -> change log của user cũng bị cascade, không ghi tombstone
+    return isinstance(kwargs.get("origin"), User)
+
+
+# ---------------------------------------------------------
+#  DELTA SYNC CHANGE LOG
+#  (membership version cũng đọc từ log này, xem services/membership.py)
+# ---------------------------------------------------------
+
+@receiver(post_save, sender=Favorite)
+def _favorite_saved(sender, instance, **kwargs):
+    sync.record_change(
+        instance.user_id, sync.FAVORITE, instance.id, sync.UPSERT,
+        {"word_id": instance.word_id},
+    )
+
+
+@receiver(post_delete, sender=Favorite)
+def _favorite_deleted(sender, instance, **kwargs):
+    if not _deleting_user(kwargs):
+        sync.record_change(instance.user_id, sync.FAVORITE, instance.id, sync.DELETE)
+
+
+@receiver(post_save, sender=Flashcard)
+def _flashcard_saved(sender, instance, **kwargs):
+    sync.record_change(
+        instance.user_id, sync.FLASHCARD, instance.id, sync.UPSERT,
+        {"name": instance.name, "created_at": instance.created_at.isoformat()},
+    )
+
+
+@receiver(post_delete, sender=Flashcard)
+def _flashcard_deleted(sender, instance, **kwargs):
+    if not _deleting_user(kwargs):
+        sync.record_change(instance.user_id, sync.FLASHCARD, instance.id, sync.DELETE)
+
+
+def _flashcard_owner(flashcard_id):
+    return (
+        Flashcard.objects.filter(id=flashcard_id)
+        .values_list("user_id", flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=FlashcardWord)
+def _flashcard_word_saved(sender, instance, **kwargs):
+    user_id = _flashcard_owner(instance.flashcard_id)
+    if user_id:
+        sync.record_change(
+            user_id, sync.FLASHCARD_WORD, instance.id, sync.UPSERT,
+            {"flashcard_id": instance.flashcard_id, "word_id": instance.word_id},
+        )
+
+
+@receiver(post_delete, sender=FlashcardWord)
+def _flashcard_word_deleted(sender, instance, **kwargs):
+    if _deleting_user(kwargs):
+        return
+    user_id = _flashcard_owner(instance.flashcard_id)
+    if user_id:
+        sync.record_change(user_id, sync.FLASHCARD_WORD, instance.id, sync.DELETE)
+
+
+# SearchHistory upsert và trim đi theo batch -> ghi log trong services/history.py;
+# ở đây chỉ bắt delete còn lại (cascade khi xoá word)
+@receiver(post_delete, sender=SearchHistory)
+def _history_deleted(sender, instance, **kwargs):
+    if not _deleting_user(kwargs) and not history.is_trimming():
+        sync.record_change(instance.user_id, sync.HISTORY, instance.word_id, sync.DELETE)
@@ -0,0 +1,81 @@
+import json
+from unittest import mock
+
+from django.test import AsyncRequestFactory, TestCase
+from django.utils import timezone
+
+from core.api import async_views
+from core.models import Word
+
+DOG = {
+    "data": [{
+        "japanese": [{"word": "犬", "reading": "いぬ"}],
+        "senses": [{"english_definitions": ["dog"], "parts_of_speech": ["Noun"]}],
+        "is_common": True,
+        "jlpt": ["jlpt-n5"],
+    }]
+}
+
+
+class AsyncSearchTests(TestCase):
+    def setUp(self):
+        self.factory = AsyncRequestFactory()
+        # ingest / search xếp job nền (bundle, enrich example) trên thread riêng -> tắt trong test
+        for target in ("core.services.ingest.schedule_bundle_update", "core.api.search.schedule_prefetch"):
+            patcher = mock.patch(target)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def search(self, q):
+        response = await async_views.search(self.factory.get("/api/search/", {"q": q}))
+        if hasattr(response, "render"):
+            response.render()   # view DRF gọi trực tiếp, không qua handler
+        return response
+
+    async def test_jisho_is_called_once_on_a_miss(self):
+        jisho = mock.AsyncMock(return_value=DOG)
+        with mock.patch("core.api.async_views.jisho_search_async", jisho), \
+                mock.patch("core.api.search.upsert_from_jisho") as sync_upsert:
+            response = await self.search("dog")
+
+        self.assertEqual(response.status_code, 200)
+        results = json.loads(response.content)["results"]
+        self.assertEqual([w["kanji"] for w in results], ["犬"])
+        jisho.assert_awaited_once()
+        sync_upsert.assert_not_called()
+
+    async def test_local_hit_does_not_call_jisho(self):
+        await Word.objects.acreate(kanji="猫", kana="ねこ", refreshed_at=timezone.now())
+        jisho = mock.AsyncMock()
+        with mock.patch("core.api.async_views.jisho_search_async", jisho):
+            response = await self.search("猫")
+
+        self.assertEqual(json.loads(response.content)["count"], 1)
+        jisho.assert_not_awaited()
+
+    async def test_empty_jisho_answer_returns_empty_page(self):
+        jisho = mock.AsyncMock(return_value={"data": []})
+        with mock.patch("core.api.async_views.jisho_search_async", jisho):
+            response = await self.search("ぬぬぬぬ")
+
+        self.assertEqual(json.loads(response.content), async_views.EMPTY_PAGE)
+
+
+class AsyncPostViewTests(TestCase):
+    def setUp(self):
+        self.factory = AsyncRequestFactory()
+
+    def post(self, path, data):
+        return self.factory.post(path, json.dumps(data), content_type="application/json")
+
+    async def test_quiz_count_is_validated(self):
+        response = await async_views.jlpt_quiz(self.post("/api/quiz/jlpt/", {"count": "many"}))
+        self.assertEqual(response.status_code, 400)
+
+    async def test_translate_batch_rejects_unknown_language(self):
+        with mock.patch("core.api.async_views.translate_many_async") as translate:
+            response = await async_views.translate_batch(
+                self.post("/api/translate/batch/", {"texts": ["犬"], "target": "klingon"})
+            )
+        self.assertEqual(response.status_code, 400)
+        translate.assert_not_called()
@@ -0,0 +1,91 @@
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from core.services.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+from core.services.ratelimit import RateLimitExceeded
+
+
+class UpstreamError(Exception):
+    def __init__(self, status=None):
+        super().__init__(f"status {status}")
+        self.response = mock.Mock(status_code=status) if status else None
+
+
+def failing(status=None):
+    def fn(timeout):
+        raise UpstreamError(status)
+    return fn
+
+
+class CircuitBreakerTests(TestCase):
+    def setUp(self):
+        self.breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=30)
+
+    def fail(self, breaker=None, status=None):
+        with self.assertRaises(UpstreamError):
+            (breaker or self.breaker).call(failing(status))
+
+    def half_open(self):
+        cache.set(self.breaker._key, {"opened_at": time.time() - 60}, None)
+        # worker khác: đọc state mới từ cache dùng chung
+        breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=30, limiter=mock.Mock())
+        self.assertEqual(breaker.state, HALF_OPEN)
+        return breaker
+
+    def test_opens_after_threshold_and_fails_fast(self):
+        self.fail()
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.fail()
+        self.assertEqual(self.breaker.state, OPEN)
+
+        fn = mock.Mock()
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.call(fn)
+        fn.assert_not_called()
+
+    def test_client_errors_are_not_counted(self):
+        for _ in range(3):
+            self.fail(status=404)
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertIsNone(cache.get(self.breaker._failures_key))
+
+    def test_failures_are_shared_between_workers(self):
+        self.fail()
+        self.fail(CircuitBreaker("test", failure_threshold=2, reset_timeout=30))
+        self.assertEqual(cache.get(self.breaker._failures_key), 2)
+
+    def test_half_open_allows_a_single_probe(self):
+        breaker = self.half_open()
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+
+    def test_successful_probe_closes(self):
+        breaker = self.half_open()
+        self.assertEqual(breaker.call(lambda timeout: "ok"), "ok")
+        self.assertEqual(breaker.state, CLOSED)
+        self.assertIsNone(cache.get(breaker._probe_key))
+
+    def test_failed_probe_reopens(self):
+        breaker = self.half_open()
+        self.fail(breaker, status=503)
+        self.assertEqual(breaker.state, OPEN)
+
+    def test_probe_rejected_by_rate_limiter_releases_probe(self):
+        breaker = self.half_open()
+        breaker.limiter.acquire.side_effect = RateLimitExceeded("test: waited too long")
+        with self.assertRaises(CircuitOpenError):
+            breaker.call(mock.Mock())
+
+        self.assertEqual(breaker.state, HALF_OPEN)
+        self.assertIsNone(cache.get(breaker._probe_key))
+        self.assertTrue(breaker.allow())
+
+    def test_probe_ending_in_client_error_releases_probe(self):
+        breaker = self.half_open()
+        self.fail(breaker, status=404)
+
+        self.assertEqual(breaker.state, HALF_OPEN)
+        self.assertTrue(breaker.allow())
@@ -0,0 +1,64 @@
+import shutil
+import sqlite3
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.models import Word, WordMeaning
+from core.services import bundle
+from core.services.ingest import ingest_jisho_payload
+
+DOG = {"data": [{
+    "japanese": [{"word": "犬", "reading": "いぬ"}],
+    "senses": [{"english_definitions": ["dog"], "parts_of_speech": ["Noun"]},
+               {"english_definitions": ["hound"], "parts_of_speech": ["Noun"]}],
+}]}
+
+
+class OfflineBundleTests(TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        override = override_settings(OFFLINE_BUNDLE_DIR=directory)
+        override.enable()
+        self.addCleanup(override.disable)
+        patcher = mock.patch("core.services.ingest.schedule_bundle_update")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        old = timezone.now() - timedelta(days=2)
+        self.word = Word.objects.create(kanji="犬", kana="いぬ", fetched_at=old, refreshed_at=old)
+        WordMeaning.objects.create(word=self.word, meaning="dog")
+
+    def bundled_meanings(self):
+        db = sqlite3.connect(bundle._path("bundle.sqlite"))
+        try:
+            return [m for (m,) in db.execute("SELECT meaning FROM meaning ORDER BY id")]
+        finally:
+            db.close()
+
+    def test_search_ingest_of_new_meanings_marks_word_dirty(self):
+        since = timezone.now() - timedelta(hours=1)
+        self.assertEqual(bundle._dirty_word_ids(since, self.word.id), [])
+
+        ingest_jisho_payload(DOG)
+        self.assertEqual(bundle._dirty_word_ids(since, self.word.id), [self.word.id])
+
+    def test_existing_meanings_do_not_mark_word_dirty(self):
+        since = timezone.now() - timedelta(hours=1)
+        ingest_jisho_payload({"data": [dict(DOG["data"][0], senses=DOG["data"][0]["senses"][:1])]})
+        self.assertEqual(bundle._dirty_word_ids(since, self.word.id), [])
+
+    def test_incremental_build_picks_up_new_meanings(self):
+        first = bundle.build_bundle()
+        self.assertEqual(self.bundled_meanings(), ["dog"])
+
+        ingest_jisho_payload(DOG)
+        second = bundle.build_bundle()
+
+        self.assertEqual(second["version"], first["version"] + 1)
+        self.assertEqual(self.bundled_meanings(), ["dog", "hound"])
+        self.assertEqual(bundle.delta(first["version"])["from_version"], first["version"])
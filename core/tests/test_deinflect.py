@@ -0,0 +1,52 @@
+from django.test import TestCase
+from django.utils import timezone
+
+from core.models import Word
+from core.services.deinflect import deinflect, lookup_deinflected, lookup_deinflected_many
+
+
+def reasons_for(text, base):
+    return [c.reasons for c in deinflect(text) if c.term == base]
+
+
+class DeinflectTests(TestCase):
+    def test_rules_chain_through_intermediate_forms(self):
+        self.assertIn(("past", "negative"), reasons_for("行かなかった", "行く"))
+        self.assertIn(("past",), reasons_for("食べた", "食べる"))
+        self.assertIn(("negative",), reasons_for("高くない", "高い"))
+        self.assertIn(("te-form",), reasons_for("書いて", "書く"))
+
+    def test_query_itself_is_first_candidate(self):
+        self.assertEqual(deinflect("犬")[0].term, "犬")
+        self.assertEqual(deinflect("犬")[0].reasons, ())
+
+
+class LookupDeinflectedTests(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        self.iku = Word.objects.create(kanji="行く", kana="いく", parts_of_speech="Godan verb", refreshed_at=now)
+        self.taberu = Word.objects.create(
+            kanji="食べる", kana="たべる", parts_of_speech="Ichidan verb", refreshed_at=now
+        )
+        self.benkyou = Word.objects.create(
+            kanji="勉強", kana="べんきょう", parts_of_speech="Noun, Suru verb", refreshed_at=now
+        )
+
+    def test_trace_describes_the_inflection(self):
+        traces = lookup_deinflected("行かなかった")
+        self.assertEqual(list(traces), [self.iku.id])
+        self.assertEqual(traces[self.iku.id]["base"], "行く")
+        self.assertEqual(traces[self.iku.id]["description"], "past negative of 行く")
+
+    def test_part_of_speech_filters_false_bases(self):
+        # 食べる chia như ichidan; 食べた không được khớp 1 word godan trùng chữ
+        Word.objects.filter(pk=self.taberu.pk).update(parts_of_speech="Godan verb")
+        self.assertEqual(lookup_deinflected("食べた"), {})
+
+    def test_suru_noun_matches_without_suru(self):
+        self.assertIn(self.benkyou.id, lookup_deinflected("勉強した"))
+
+    def test_batch_lookup_groups_by_query(self):
+        found = lookup_deinflected_many(["食べた", "行かなかった", "犬"])
+        self.assertEqual(set(found), {"食べた", "行かなかった"})
+        self.assertEqual(list(found["食べた"]), [self.taberu.id])
@@ -0,0 +1,78 @@
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.models import ExampleSentence, MeaningExample, Word, WordDocument, WordMeaning
+from core.services import versions
+from core.services.documents import rebuild_documents
+
+
+class WordDocumentTests(TestCase):
+    def setUp(self):
+        self.word = Word.objects.create(
+            kanji="犬", kana="いぬ", parts_of_speech="Noun", jlpt_level="N5",
+            refreshed_at=timezone.now(),
+        )
+        self.meaning = WordMeaning.objects.create(word=self.word, meaning="dog")
+
+    def add_example(self, source_id):
+        sentence = ExampleSentence.objects.create(jp="犬がいる。", en="There is a dog.", source_id=source_id)
+        MeaningExample.objects.create(meaning=self.meaning, sentence=sentence)
+
+    def test_first_build_creates_version_one(self):
+        doc = rebuild_documents([self.word.id])[self.word.id]
+        self.assertEqual(doc.version, 1)
+        self.assertFalse(doc.complete)
+        self.assertEqual(doc.data["meanings"][0]["meaning"], "dog")
+
+    def test_version_only_increases_when_content_changes(self):
+        rebuild_documents([self.word.id])
+        rebuild_documents([self.word.id])
+        self.assertEqual(WordDocument.objects.get(pk=self.word.id).version, 1)
+
+        self.add_example("1")
+        rebuild_documents([self.word.id])
+        doc = WordDocument.objects.get(pk=self.word.id)
+        self.assertEqual(doc.version, 2)
+        self.assertTrue(doc.complete)
+
+    def test_changed_document_bumps_its_jlpt_list(self):
+        rebuild_documents([self.word.id])
+        before, _ = versions.get(versions.jlpt_key("N5"))
+
+        rebuild_documents([self.word.id])
+        self.assertEqual(versions.get(versions.jlpt_key("N5"))[0], before)
+
+        WordMeaning.objects.create(word=self.word, meaning="hound")
+        rebuild_documents([self.word.id])
+        self.assertEqual(versions.get(versions.jlpt_key("N5"))[0], before + 1)
+
+
+class WordDetailConditionalTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.word = Word.objects.create(
+            kanji="犬", kana="いぬ", parts_of_speech="Noun", refreshed_at=timezone.now()
+        )
+        self.meaning = WordMeaning.objects.create(word=self.word, meaning="dog")
+        sentence = ExampleSentence.objects.create(jp="犬がいる。", en="There is a dog.", source_id="1")
+        MeaningExample.objects.create(meaning=self.meaning, sentence=sentence)
+        rebuild_documents([self.word.id])
+        self.url = f"/api/word/{self.word.id}/"
+
+    def test_matching_etag_returns_304(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.json()["meanings"][0]["examples"][0]["jp"], "犬がいる。")
+
+        again = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(again.status_code, 304)
+
+    def test_content_change_invalidates_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+        WordMeaning.objects.filter(pk=self.meaning.pk).update(meaning="dog; hound")
+        rebuild_documents([self.word.id])
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
@@ -0,0 +1,70 @@
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from core.models import Word, WordMeaning
+from core.services import fuzzy
+from core.services.fuzzy import DeletionIndex, edit_distance, to_romaji
+
+
+class RomajiTests(SimpleTestCase):
+    def test_hepburn(self):
+        self.assertEqual(to_romaji("きょう"), "kyou")
+        self.assertEqual(to_romaji("がっこう"), "gakkou")
+        self.assertEqual(to_romaji("しゃしん"), "shashin")
+        self.assertEqual(to_romaji("コーヒー"), "koohii")
+        self.assertEqual(to_romaji("まっちゃ"), "matcha")
+
+
+class DeletionIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.index = DeletionIndex()
+        for word_id, term in enumerate(["taberu", "gakkou", "study", "dog"], start=1):
+            self.index.add(term, word_id)
+
+    def test_edit_distance_counts_transpositions_once(self):
+        self.assertEqual(edit_distance("stuyd", "study", 2), 1)
+        self.assertEqual(edit_distance("taberu", "tabeu", 2), 1)
+        self.assertEqual(edit_distance("abcdef", "uvwxyz", 2), 3)
+
+    def test_typo_within_distance(self):
+        self.assertEqual(self.index.search("tabeu"), [("taberu", 1, [1])])
+        self.assertEqual(self.index.search("gakko"), [("gakkou", 1, [2])])
+
+    def test_short_queries_allow_less_distance(self):
+        # 3-4 ký tự: tối đa 1; "stdy" -> study (1), "sxdy" (2) thì không
+        self.assertEqual(self.index.search("stdy"), [("study", 1, [3])])
+        self.assertEqual(self.index.search("sxdy"), [])
+        # <= 2 ký tự: chỉ khớp đúng
+        self.assertEqual(self.index.search("do"), [])
+
+    def test_exact_match_short_circuits(self):
+        self.assertEqual(self.index.search("dog"), [("dog", 0, [4])])
+
+
+class FuzzyLookupTests(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        self.gakkou = Word.objects.create(kanji="学校", kana="がっこう", refreshed_at=now)
+        self.benkyou = Word.objects.create(kanji="勉強", kana="べんきょう", refreshed_at=now)
+        WordMeaning.objects.create(word=self.gakkou, meaning="school")
+        WordMeaning.objects.create(word=self.benkyou, meaning="study; studying at school")
+        fuzzy.preload()
+        self.addCleanup(setattr, fuzzy, "_index", None)
+
+    def test_readings_match_kana_and_romaji_typos(self):
+        self.assertEqual(fuzzy.fuzzy_readings("がっこお"), {self.gakkou.id: {"term": "がっこう", "distance": 1}})
+        self.assertEqual(fuzzy.fuzzy_readings("gakko"), {self.gakkou.id: {"term": "gakkou", "distance": 1}})
+        self.assertEqual(fuzzy.fuzzy_readings("benkyou")[self.benkyou.id]["distance"], 0)
+
+    def test_every_meaning_token_must_match(self):
+        found = fuzzy.fuzzy_meanings("stuydy skool")
+        self.assertEqual(list(found), [self.benkyou.id])
+        self.assertEqual(found[self.benkyou.id], {"term": "study school", "distance": 3})
+
+        self.assertEqual(set(fuzzy.fuzzy_meanings("skool")), {self.gakkou.id, self.benkyou.id})
+
+    def test_index_not_built_yet_returns_nothing(self):
+        fuzzy._index = None
+        fuzzy._refreshing = True      # đang build trong thread nền
+        self.addCleanup(setattr, fuzzy, "_refreshing", False)
+        self.assertEqual(fuzzy.fuzzy_readings("gakko"), {})
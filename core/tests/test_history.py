@@ -0,0 +1,62 @@
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.models import SearchHistory, SyncChange, User, Word
+from core.services import history, sync
+from core.services.history import flush_search_history, save_search_history
+
+
+@mock.patch("core.services.buffered.FlushBuffer._ensure_flusher")
+class SearchHistoryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="u", email="u@example.com", password="x")
+        self.words = [Word.objects.create(kanji=f"語{i}", kana=f"ご{i}", refreshed_at=timezone.now()) for i in range(3)]
+        self.addCleanup(history._buffer.clear)
+
+    def test_only_first_word_is_buffered_until_flush(self, flusher):
+        save_search_history(self.user, Word.objects.order_by("id"))
+        self.assertFalse(SearchHistory.objects.exists())
+
+        flush_search_history()
+        self.assertEqual(list(SearchHistory.objects.values_list("word_id", flat=True)), [self.words[0].id])
+        self.assertTrue(SyncChange.objects.filter(user=self.user, entity=sync.HISTORY).exists())
+
+    def test_anonymous_and_empty_searches_are_ignored(self, flusher):
+        save_search_history(None, Word.objects.all())
+        save_search_history(self.user, Word.objects.none())
+        self.assertEqual(history._buffer.items, {})
+
+    def test_repeat_search_bumps_searched_at(self, flusher):
+        save_search_history(self.user, [self.words[0]])
+        flush_search_history()
+        first = SearchHistory.objects.get().searched_at
+
+        save_search_history(self.user, [self.words[0]])
+        flush_search_history()
+        self.assertEqual(SearchHistory.objects.count(), 1)
+        self.assertGreater(SearchHistory.objects.get().searched_at, first)
+
+    def test_history_is_trimmed_per_user(self, flusher):
+        with mock.patch.object(history, "MAX_PER_USER", 2):
+            for word in self.words:
+                save_search_history(self.user, [word])
+                flush_search_history()
+
+        kept = set(SearchHistory.objects.values_list("word_id", flat=True))
+        self.assertEqual(kept, {self.words[1].id, self.words[2].id})
+        self.assertEqual(
+            SyncChange.objects.get(user=self.user, object_id=self.words[0].id).op, sync.DELETE
+        )
+
+    def test_endpoint_lists_newest_first(self, flusher):
+        for word in self.words:
+            save_search_history(self.user, [word])
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        data = client.get("/api/history/").json()
+        self.assertEqual([h["kanji"] for h in data], ["語2", "語1", "語0"])
+        self.assertEqual(set(data[0]), {"id", "kanji", "kana", "searched_at"})
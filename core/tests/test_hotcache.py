@@ -0,0 +1,63 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from core.services import hotcache
+from core.services.hotcache import HotCache
+
+
+class HotCacheTests(SimpleTestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(prefix="hotcache-test-")
+        os.close(fd)
+        self.addCleanup(os.remove, self.path)
+        # 8 slot = 1 set: mọi word cạnh tranh cùng 1 set
+        self.cache = HotCache(self.path, slots=8, slot_size=1024)
+
+    def payload(self, word_id, text="x"):
+        return {"id": word_id, "kanji": text, "meanings": []}
+
+    def test_put_then_get(self):
+        self.assertTrue(self.cache.put(1, self.payload(1, "犬"), self.cache.generation()))
+        self.assertEqual(self.cache.get(1), self.payload(1, "犬"))
+        self.assertIsNone(self.cache.get(2))
+
+    def test_invalidate_removes_entry(self):
+        self.cache.put(1, self.payload(1), self.cache.generation())
+        self.cache.invalidate([1])
+        self.assertIsNone(self.cache.get(1))
+
+    def test_put_read_before_invalidate_is_rejected(self):
+        generation = self.cache.generation()     # reader bắt đầu đọc DB
+        self.cache.invalidate([1])                # writer commit bản mới
+        self.assertFalse(self.cache.put(1, self.payload(1, "old"), generation))
+        self.assertIsNone(self.cache.get(1))
+
+        self.assertTrue(self.cache.put(1, self.payload(1, "new"), self.cache.generation()))
+        self.assertEqual(self.cache.get(1)["kanji"], "new")
+
+    def test_oversized_payload_is_not_admitted(self):
+        self.assertFalse(self.cache.put(1, self.payload(1, "x" * 2048), self.cache.generation()))
+
+    def test_full_set_admits_only_more_frequent_words(self):
+        generation = self.cache.generation()
+        for word_id in range(1, 9):
+            self.assertTrue(self.cache.put(word_id, self.payload(word_id), generation))
+
+        self.assertFalse(self.cache.put(100, self.payload(100), generation))
+        for _ in range(3):
+            self.cache.get(100)                   # miss nhưng vẫn được đếm trong sketch
+        self.assertTrue(self.cache.put(100, self.payload(100), generation))
+        self.assertIsNotNone(self.cache.get(100))
+
+    def test_entries_expire_after_max_age(self):
+        self.cache.put(1, self.payload(1), self.cache.generation())
+        with mock.patch.object(hotcache.time, "time", return_value=hotcache.time.time() + hotcache.MAX_AGE + 1):
+            self.assertIsNone(self.cache.get(1))
+
+    def test_reopening_with_other_layout_resets_file(self):
+        self.cache.put(1, self.payload(1), self.cache.generation())
+        other = HotCache(self.path, slots=16, slot_size=1024)
+        self.assertIsNone(other.get(1))
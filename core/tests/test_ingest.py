@@ -0,0 +1,73 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from core.models import ExampleSentence, MeaningExample, Word, WordDocument, WordMeaning
+from core.services import refresh
+from core.services.ingest import ingest_jisho_payload
+
+
+def payload(*senses, kanji="犬", kana="いぬ"):
+    return {"data": [{
+        "japanese": [{"word": kanji, "reading": kana}],
+        "senses": [{"english_definitions": defs, "parts_of_speech": ["Noun"]} for defs in senses],
+        "is_common": True,
+    }]}
+
+
+class RefreshMeaningsTests(TestCase):
+    def setUp(self):
+        # bundle offline cập nhật trong thread nền -> không chạy trong test
+        patcher = mock.patch("core.services.ingest.schedule_bundle_update")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.word = ingest_jisho_payload(payload(["dog"], ["spy", "snoop"]))[0]
+        self.spy = WordMeaning.objects.get(word=self.word, meaning="spy; snoop")
+        self.sentence = ExampleSentence.objects.create(jp="あいつは警察の犬だ。", en="He is a police dog.", source_id="1")
+        MeaningExample.objects.create(meaning=self.spy, sentence=self.sentence)
+
+    def meanings(self):
+        return list(WordMeaning.objects.filter(word=self.word).order_by("id").values_list("meaning", flat=True))
+
+    def test_search_ingest_keeps_existing_meanings(self):
+        ingest_jisho_payload(payload(["dog"]))
+        self.assertEqual(self.meanings(), ["dog", "spy; snoop"])
+
+    def test_refresh_drops_meanings_jisho_no_longer_lists(self):
+        ingest_jisho_payload(payload(["dog"], ["hound"]), refresh=True)
+        self.assertEqual(self.meanings(), ["dog", "hound"])
+
+    def test_examples_of_dropped_meanings_are_relinked(self):
+        ingest_jisho_payload(payload(["dog"], ["hound"]), refresh=True)
+
+        link = MeaningExample.objects.get(sentence=self.sentence)
+        self.assertEqual(link.meaning.meaning, "dog")
+        doc = WordDocument.objects.get(pk=self.word.pk).data
+        self.assertEqual([m["meaning"] for m in doc["meanings"]], ["dog", "hound"])
+        self.assertEqual(doc["meanings"][0]["examples"][0]["jp"], "あいつは警察の犬だ。")
+
+    def test_refresh_without_senses_keeps_meanings(self):
+        ingest_jisho_payload(payload(), refresh=True)
+        self.assertEqual(self.meanings(), ["dog", "spy; snoop"])
+
+
+@mock.patch("core.services.refresh.run_in_background", return_value=True)
+class StaleRefreshTests(TestCase):
+    def word(self, age_days):
+        return Word.objects.create(kanji="犬", kana="いぬ", refreshed_at=timezone.now() - timedelta(days=age_days))
+
+    def test_only_stale_rows_of_the_page_are_queued(self, run):
+        fresh, stale = self.word(1), self.word(40)
+        with self.assertNumQueries(0):
+            self.assertEqual(refresh.schedule_stale([fresh]), 0)
+        self.assertEqual(refresh.schedule_stale([fresh, stale]), 1)
+        run.assert_called_once_with(f"refresh-word:{stale.id}", refresh.refresh_word, stale.id)
+
+    def test_queued_words_do_not_use_budget(self, run):
+        stale = self.word(40)
+        with mock.patch("core.services.refresh.is_queued", return_value=True), \
+                mock.patch("core.services.refresh.take_budget") as budget:
+            self.assertEqual(refresh.schedule_stale([stale]), 0)
+        budget.assert_not_called()
@@ -0,0 +1,65 @@
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.models import Word, WordMeaning
+from core.services.lookup import bulk_lookup
+
+
+class BulkLookupTests(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        self.taberu = Word.objects.create(
+            kanji="食べる", kana="たべる", parts_of_speech="Ichidan verb", refreshed_at=now
+        )
+        WordMeaning.objects.create(word=self.taberu, meaning="to eat")
+        self.iku = Word.objects.create(kanji="行く", kana="いく", parts_of_speech="Godan verb", refreshed_at=now)
+
+    def test_exact_deinflected_and_missing_terms(self):
+        data = bulk_lookup(["食べる", "いく", "行かなかった", "NHK"])
+
+        self.assertEqual(
+            data["results"],
+            {"食べる": [self.taberu.id], "いく": [self.iku.id], "行かなかった": [self.iku.id], "NHK": []},
+        )
+        self.assertEqual(data["deinflections"]["行かなかった"]["base"], "行く")
+        self.assertEqual(data["words"][self.taberu.id]["gloss"], "to eat")
+        self.assertEqual(data["missing"], ["NHK"])
+
+    def test_query_count_does_not_grow_with_terms(self):
+        terms = [f"語{i}った" for i in range(300)] + ["食べる"]
+        # khớp nguyên dạng + thể gốc (deinflect) + thông tin word
+        with self.assertNumQueries(3):
+            bulk_lookup(terms)
+
+
+class BulkLookupViewTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.nhk = Word.objects.create(kanji="NHK", kana="エヌエイチケー", refreshed_at=timezone.now())
+
+    def post(self, data):
+        return self.client.post("/api/lookup/", data, format="json")
+
+    def test_response_is_keyed_by_the_terms_as_sent(self):
+        data = self.post({"terms": ["ＮＨＫ", " NHK", "ＡＢＣ"]}).json()
+
+        self.assertEqual(data["results"], {"ＮＨＫ": [self.nhk.id], " NHK": [self.nhk.id], "ＡＢＣ": []})
+        self.assertEqual(data["missing"], ["ＡＢＣ"])
+        self.assertEqual(data["queued"], 0)
+
+    def test_non_string_terms_are_dropped(self):
+        data = self.post({"terms": [None, 3, {"a": 1}, "", "NHK"]}).json()
+        self.assertEqual(list(data["results"]), ["NHK"])
+
+    def test_missing_terms_are_queued_normalized(self):
+        with mock.patch("core.api.lookup.schedule_ingest", return_value=1) as schedule:
+            data = self.post({"terms": ["ＡＢＣ"], "ingest_missing": True}).json()
+
+        schedule.assert_called_once_with(["ABC"])
+        self.assertEqual(data["queued"], 1)
+
+    def test_rejects_empty_list(self):
+        self.assertEqual(self.post({"terms": []}).status_code, 400)
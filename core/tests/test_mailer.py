@@ -0,0 +1,77 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core import mail
+from django.test import TestCase
+from django.utils import timezone
+
+from core.models import OutboundEmail
+from core.services import mailer
+
+
+class OutboundEmailTests(TestCase):
+    def enqueue(self, to="a@example.com"):
+        # TestCase không commit -> on_commit(schedule_send) không chạy, gửi bằng send_pending
+        return mailer.enqueue_email(to, "Reset", "link")
+
+    def test_send_pending_delivers_and_marks_sent(self):
+        email = self.enqueue()
+        self.assertEqual(mailer.send_pending(), 1)
+
+        email.refresh_from_db()
+        self.assertEqual(email.status, mailer.SENT)
+        self.assertEqual(email.attempts, 1)
+        self.assertEqual([m.to for m in mail.outbox], [["a@example.com"]])
+        self.assertEqual(mailer.send_pending(), 0)
+
+    def test_claim_leases_rows(self):
+        email = self.enqueue()
+        self.assertEqual([e.id for e in mailer._claim(10)], [email.id])
+        # đã claim -> worker khác không lấy lại cho tới khi hết lease
+        self.assertEqual(mailer._claim(10), [])
+
+        OutboundEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now())
+        self.assertEqual([e.id for e in mailer._claim(10)], [email.id])
+
+    def test_failure_is_retried_with_backoff(self):
+        email = self.enqueue()
+        with mock.patch.object(mailer, "send_mail", side_effect=OSError("smtp down")):
+            mailer.send_pending()
+
+        email.refresh_from_db()
+        self.assertEqual(email.status, mailer.PENDING)
+        self.assertEqual(email.attempts, 1)
+        self.assertEqual(email.last_error, "smtp down")
+        self.assertGreater(email.next_attempt_at, timezone.now() + timedelta(seconds=50))
+        # chưa tới hạn retry
+        self.assertEqual(mailer.send_pending(), 0)
+
+    def test_gives_up_after_max_attempts(self):
+        email = self.enqueue()
+        with mock.patch.object(mailer, "send_mail", side_effect=OSError("smtp down")):
+            for _ in range(mailer.MAX_ATTEMPTS):
+                OutboundEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now())
+                mailer.send_pending()
+
+        email.refresh_from_db()
+        self.assertEqual(email.status, mailer.FAILED)
+        self.assertEqual(email.attempts, mailer.MAX_ATTEMPTS)
+
+    def test_retry_delay_is_capped(self):
+        self.assertEqual(mailer.retry_delay(1), mailer.RETRY_BASE)
+        self.assertEqual(mailer.retry_delay(3), mailer.RETRY_BASE * 4)
+        self.assertEqual(mailer.retry_delay(20), mailer.RETRY_MAX)
+
+    def test_send_limit(self):
+        for i in range(3):
+            self.enqueue(f"u{i}@example.com")
+        self.assertEqual(mailer.send_pending(limit=2), 2)
+        self.assertEqual(OutboundEmail.objects.filter(status=mailer.PENDING).count(), 1)
+
+    def test_purge_keeps_recent_emails(self):
+        old, recent = self.enqueue(), self.enqueue()
+        mailer.send_pending()
+        OutboundEmail.objects.filter(pk=old.pk).update(sent_at=timezone.now() - timedelta(days=2))
+
+        self.assertEqual(mailer.purge_emails(), 1)
+        self.assertEqual(list(OutboundEmail.objects.values_list("id", flat=True)), [recent.id])
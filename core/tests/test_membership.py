@@ -0,0 +1,29 @@
+from django.test import TestCase
+
+from core.models import Favorite, Flashcard, FlashcardWord, User, Word
+from core.services.membership import batch_membership
+
+
+class BatchMembershipTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="u", email="u@example.com", password="x")
+        self.words = [Word.objects.create(kanji=f"語{i}", kana=f"ご{i}") for i in range(3)]
+
+    def test_favorites_and_decks_in_two_queries(self):
+        w0, w1, w2 = self.words
+        Favorite.objects.create(user=self.user, word=w0)
+        deck = Flashcard.objects.create(user=self.user, name="deck")
+        FlashcardWord.objects.create(flashcard=deck, word=w1)
+
+        with self.assertNumQueries(2):
+            result = batch_membership(self.user, [w.id for w in self.words])
+
+        self.assertEqual(result[w0.id], {"favorited": True, "flashcards": []})
+        self.assertEqual(result[w1.id], {"favorited": False, "flashcards": [deck.id]})
+        self.assertEqual(result[w2.id], {"favorited": False, "flashcards": []})
+
+    def test_other_users_membership_is_ignored(self):
+        other = User.objects.create_user(username="o", email="o@example.com", password="x")
+        Favorite.objects.create(user=other, word=self.words[0])
+        result = batch_membership(self.user, [self.words[0].id])
+        self.assertFalse(result[self.words[0].id]["favorited"])
@@ -0,0 +1,81 @@
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+
+
+class MigrationTestCase(TransactionTestCase):
+    """Migrate về `migrate_from`, tạo dữ liệu cũ, chạy tới `migrate_to` rồi kiểm tra."""
+
+    migrate_from: str
+    migrate_to: str
+
+    def setUp(self):
+        executor = MigrationExecutor(connection)
+        self.leaf = executor.loader.graph.leaf_nodes("core")
+        executor.migrate([("core", self.migrate_from)])
+        self.old_apps = executor.loader.project_state([("core", self.migrate_from)]).apps
+
+    def tearDown(self):
+        MigrationExecutor(connection).migrate(self.leaf)
+
+    def migrate(self):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate([("core", self.migrate_to)])
+        return executor.loader.project_state([("core", self.migrate_to)]).apps
+
+
+class SyncChangeBackfillTests(MigrationTestCase):
+    migrate_from = "0004_word_refresh_tracking"
+    migrate_to = "0005_sync_change_log"
+
+    def test_existing_data_gets_one_upsert_per_object(self):
+        User = self.old_apps.get_model("core", "User")
+        Word = self.old_apps.get_model("core", "Word")
+        user = User.objects.create(username="u", email="u@example.com")
+        word = Word.objects.create(kanji="犬", kana="いぬ", parts_of_speech="Noun")
+        favorite = self.old_apps.get_model("core", "Favorite").objects.create(user=user, word=word)
+        deck = self.old_apps.get_model("core", "Flashcard").objects.create(user=user, name="deck")
+        item = self.old_apps.get_model("core", "FlashcardWord").objects.create(flashcard=deck, word=word)
+        self.old_apps.get_model("core", "SearchHistory").objects.create(user=user, word=word)
+
+        apps = self.migrate()
+        rows = set(
+            apps.get_model("core", "SyncChange").objects.filter(user_id=user.id)
+            .values_list("entity", "object_id", "op")
+        )
+        self.assertEqual(rows, {
+            ("favorite", favorite.id, "upsert"),
+            ("flashcard", deck.id, "upsert"),
+            ("flashcard_word", item.id, "upsert"),
+            ("history", word.id, "upsert"),
+        })
+
+
+class SharedSentenceMigrationTests(MigrationTestCase):
+    migrate_from = "0006_word_ranking_score"
+    migrate_to = "0009_shared_sentence_constraints"
+
+    def test_duplicate_sentences_are_merged_and_linked(self):
+        Word = self.old_apps.get_model("core", "Word")
+        WordMeaning = self.old_apps.get_model("core", "WordMeaning")
+        ExampleSentence = self.old_apps.get_model("core", "ExampleSentence")
+
+        word = Word.objects.create(kanji="掛ける", kana="かける", parts_of_speech="Verb")
+        hang = WordMeaning.objects.create(word=word, meaning="to hang")
+        call = WordMeaning.objects.create(word=word, meaning="to call")
+        shared = ExampleSentence.objects.create(meaning=hang, jp="掛ける。", source_id="1")
+        ExampleSentence.objects.create(meaning=call, jp="掛ける。", source_id="1")
+        only_call = ExampleSentence.objects.create(meaning=call, jp="電話を掛ける。", source_id="2")
+        # không có source_id -> không gộp
+        local = ExampleSentence.objects.create(meaning=hang, jp="自作の例文。")
+
+        apps = self.migrate()
+        sentences = apps.get_model("core", "ExampleSentence").objects
+        self.assertEqual(
+            sorted(sentences.values_list("id", flat=True)), sorted([shared.id, only_call.id, local.id])
+        )
+        links = set(apps.get_model("core", "MeaningExample").objects.values_list("meaning_id", "sentence_id"))
+        self.assertEqual(links, {
+            (hang.id, shared.id), (call.id, shared.id), (call.id, only_call.id), (hang.id, local.id),
+        })
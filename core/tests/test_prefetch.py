@@ -0,0 +1,60 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from core.models import Word, WordMeaning
+from core.services import prefetch
+from core.services.prefetch import prefetch_examples, schedule_prefetch
+
+
+def payload(word_id, complete=False):
+    return {"id": word_id, "meanings": [{"examples": [{"jp": "…"}] if complete else []}]}
+
+
+@mock.patch("core.services.prefetch.run_in_background", return_value=True)
+class SchedulePrefetchTests(TestCase):
+    def test_only_top_incomplete_results(self, run):
+        page = [payload(1), payload(2, complete=True), payload(3), payload(4)]
+        self.assertEqual(schedule_prefetch(page), 2)
+        self.assertEqual(
+            run.call_args_list,
+            [mock.call(f"prefetch-examples:{i}", prefetch_examples, i) for i in (1, 3)],
+        )
+
+    def test_skips_tried_and_queued_words_before_budget(self, run):
+        cache.set(prefetch._tried_key(1), 1)
+        cache.set("bg:prefetch-examples:2", 1)
+        with mock.patch("core.services.prefetch.take_budget", return_value=True) as budget:
+            self.assertEqual(schedule_prefetch([payload(1), payload(2), payload(3)]), 1)
+        budget.assert_called_once()
+
+    def test_stops_when_budget_is_exhausted(self, run):
+        with mock.patch("core.services.prefetch.take_budget", side_effect=[True, False]):
+            self.assertEqual(schedule_prefetch([payload(1), payload(2), payload(3)]), 1)
+
+
+class PrefetchExamplesTests(TestCase):
+    def setUp(self):
+        self.word = Word.objects.create(kanji="犬", kana="いぬ", refreshed_at=timezone.now())
+        WordMeaning.objects.create(word=self.word, meaning="dog")
+
+    def fill(self, result):
+        return mock.patch("core.services.prefetch._fill_examples_for_word", return_value=result)
+
+    def test_empty_complete_search_is_remembered(self):
+        with self.fill((0, True)):
+            self.assertTrue(prefetch_examples(self.word.id))
+        self.assertIsNotNone(cache.get(prefetch._tried_key(self.word.id)))
+
+    def test_incomplete_search_is_retried(self):
+        # breaker / rate limiter chặn giữa chừng -> chưa tính là "đã thử"
+        with self.fill((0, False)):
+            prefetch_examples(self.word.id)
+        self.assertIsNone(cache.get(prefetch._tried_key(self.word.id)))
+
+    def test_deleted_word_is_skipped(self):
+        with self.fill((0, True)) as fill:
+            self.assertFalse(prefetch_examples(self.word.id + 1))
+        fill.assert_not_called()
@@ -0,0 +1,35 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from core.services import preload
+
+
+@mock.patch("core.services.preload.gc")
+@mock.patch("core.services.preload.fuzzy")
+@mock.patch("core.services.preload.segment")
+class RefreshIfStaleTests(SimpleTestCase):
+    def setUp(self):
+        for name in ("_preloaded_at", "_failed_at"):
+            self.addCleanup(setattr, preload, name, getattr(preload, name))
+            setattr(preload, name, None)
+
+    def test_fresh_index_is_not_rebuilt(self, segment, fuzzy, gc):
+        segment.INDEX_TTL = 600
+        preload.preload_indexes()
+        self.assertFalse(preload.refresh_if_stale())
+        segment.preload.assert_called_once()
+
+    def test_failed_preload_backs_off_instead_of_retrying_every_fork(self, segment, fuzzy, gc):
+        segment.preload.side_effect = RuntimeError("no such table")
+        with self.assertLogs("core.services.preload", "ERROR"):
+            preload.preload_indexes()
+
+        for _ in range(3):
+            self.assertFalse(preload.refresh_if_stale())
+        segment.preload.assert_called_once()
+
+        preload._failed_at -= preload.PRELOAD_RETRY_AFTER + 1
+        segment.preload.side_effect = None
+        self.assertTrue(preload.refresh_if_stale())
+        self.assertIsNone(preload._failed_at)
@@ -0,0 +1,87 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from core.models import SearchQueryCount
+from core.services import query_stats
+from core.services.buffered import FlushBuffer
+from core.services.query_stats import (
+    flush_query_counts,
+    normalize_query,
+    purge_query_counts,
+    record_query,
+    top_queries,
+)
+
+
+@mock.patch("core.services.buffered.FlushBuffer._ensure_flusher")
+class FlushBufferTests(SimpleTestCase):
+    def test_flushes_when_size_is_reached(self, flusher):
+        write = mock.Mock()
+        buffer = FlushBuffer("test", write, size=2, interval=60)
+
+        buffer.add(lambda items: items.update(a=1))
+        write.assert_not_called()
+        buffer.add(lambda items: items.update(b=2))
+
+        write.assert_called_once_with({"a": 1, "b": 2})
+        self.assertEqual(buffer.items, {})
+
+    def test_flushes_when_oldest_entry_is_too_old(self, flusher):
+        write = mock.Mock()
+        buffer = FlushBuffer("test", write, size=100, interval=0)
+
+        buffer.add(lambda items: items.update(a=1))
+        write.assert_called_once_with({"a": 1})
+
+    def test_flush_of_empty_buffer_writes_nothing(self, flusher):
+        write = mock.Mock()
+        FlushBuffer("test", write, size=2, interval=60).flush()
+        write.assert_not_called()
+
+
+class NormalizeQueryTests(SimpleTestCase):
+    def test_width_case_and_spaces_are_folded(self):
+        self.assertEqual(normalize_query(" ＴＡＢＥＲＵ  kun "), "taberu kun")
+        self.assertEqual(len(normalize_query("a" * 100)), query_stats.MAX_QUERY_LENGTH)
+
+
+@mock.patch("core.services.buffered.FlushBuffer._ensure_flusher")
+class QueryStatsTests(TestCase):
+    def setUp(self):
+        self.addCleanup(query_stats._buffer.clear)
+
+    def counts(self):
+        return dict(SearchQueryCount.objects.values_list("query", "count"))
+
+    def test_searches_are_counted_in_batches(self, flusher):
+        for q in ("taberu", "TABERU", "inu", " "):
+            record_query(q)
+        self.assertFalse(SearchQueryCount.objects.exists())
+
+        flush_query_counts()
+        self.assertEqual(self.counts(), {"taberu": 2, "inu": 1})
+
+        record_query("inu")
+        flush_query_counts()
+        self.assertEqual(self.counts(), {"taberu": 2, "inu": 2})
+
+    def test_top_queries_sum_recent_days(self, flusher):
+        today = timezone.localdate()
+        SearchQueryCount.objects.bulk_create([
+            SearchQueryCount(query="inu", day=today, count=3),
+            SearchQueryCount(query="inu", day=today - timedelta(days=1), count=3),
+            SearchQueryCount(query="neko", day=today, count=5),
+            SearchQueryCount(query="tori", day=today - timedelta(days=30), count=50),
+        ])
+        self.assertEqual(top_queries(days=7), [("inu", 6), ("neko", 5)])
+
+    def test_purge_drops_old_rollups(self, flusher):
+        today = timezone.localdate()
+        SearchQueryCount.objects.create(query="inu", day=today)
+        SearchQueryCount.objects.create(query="inu", day=today - timedelta(days=120))
+
+        self.assertEqual(purge_query_counts(), 1)
+        self.assertEqual(SearchQueryCount.objects.get().day, today)
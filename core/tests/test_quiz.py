@@ -0,0 +1,41 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from core.services.quiz import normalize_level, parse_quiz_response, retry_call
+
+RAW = """```json
+[
+  {"sentence": "猫＿＿＿いる。", "choices": ["が", "を", "に", "で"], "correct_index": 0},
+  {"sentence": "壊れた", "choices": ["a"], "correct_index": 0}
+]
+```"""
+
+
+class QuizParsingTests(SimpleTestCase):
+    def test_code_fences_and_invalid_items_are_dropped(self):
+        questions = parse_quiz_response(RAW, 10)
+        self.assertEqual([q["sentence"] for q in questions], ["猫＿＿＿いる。"])
+
+    def test_non_json_output(self):
+        with self.assertRaises(RuntimeError):
+            parse_quiz_response("Sure! Here are your questions:", 10)
+
+    def test_normalize_level(self):
+        self.assertEqual(normalize_level("5"), "N5")
+        self.assertEqual(normalize_level("n3"), "N3")
+
+
+@mock.patch("core.services.quiz.time.sleep")
+class RetryCallTests(SimpleTestCase):
+    def test_rate_limited_calls_are_retried_and_logged(self, sleep):
+        fn = mock.Mock(side_effect=[RuntimeError("429 Too Many Requests"), "ok"])
+        with self.assertLogs("core.services.quiz", "WARNING") as logs:
+            self.assertEqual(retry_call(fn), "ok")
+        self.assertIn("retry after", logs.output[0])
+        sleep.assert_called_once()
+
+    def test_other_errors_are_raised(self, sleep):
+        with self.assertRaises(ValueError):
+            retry_call(mock.Mock(side_effect=ValueError("bad request")))
+        sleep.assert_not_called()
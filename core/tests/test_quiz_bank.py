@@ -0,0 +1,88 @@
+from unittest import mock
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core.models import QuizQuestion
+from core.services import quiz_bank
+from core.services.quiz_bank import QuizBankEmpty, refill_bank, sample_questions, store_questions
+
+
+def question(sentence, correct_index=0):
+    return {"sentence": sentence, "choices": ["a", "b", "c", "d"], "correct_index": correct_index}
+
+
+def fill(level, count):
+    store_questions(level, [question(f"{level} 問題{i}＿＿＿") for i in range(count)])
+
+
+@mock.patch("core.services.quiz_bank.run_in_background")
+class QuizBankTests(TestCase):
+    def test_store_skips_invalid_and_duplicate_questions(self, run):
+        added = store_questions("N5", [
+            question("猫＿＿＿いる。"),
+            question("猫 ＿＿＿ いる。"),        # trùng sau khi bỏ khoảng trắng
+            question("犬＿＿＿いる。", correct_index=4),
+            {"sentence": "犬＿＿＿いる。", "choices": ["a"]},
+        ])
+        self.assertEqual(added, 1)
+        self.assertEqual(store_questions("N5", [question("猫＿＿＿いる。")]), 0)
+
+    def test_refill_stops_at_target(self, run):
+        batches = iter([[question(f"問題{i}") for i in range(n, n + 3)] for n in range(0, 30, 3)])
+        with mock.patch("core.services.quiz_bank.generate_jlpt_quiz", side_effect=lambda *a: next(batches)) as gen:
+            self.assertEqual(refill_bank("N4", target=5), 6)
+        self.assertEqual(gen.call_args_list, [mock.call("N4", 5), mock.call("N4", 2)])
+
+    def test_empty_bank_queues_refill_and_raises(self, run):
+        with self.assertRaises(QuizBankEmpty):
+            sample_questions("N3", 5)
+        run.assert_called_once_with("quiz-refill:N3", quiz_bank.refill_bank, "N3")
+
+    def test_low_bank_serves_and_queues_refill(self, run):
+        fill("N5", 10)
+        questions = sample_questions("N5", 5)
+        self.assertEqual(len(questions), 5)
+        self.assertEqual(set(questions[0]), {"id", "sentence", "choices", "correct_index"})
+        run.assert_called_once()
+
+    def test_full_bank_does_not_queue_refill(self, run):
+        fill("N5", quiz_bank.LOW_WATER)
+        fill("N4", 3)
+        questions = sample_questions("N5", 60)
+        self.assertEqual(len(questions), quiz_bank.LOW_WATER)
+        self.assertTrue(all(q["sentence"].startswith("N5") for q in questions))
+        run.assert_not_called()
+
+    def test_sample_is_one_query(self, run):
+        fill("N5", quiz_bank.LOW_WATER)
+        with self.assertNumQueries(1):
+            sample_questions("N5", 10)
+
+    def test_unknown_level(self, run):
+        with self.assertRaises(ValueError):
+            sample_questions("N9", 5)
+
+
+@mock.patch("core.services.quiz_bank.run_in_background")
+class JlptQuizViewTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def post(self, data):
+        return self.client.post("/api/quiz/jlpt/", data, format="json")
+
+    def test_empty_bank_returns_503_with_retry_after(self, run):
+        response = self.post({"level": "N2"})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], str(quiz_bank.EMPTY_RETRY_AFTER))
+
+    def test_count_is_validated_and_capped(self, run):
+        fill("N5", 60)
+        self.assertEqual(self.post({"level": "5", "count": "abc"}).status_code, 400)
+        self.assertEqual(self.post({"level": "5", "count": 0}).status_code, 400)
+
+        response = self.post({"level": "5", "count": 1000})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["count"], 50)
+        self.assertEqual(QuizQuestion.objects.count(), 60)
@@ -0,0 +1,48 @@
+from django.test import TestCase
+from django.utils import timezone
+
+from core.models import SearchHistory, User, Word
+from core.services.ranking import compute_score, rank_matches, refresh_scores
+
+
+class RankingTests(TestCase):
+    def word(self, kanji, kana, **fields):
+        fields.setdefault("score", compute_score(fields.get("is_common", False), fields.get("jlpt_level"), 0))
+        return Word.objects.create(kanji=kanji, kana=kana, refreshed_at=timezone.now(), **fields)
+
+    def search(self, q):
+        qs = Word.objects.filter(kanji__icontains=q) | Word.objects.filter(kana__icontains=q)
+        return [w.kanji for w in rank_matches(qs, q)]
+
+    def test_score_combines_commonness_jlpt_and_popularity(self):
+        self.assertEqual(compute_score(True, "N5", 0), 150)
+        self.assertEqual(compute_score(False, "n1", 0), 10)
+        self.assertEqual(compute_score(False, None, 3), 20)
+        self.assertEqual(compute_score(False, None, 10 ** 9), 100)
+
+    def test_exact_then_prefix_then_substring(self):
+        self.word("毎日", "まいにち", is_common=True, jlpt_level="N5")
+        self.word("日曜日", "にちようび", is_common=True, jlpt_level="N5")
+        self.word("日", "ひ", jlpt_level="N4")
+        self.assertEqual(self.search("日"), ["日", "日曜日", "毎日"])
+
+    def test_score_orders_within_a_tier(self):
+        self.word("日記", "にっき", jlpt_level="N3")
+        self.word("日本", "にほん", is_common=True, jlpt_level="N5")
+        self.word("日光", "にっこう")
+        self.assertEqual(self.search("日"), ["日本", "日記", "日光"])
+
+    def test_refresh_counts_distinct_users(self):
+        rare = self.word("日光", "にっこう")
+        popular = self.word("日記", "にっき")
+        for name in ("a", "b", "c"):
+            user = User.objects.create_user(username=name, email=f"{name}@example.com", password="x")
+            SearchHistory.objects.create(user=user, word=popular)
+
+        self.assertEqual(refresh_scores(), 1)
+        popular.refresh_from_db()
+        self.assertEqual((popular.search_count, popular.score), (3, 20))
+        self.assertEqual(self.search("日"), ["日記", "日光"])
+        self.assertEqual(refresh_scores(), 0)
+        rare.refresh_from_db()
+        self.assertEqual(rare.score, 0)
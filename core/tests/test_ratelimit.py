@@ -0,0 +1,58 @@
+from django.test import TestCase, override_settings
+
+from core.models import RateLimitBucket
+from core.services.ratelimit import (
+    BACKGROUND,
+    INTERACTIVE,
+    RateLimiter,
+    RateLimitExceeded,
+    priority,
+)
+
+# refill chậm (1 token / 100s): kết quả không phụ thuộc thời gian chạy test
+SLOW = {"test": (0.01, 4)}
+
+
+@override_settings(UPSTREAM_RATE_LIMITS=SLOW)
+class TokenBucketTests(TestCase):
+    def setUp(self):
+        self.limiter = RateLimiter("test")
+
+    def test_new_bucket_starts_full(self):
+        taken = [self.limiter._take(INTERACTIVE) for _ in range(5)]
+        self.assertEqual(taken[:4], [0.0] * 4)
+        self.assertGreater(taken[4], 0)
+        self.assertEqual(RateLimitBucket.objects.filter(name="test").count(), 1)
+
+    def test_background_leaves_reserve_for_interactive(self):
+        background = [self.limiter._take(BACKGROUND) for _ in range(3)]
+        self.assertEqual(background[:2], [0.0, 0.0])
+        self.assertGreater(background[2], 0)
+        # phần dự trữ vẫn còn cho request của user
+        self.assertEqual(self.limiter._take(INTERACTIVE), 0.0)
+
+    def test_wait_estimate_follows_refill_rate(self):
+        for _ in range(4):
+            self.limiter._take(INTERACTIVE)
+        wait = self.limiter._take(INTERACTIVE)
+        self.assertGreater(wait, 90)
+        self.assertLessEqual(wait, 100)
+
+    def test_penalize_drains_bucket_below_zero(self):
+        self.limiter._take(INTERACTIVE)
+        self.limiter.penalize(retry_after=300)
+        self.assertLess(RateLimitBucket.objects.get(name="test").tokens, 0)
+        self.assertGreater(self.limiter._take(INTERACTIVE), 300)
+
+    def test_penalize_creates_missing_bucket(self):
+        self.limiter.penalize(retry_after=300)
+        self.assertLess(RateLimitBucket.objects.get(name="test").tokens, 0)
+        self.assertGreater(self.limiter._take(INTERACTIVE), 300)
+
+    def test_acquire_gives_up_after_max_wait(self):
+        for _ in range(4):
+            self.limiter._take(INTERACTIVE)
+        with priority(BACKGROUND, max_wait=0.0):
+            with self.assertRaises(RateLimitExceeded):
+                self.limiter.acquire()
+        self.assertEqual(self.limiter.snapshot()[BACKGROUND]["rejected"], 1)
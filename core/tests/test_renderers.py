@@ -0,0 +1,77 @@
+import datetime
+import gzip
+import json
+from decimal import Decimal
+from unittest import skipIf
+
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from core.middleware import CompressionMiddleware, brotli
+from core.models import Favorite, User, Word, WordMeaning
+from core.renderers import ORJSONRenderer
+
+
+class ORJSONRendererTests(SimpleTestCase):
+    def test_output_matches_drf_json(self):
+        data = {
+            "when": datetime.datetime(2024, 5, 1, 12, 30, tzinfo=datetime.timezone.utc),
+            "day": datetime.date(2024, 5, 1),
+            "price": Decimal("1.50"),
+            "membership": {3: True, 10: False},
+            "text": "日本語",
+        }
+        ours = json.loads(ORJSONRenderer().render(data))
+        drf = json.loads(JSONRenderer().render(data))
+        self.assertEqual(ours, drf)
+        self.assertEqual(ours["when"], "2024-05-01T12:30:00Z")
+
+    def test_none_renders_empty_body(self):
+        self.assertEqual(ORJSONRenderer().render(None), b"")
+
+
+class CompressionMiddlewareTests(SimpleTestCase):
+    body = json.dumps([{"kanji": "日本語", "meaning": "Japanese language"}] * 50).encode()
+
+    def process(self, response, accept):
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING=accept)
+        return CompressionMiddleware(lambda r: response).process_response(request, response)
+
+    @skipIf(brotli is None, "brotli not installed")
+    def test_brotli_when_accepted(self):
+        response = self.process(HttpResponse(self.body, headers={"ETag": '"abc"'}), "gzip, br")
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(response["ETag"], 'W/"abc"')
+        self.assertEqual(brotli.decompress(response.content), self.body)
+
+    def test_gzip_fallback(self):
+        response = self.process(HttpResponse(self.body), "gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), self.body)
+
+    @skipIf(brotli is None, "brotli not installed")
+    def test_streaming_brotli(self):
+        response = self.process(StreamingHttpResponse(iter([self.body[:500], self.body[500:]])), "br")
+        self.assertEqual(brotli.decompress(b"".join(response.streaming_content)), self.body)
+
+    def test_range_responses_are_left_alone(self):
+        response = self.process(HttpResponse(self.body, headers={"Accept-Ranges": "bytes"}), "br")
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+
+class FavoritesStreamTests(TestCase):
+    def test_streamed_list_is_one_json_array(self):
+        user = User.objects.create_user(username="u", email="u@example.com", password="x")
+        for i in range(5):
+            word = Word.objects.create(kanji=f"語{i}", kana="ご", refreshed_at=timezone.now())
+            WordMeaning.objects.create(word=word, meaning=f"word {i}")
+            Favorite.objects.create(user=user, word=word)
+        client = APIClient()
+        client.force_authenticate(user)
+
+        response = client.get("/api/favorites/")
+        data = json.loads(b"".join(response.streaming_content))
+        self.assertEqual(sorted(w["kanji"] for w in data), [f"語{i}" for i in range(5)])
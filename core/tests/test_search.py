@@ -0,0 +1,69 @@
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.models import Word, WordMeaning
+from core.services import fuzzy
+from core.services.ingest import known_query_ids, remember_query
+
+
+def fake_jisho(results):
+    """upsert_from_jisho giả: query -> danh sách word (đã có trong DB), ghi nhớ như bản thật."""
+    def upsert(keyword, refresh=False):
+        words = results.get(keyword, [])
+        remember_query(keyword, words)
+        return words
+    return upsert
+
+
+class SearchFuzzyOrderTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        now = timezone.now()
+        self.dou = Word.objects.create(kanji="", kana="どう", refreshed_at=now)
+        self.taberu = Word.objects.create(kanji="食べる", kana="たべる", refreshed_at=now)
+        WordMeaning.objects.create(word=self.taberu, meaning="to eat")
+        fuzzy.preload()
+        self.addCleanup(setattr, fuzzy, "_index", None)
+        # job nền (enrich example, ingest typo) chạy trên thread riêng -> không chạy trong test
+        for name in ("schedule_prefetch", "schedule_ingest"):
+            patcher = mock.patch(f"core.api.search.{name}")
+            setattr(self, name, patcher.start())
+            self.addCleanup(patcher.stop)
+
+    def search(self, q, jisho):
+        with mock.patch("core.api.search.upsert_from_jisho", side_effect=fake_jisho(jisho)) as upsert:
+            response = self.client.get("/api/search/", {"q": q})
+        self.assertEqual(response.status_code, 200)
+        return response.json()["results"], upsert
+
+    def test_first_english_query_asks_jisho_before_fuzzy(self):
+        # "dog" -> romaji どう ở distance 1: fuzzy sẽ khớp nếu chạy trước Jisho
+        self.assertIn(self.dou.id, fuzzy.fuzzy_readings("dog"))
+        inu = Word.objects.create(kanji="犬", kana="いぬ", refreshed_at=timezone.now())
+
+        data, upsert = self.search("dog", {"dog": [inu]})
+
+        upsert.assert_called_once_with("dog")
+        self.assertEqual([w["id"] for w in data], [inu.id])
+        self.assertNotIn("fuzzy", data[0])
+        self.assertEqual(known_query_ids("dog"), [inu.id])
+
+    def test_romaji_typo_falls_back_to_fuzzy_when_jisho_has_nothing(self):
+        data, upsert = self.search("tabeu", {})
+
+        upsert.assert_called_once_with("tabeu")
+        self.assertEqual([w["id"] for w in data], [self.taberu.id])
+        self.assertEqual(data[0]["fuzzy"], {"term": "taberu", "distance": 1})
+        # Jisho đã trả lời (rỗng) -> không xếp ingest lại
+        self.schedule_ingest.assert_not_called()
+
+    def test_kana_typo_uses_fuzzy_without_jisho(self):
+        data, upsert = self.search("たべう", {})
+
+        self.assertEqual([w["id"] for w in data], [self.taberu.id])
+        self.assertEqual(data[0]["fuzzy"]["distance"], 1)
+        upsert.assert_not_called()
+        self.schedule_ingest.assert_called_once_with(["たべう"])
@@ -0,0 +1,56 @@
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.models import Word
+from core.services import segment as segmenter
+from core.services.segment import segment
+
+WORDS = [
+    ("日本語", "にほんご", "Noun"),
+    ("日本", "にほん", "Noun"),
+    ("語", "ご", "Noun"),
+    ("を", "を", "Particle"),
+    ("勉強", "べんきょう", "Noun, Suru verb"),
+    ("する", "する", "Suru verb"),
+    ("食べる", "たべる", "Ichidan verb"),
+]
+
+
+class SegmentTests(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        self.ids = {
+            kanji: Word.objects.create(kanji=kanji, kana=kana, parts_of_speech=pos, refreshed_at=now).id
+            for kanji, kana, pos in WORDS
+        }
+        segmenter.preload()
+        self.addCleanup(setattr, segmenter, "_index", None)
+
+    def test_prefers_fewest_tokens(self):
+        spans = segment("日本語を勉強")
+        self.assertEqual([s["surface"] for s in spans], ["日本語", "を", "勉強"])
+        self.assertEqual(spans[0]["word_ids"], [self.ids["日本語"]])
+        self.assertEqual((spans[2]["start"], spans[2]["end"]), (4, 6))
+
+    def test_inflected_words_carry_deinflection(self):
+        spans = segment("食べた")
+        self.assertEqual(len(spans), 1)
+        self.assertEqual(spans[0]["word_ids"], [self.ids["食べる"]])
+        self.assertEqual(spans[0]["deinflection"]["base"], "食べる")
+
+    def test_unknown_and_latin_runs_are_grouped(self):
+        spans = segment("NHKで鯖鮪を")
+        # で không có trong từ điển -> gộp với các ký tự lạ liền sau
+        self.assertEqual([s["surface"] for s in spans], ["NHK", "で鯖鮪", "を"])
+        self.assertEqual(spans[1]["word_ids"], [])
+
+    def test_endpoint_returns_word_summaries(self):
+        response = APIClient().post("/api/segment/", {"text": "日本語を勉強"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(len(data["tokens"]), 3)
+        self.assertEqual(data["words"][str(self.ids["勉強"])]["kana"], "べんきょう")
+
+    def test_endpoint_rejects_empty_text(self):
+        self.assertEqual(APIClient().post("/api/segment/", {"text": " "}, format="json").status_code, 400)
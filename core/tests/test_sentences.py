@@ -0,0 +1,36 @@
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from core.models import ExampleSentence, SentenceToken, Word
+from core.services import segment as segmenter
+from core.services.sentences import index_pending, store_sentences
+
+EXAMPLES = [{"id": 1, "jp": "パンを食べた", "en": "I ate bread."}]
+
+
+class StoreSentencesTests(TestCase):
+    def setUp(self):
+        Word.objects.create(kanji="食べる", kana="たべる", parts_of_speech="Ichidan verb", refreshed_at=timezone.now())
+        self.addCleanup(setattr, segmenter, "_index", None)
+
+    def test_indexes_new_sentences_when_segmenter_is_ready(self):
+        segmenter.preload()
+        [sentence] = store_sentences(EXAMPLES)
+
+        sentence.refresh_from_db()
+        self.assertTrue(sentence.indexed)
+        self.assertTrue(SentenceToken.objects.filter(sentence=sentence, token="食べる").exists())
+
+    @mock.patch("core.services.sentences.run_in_background")
+    def test_cold_segmenter_defers_indexing_to_background(self, run):
+        [sentence] = store_sentences(EXAMPLES)
+
+        # request không build index segment; câu chờ job nền / lệnh backfill
+        self.assertFalse(segmenter.is_ready())
+        self.assertFalse(ExampleSentence.objects.get(pk=sentence.pk).indexed)
+        run.assert_called_once_with("index-sentences", index_pending)
+
+        self.assertGreater(index_pending(), 0)
+        self.assertTrue(ExampleSentence.objects.get(pk=sentence.pk).indexed)
@@ -0,0 +1,114 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from core.models import Favorite, SyncChange, User, Word
+from core.services import sync
+from core.services.membership import get_membership_version
+
+
+class ChangeLogTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="u", email="u@example.com", password="x")
+        self.word = Word.objects.create(kanji="犬", kana="いぬ")
+
+    def test_log_keeps_only_latest_change_per_object(self):
+        sync.record_change(self.user.id, sync.HISTORY, self.word.id, sync.UPSERT, {"searched_at": "a"})
+        sync.record_change(self.user.id, sync.HISTORY, self.word.id, sync.UPSERT, {"searched_at": "b"})
+
+        rows = list(SyncChange.objects.filter(user=self.user, entity=sync.HISTORY).values("op", "data"))
+        self.assertEqual(rows, [{"op": sync.UPSERT, "data": {"searched_at": "b"}}])
+
+    def test_delta_returns_only_changes_after_cursor(self):
+        favorite = Favorite.objects.create(user=self.user, word=self.word)
+        favorite_id = favorite.id
+        first = sync.changes_since(self.user.id, None)
+        self.assertTrue(first["reset"])
+        self.assertEqual([c["id"] for c in first["changes"]], [favorite_id])
+
+        favorite.delete()
+        delta = sync.changes_since(self.user.id, first["cursor"])
+        self.assertFalse(delta["reset"])
+        self.assertEqual(
+            [(c["entity"], c["id"], c["op"]) for c in delta["changes"]],
+            [(sync.FAVORITE, favorite_id, sync.DELETE)],
+        )
+        self.assertEqual(sync.changes_since(self.user.id, delta["cursor"])["changes"], [])
+
+    def test_reset_skips_tombstones(self):
+        Favorite.objects.create(user=self.user, word=self.word).delete()
+        self.assertEqual(sync.changes_since(self.user.id, None)["changes"], [])
+
+    def test_expired_cursor_forces_reset(self):
+        Favorite.objects.create(user=self.user, word=self.word)
+        issued_at = timezone.now() - sync.TOMBSTONE_TTL - timedelta(days=1)
+        cursor = sync.encode_cursor(1, issued_at.timestamp())
+        self.assertTrue(sync.changes_since(self.user.id, cursor)["reset"])
+
+    def test_paging_cursor_resumes_after_last_row(self):
+        words = [Word.objects.create(kanji=f"語{i}", kana=f"ご{i}") for i in range(3)]
+        for w in words:
+            Favorite.objects.create(user=self.user, word=w)
+        page = sync.changes_since(self.user.id, None, limit=2)
+        self.assertTrue(page["has_more"])
+        rest = sync.changes_since(self.user.id, page["cursor"], limit=2)
+        self.assertEqual(len(page["changes"]) + len(rest["changes"]), 3)
+        self.assertFalse(rest["has_more"])
+
+    def test_log_writes_lock_user_rows_before_taking_ids(self):
+        other = User.objects.create_user(username="v", email="v@example.com", password="x")
+        changes = [(other.id, self.word.id, sync.UPSERT, None), (self.user.id, self.word.id, sync.UPSERT, None)]
+
+        lock = mock.patch.object(User.objects, "select_for_update", wraps=User.objects.select_for_update)
+        with lock as select_for_update, CaptureQueriesContext(connection) as queries:
+            sync.record_changes(sync.HISTORY, changes)
+
+        select_for_update.assert_called_once_with()
+        sql = [q["sql"] for q in queries.captured_queries]
+        locked = next(i for i, q in enumerate(sql) if 'FROM "core_user"' in q)
+        inserted = next(i for i, q in enumerate(sql) if q.startswith('INSERT INTO "core_syncchange"'))
+        self.assertLess(locked, inserted)
+        self.assertIn("ORDER BY", sql[locked])
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(sync.InvalidCursor):
+            sync.changes_since(self.user.id, "garbage")
+
+
+class CompactionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="u", email="u@example.com", password="x")
+        self.word = Word.objects.create(kanji="犬", kana="いぬ")
+
+    def _age_tombstones(self):
+        SyncChange.objects.filter(op=sync.DELETE).update(
+            created_at=timezone.now() - sync.TOMBSTONE_TTL - timedelta(days=1)
+        )
+
+    def test_purge_removes_old_tombstones(self):
+        for i in range(2):
+            w = Word.objects.create(kanji=f"猫{i}", kana=f"ねこ{i}")
+            Favorite.objects.create(user=self.user, word=w).delete()
+        Favorite.objects.create(user=self.user, word=self.word)
+        self._age_tombstones()
+
+        self.assertEqual(sync.purge_tombstones(), 2)
+        self.assertFalse(SyncChange.objects.filter(op=sync.DELETE).exists())
+
+    def test_purge_keeps_latest_membership_row(self):
+        Favorite.objects.create(user=self.user, word=self.word).delete()
+        version = get_membership_version(self.user.id)
+        self._age_tombstones()
+
+        sync.purge_tombstones()
+        self.assertEqual(get_membership_version(self.user.id), version)
+
+    def test_history_does_not_change_membership_version(self):
+        Favorite.objects.create(user=self.user, word=self.word)
+        version = get_membership_version(self.user.id)
+        sync.record_change(self.user.id, sync.HISTORY, self.word.id, sync.UPSERT, {"searched_at": "a"})
+        self.assertEqual(get_membership_version(self.user.id), version)
@@ -0,0 +1,68 @@
+from unittest import mock
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core.services.translate import translate, translate_many
+
+
+def fake_remote(text, source, target):
+    return f"{source}>{target}:{text}"
+
+
+@mock.patch("core.services.translate._translate_remote", side_effect=fake_remote)
+class TranslateCacheTests(TestCase):
+    def test_repeat_translation_is_served_from_cache(self, remote):
+        self.assertEqual(translate("こんにちは"), "ja>en:こんにちは")
+        self.assertEqual(translate("こんにちは"), "ja>en:こんにちは")
+        remote.assert_called_once()
+
+    def test_cache_key_uses_normalized_text(self, remote):
+        translate("ｺﾝﾆﾁﾊ  世界")
+        translate("コンニチハ 世界")
+        remote.assert_called_once_with("コンニチハ 世界", "ja", "en")
+
+    def test_language_pair_is_part_of_the_key(self, remote):
+        translate("こんにちは")
+        translate("こんにちは", target="vi")
+        self.assertEqual(remote.call_count, 2)
+
+    def test_batch_dedupes_and_counts_cache_hits(self, remote):
+        translate("ありがとう")
+        remote.reset_mock()
+
+        results, hits = translate_many(["こんにちは", "ありがとう", "こんにちは", ""])
+
+        self.assertEqual(results, ["ja>en:こんにちは", "ja>en:ありがとう", "ja>en:こんにちは", None])
+        self.assertEqual(hits, 1)
+        remote.assert_called_once_with("こんにちは", "ja", "en")
+
+    def test_failed_items_are_none_and_not_cached(self, remote):
+        remote.side_effect = RuntimeError("quota")
+        with self.assertLogs("core.services.translate", "ERROR"):
+            results, _ = translate_many(["こんにちは"])
+        self.assertEqual(results, [None])
+
+        remote.side_effect = fake_remote
+        self.assertEqual(translate_many(["こんにちは"])[0], ["ja>en:こんにちは"])
+
+
+class TranslateBatchViewTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def post(self, data):
+        return self.client.post("/api/translate/batch/", data, format="json")
+
+    def test_unsupported_languages_are_rejected(self):
+        with mock.patch("core.api.translate.translate_many") as translate_many_:
+            for pair in ({"source": "xx"}, {"target": "../../etc"}, {"target": ["en"]}):
+                response = self.post({"texts": ["こんにちは"], **pair})
+                self.assertEqual(response.status_code, 400, pair)
+        translate_many_.assert_not_called()
+
+    @mock.patch("core.services.translate._translate_remote", side_effect=fake_remote)
+    def test_supported_pair_is_translated(self, remote):
+        response = self.post({"texts": ["こんにちは"], "source": "auto", "target": "zh-CN"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"translations": ["auto>zh-CN:こんにちは"], "cached": 0})
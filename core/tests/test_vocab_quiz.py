@@ -0,0 +1,64 @@
+from django.test import TestCase
+from django.utils import timezone
+
+from core.models import Word, WordMeaning
+from core.services import vocab_quiz
+from core.services.vocab_quiz import build_pool, generate_vocab_quiz
+
+WORDS = [
+    ("犬", "いぬ", "Noun", "dog"),
+    ("猫", "ねこ", "Noun", "cat; kitty; feline"),
+    ("水", "みず", "Noun", "water"),
+    ("山", "やま", "Noun", "mountain"),
+    ("食べる", "たべる", "Ichidan verb", "to eat"),
+    ("飲む", "のむ", "Godan verb, Transitive verb", "to drink"),
+]
+
+
+class VocabQuizTests(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        self.words = {}
+        for kanji, kana, pos, meaning in WORDS:
+            word = Word.objects.create(kanji=kanji, kana=kana, parts_of_speech=pos, jlpt_level="N5", refreshed_at=now)
+            WordMeaning.objects.create(word=word, meaning=meaning)
+            self.words[word.id] = (kanji, kana, meaning)
+        vocab_quiz._pools.clear()
+        self.addCleanup(vocab_quiz._pools.clear)
+
+    def test_pool_groups_by_first_part_of_speech(self):
+        with self.assertNumQueries(2):
+            pool = build_pool("N5")
+        self.assertEqual(len(pool["all"]), 6)
+        self.assertEqual(len(pool["by_pos"]["Noun"]), 4)
+        self.assertIn("Godan verb", pool["by_pos"])
+        cat = next(e for e in pool["all"] if e["kanji"] == "猫")
+        self.assertEqual(cat["meaning"], "cat; kitty")
+
+    def test_questions_have_one_correct_answer(self):
+        questions = generate_vocab_quiz("N5", 20)
+        self.assertEqual(len(questions), 20)
+        for q in questions:
+            kanji, kana, meaning = self.words[q["word_id"]]
+            answer = {
+                "reading_to_meaning": vocab_quiz._short_meaning(meaning),
+                "meaning_to_word": kanji,
+                "kanji_to_reading": kana,
+            }[q["type"]]
+            self.assertEqual(len(set(q["choices"])), 4)
+            self.assertEqual(q["choices"][q["correct_index"]], answer)
+
+    def test_pool_is_reused(self):
+        generate_vocab_quiz("N5", 5)
+        with self.assertNumQueries(0):
+            generate_vocab_quiz("N5", 5)
+
+    def test_types_filter(self):
+        questions = generate_vocab_quiz("N5", 5, ["kanji_to_reading"])
+        self.assertEqual({q["type"] for q in questions}, {"kanji_to_reading"})
+        with self.assertRaises(ValueError):
+            generate_vocab_quiz("N5", 5, ["essay"])
+
+    def test_level_without_enough_words(self):
+        with self.assertRaises(ValueError):
+            generate_vocab_quiz("N1", 5)
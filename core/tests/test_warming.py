@@ -0,0 +1,41 @@
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from core.models import Word
+from core.services.breaker import CircuitOpenError
+from core.services.warming import warm_queries
+
+
+@mock.patch("core.services.warming.rebuild_missing_documents")
+@mock.patch("core.services.warming.prefetch_examples", return_value=True)
+class WarmQueriesTests(TestCase):
+    def setUp(self):
+        self.taberu = Word.objects.create(kanji="食べる", kana="たべる", refreshed_at=timezone.now())
+
+    def test_local_queries_skip_jisho_and_enrich_results(self, prefetch, rebuild):
+        with mock.patch("core.services.warming.upsert_from_jisho") as upsert:
+            stats = warm_queries(["食べる"])
+
+        upsert.assert_not_called()
+        prefetch.assert_called_once_with(self.taberu.id)
+        self.assertEqual(stats, {"queries": 1, "enriched": 1})
+        rebuild.assert_called_once()
+
+    def test_missing_queries_are_ingested(self, prefetch, rebuild):
+        inu = Word.objects.create(kanji="犬", kana="いぬ", refreshed_at=timezone.now())
+        with mock.patch("core.services.warming.upsert_from_jisho", return_value=[inu]) as upsert:
+            stats = warm_queries(["dog"])
+
+        upsert.assert_called_once_with("dog")
+        prefetch.assert_called_once_with(inu.id)
+        self.assertEqual(stats["queries"], 1)
+
+    def test_open_circuit_stops_warming(self, prefetch, rebuild):
+        with mock.patch("core.services.warming.upsert_from_jisho", side_effect=CircuitOpenError("jisho")) as upsert:
+            stats = warm_queries(["dog", "cat"])
+
+        upsert.assert_called_once_with("dog")
+        self.assertEqual(stats, {"queries": 0, "enriched": 0})
+        rebuild.assert_called_once()
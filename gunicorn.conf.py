@@ -0,0 +1,27 @@
+"""
+Cấu hình gunicorn (tự đọc từ thư mục hiện tại, dùng cho cả WSGI lẫn uvicorn worker).
+
+GUNICORN_PRELOAD=True (mặc định): import app 1 lần trong master, build index tra cứu
+(segment, fuzzy) rồi mới fork worker -> worker boot nhanh và dùng chung index (copy-on-write).
+Index trong master được build lại trước khi fork worker mới nếu đã cũ; worker recycle sau
+max_requests (kèm jitter để không recycle cùng lúc) -> worker mới luôn fork index còn mới.
+"""
+import os
+
+preload_app = os.environ.get("GUNICORN_PRELOAD", "True") == "True"
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 2000))
+max_requests_jitter = max_requests // 10
+
+
+def when_ready(server):
+    # Gọi trong master, sau khi app đã load và trước khi spawn worker
+    if server.cfg.preload_app:
+        from core.services.preload import preload_indexes
+        preload_indexes()
+
+
+def pre_fork(server, worker):
+    # Gọi trong master trước mỗi lần fork (boot, worker recycle / chết)
+    if server.cfg.preload_app:
+        from core.services.preload import refresh_if_stale
+        refresh_if_stale()